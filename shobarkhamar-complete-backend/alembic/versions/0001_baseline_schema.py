@@ -0,0 +1,226 @@
+"""baseline schema
+
+The schema as Base.metadata.create_all() built it before migrations were
+introduced. Databases created that way are stamped at this revision by
+init_db() rather than upgraded through it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 22:45:10.390413
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = (
+    'targetspecies', 'severitylevel', 'applicationmethod', 'userrole', 'farmtype', 'farmstatus',
+    'diagnosisstatus', 'unittype', 'notificationtype', 'labelsource',
+)
+
+
+def upgrade():
+    op.create_table('diseases',
+    sa.Column('disease_id', sa.UUID(), nullable=False),
+    sa.Column('disease_name', sa.String(length=200), nullable=False),
+    sa.Column('target_species', sa.Enum('FISH', 'POULTRY', 'MIXED', name='targetspecies'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('contagious', sa.Boolean(), nullable=True),
+    sa.Column('severity_level', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='severitylevel'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('disease_id')
+    )
+    op.create_table('model_versions',
+    sa.Column('model_version_id', sa.UUID(), nullable=False),
+    sa.Column('model_name', sa.String(), nullable=False),
+    sa.Column('framework', sa.String(), nullable=True),
+    sa.Column('artifact_uri', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('model_version_id')
+    )
+    op.create_table('symptoms',
+    sa.Column('symptom_id', sa.UUID(), nullable=False),
+    sa.Column('symptom_name', sa.String(length=200), nullable=False),
+    sa.Column('symptom_description', sa.Text(), nullable=True),
+    sa.Column('target_species', sa.Enum('FISH', 'POULTRY', 'MIXED', name='targetspecies'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('symptom_id')
+    )
+    op.create_table('treatments',
+    sa.Column('treatment_id', sa.UUID(), nullable=False),
+    sa.Column('treatment_name', sa.String(length=200), nullable=False),
+    sa.Column('medication_name', sa.String(length=200), nullable=True),
+    sa.Column('application_method', sa.Enum('ORAL', 'INJECTION', 'TOPICAL', 'WATER', 'FEED', 'OTHER', name='applicationmethod'), nullable=False),
+    sa.Column('dosage_text', sa.Text(), nullable=True),
+    sa.Column('duration_days', sa.Integer(), nullable=True),
+    sa.Column('precaution', sa.Text(), nullable=True),
+    sa.Column('alternatives_note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('treatment_id')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'FARMER', 'VET', name='userrole'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_table('disease_symptoms',
+    sa.Column('disease_id', sa.UUID(), nullable=False),
+    sa.Column('symptom_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['disease_id'], ['diseases.disease_id'], ),
+    sa.ForeignKeyConstraint(['symptom_id'], ['symptoms.symptom_id'], ),
+    sa.PrimaryKeyConstraint('disease_id', 'symptom_id')
+    )
+    op.create_table('disease_treatments',
+    sa.Column('disease_id', sa.UUID(), nullable=False),
+    sa.Column('treatment_id', sa.UUID(), nullable=False),
+    sa.Column('effectiveness_notes', sa.Text(), nullable=True),
+    sa.Column('is_primary_treatment', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['disease_id'], ['diseases.disease_id'], ),
+    sa.ForeignKeyConstraint(['treatment_id'], ['treatments.treatment_id'], ),
+    sa.PrimaryKeyConstraint('disease_id', 'treatment_id')
+    )
+    op.create_table('farms',
+    sa.Column('farm_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('farm_name', sa.String(length=200), nullable=False),
+    sa.Column('farm_type', sa.Enum('FISH', 'POULTRY', 'MIXED', name='farmtype'), nullable=False),
+    sa.Column('farm_status', sa.Enum('ACTIVE', 'INACTIVE', name='farmstatus'), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('area_size', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('farm_id')
+    )
+    op.create_table('feedbacks',
+    sa.Column('feedback_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('feedback_text', sa.Text(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('feedback_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('feedback_id')
+    )
+    op.create_table('diagnoses',
+    sa.Column('diagnosis_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('farm_id', sa.UUID(), nullable=False),
+    sa.Column('unit_id', sa.UUID(), nullable=True),
+    sa.Column('target_species', sa.Enum('FISH', 'POULTRY', 'MIXED', name='targetspecies'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='diagnosisstatus'), nullable=True),
+    sa.Column('symptoms_text', sa.Text(), nullable=True),
+    sa.Column('final_disease_id', sa.UUID(), nullable=True),
+    sa.Column('ai_confidence', sa.Float(), nullable=True),
+    sa.Column('ai_disease_code', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['farm_id'], ['farms.farm_id'], ),
+    sa.ForeignKeyConstraint(['final_disease_id'], ['diseases.disease_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('diagnosis_id')
+    )
+    op.create_table('farm_units',
+    sa.Column('unit_id', sa.UUID(), nullable=False),
+    sa.Column('farm_id', sa.UUID(), nullable=False),
+    sa.Column('unit_type', sa.Enum('POND', 'CAGE', 'TANK', 'COOP', 'PEN', 'OTHER', name='unittype'), nullable=False),
+    sa.Column('unit_name', sa.String(length=100), nullable=False),
+    sa.Column('target_species', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['farm_id'], ['farms.farm_id'], ),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+    op.create_table('diagnosis_images',
+    sa.Column('diagnosis_image_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_id', sa.UUID(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=False),
+    sa.Column('captured_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.diagnosis_id'], ),
+    sa.PrimaryKeyConstraint('diagnosis_image_id')
+    )
+    op.create_table('diagnosis_symptoms',
+    sa.Column('diagnosis_id', sa.UUID(), nullable=False),
+    sa.Column('symptom_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.diagnosis_id'], ),
+    sa.ForeignKeyConstraint(['symptom_id'], ['symptoms.symptom_id'], ),
+    sa.PrimaryKeyConstraint('diagnosis_id', 'symptom_id')
+    )
+    op.create_table('notifications',
+    sa.Column('notification_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_id', sa.UUID(), nullable=True),
+    sa.Column('type', sa.Enum('DIAGNOSIS_COMPLETE', 'DISEASE_ALERT', 'TREATMENT_REMINDER', 'SYSTEM', 'OTHER', name='notificationtype'), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.diagnosis_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('notification_id')
+    )
+    op.create_table('ai_training_data',
+    sa.Column('training_data_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_image_id', sa.UUID(), nullable=False),
+    sa.Column('label_disease_id', sa.UUID(), nullable=False),
+    sa.Column('label_source', sa.Enum('USER_CONFIRMED', 'VET_CONFIRMED', 'IMPORTED', name='labelsource'), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.diagnosis_id'], ),
+    sa.ForeignKeyConstraint(['diagnosis_image_id'], ['diagnosis_images.diagnosis_image_id'], ),
+    sa.ForeignKeyConstraint(['label_disease_id'], ['diseases.disease_id'], ),
+    sa.PrimaryKeyConstraint('training_data_id')
+    )
+    op.create_table('predictions',
+    sa.Column('prediction_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_id', sa.UUID(), nullable=False),
+    sa.Column('diagnosis_image_id', sa.UUID(), nullable=False),
+    sa.Column('predicted_disease_id', sa.UUID(), nullable=False),
+    sa.Column('model_version_id', sa.UUID(), nullable=False),
+    sa.Column('confidence', sa.Numeric(precision=5, scale=4), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.diagnosis_id'], ),
+    sa.ForeignKeyConstraint(['diagnosis_image_id'], ['diagnosis_images.diagnosis_image_id'], ),
+    sa.ForeignKeyConstraint(['model_version_id'], ['model_versions.model_version_id'], ),
+    sa.ForeignKeyConstraint(['predicted_disease_id'], ['diseases.disease_id'], ),
+    sa.PrimaryKeyConstraint('prediction_id')
+    )
+
+
+def downgrade():
+    op.drop_table('predictions')
+    op.drop_table('ai_training_data')
+    op.drop_table('notifications')
+    op.drop_table('diagnosis_symptoms')
+    op.drop_table('diagnosis_images')
+    op.drop_table('farm_units')
+    op.drop_table('diagnoses')
+    op.drop_table('feedbacks')
+    op.drop_table('farms')
+    op.drop_table('disease_treatments')
+    op.drop_table('disease_symptoms')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('treatments')
+    op.drop_table('symptoms')
+    op.drop_table('model_versions')
+    op.drop_table('diseases')
+    for enum_name in ENUMS:
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
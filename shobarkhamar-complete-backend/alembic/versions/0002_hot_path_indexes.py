@@ -0,0 +1,54 @@
+"""hot path indexes
+
+Composite indexes for the queries every page load runs:
+
+  - diagnosis history by user, newest first (keyset on created_at, diagnosis_id;
+    INCLUDEs the history filter columns)
+  - diagnoses by farm, newest first
+  - images by diagnosis (selectinload of Diagnosis.images)
+  - farms by user, units by farm (selectinload of Farm.units)
+  - notifications by user, newest first
+
+Built CONCURRENTLY so writes to existing tables are not blocked while they
+build; IF NOT EXISTS because databases created by create_all() after the
+models declared them already have some.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 23:05:41.118204
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_diagnoses_user_history', 'diagnoses', ['user_id', 'created_at DESC', 'diagnosis_id DESC'],
+     {'postgresql_include': ['farm_id', 'status', 'target_species']}),
+    ('ix_diagnoses_farm_history', 'diagnoses', ['farm_id', 'created_at DESC', 'diagnosis_id DESC'], {}),
+    ('ix_diagnosis_images_diagnosis', 'diagnosis_images', ['diagnosis_id', 'captured_at'], {}),
+    ('ix_farms_user', 'farms', ['user_id', 'created_at'], {}),
+    ('ix_farm_units_farm', 'farm_units', ['farm_id', 'created_at'], {}),
+    ('ix_notifications_user_history', 'notifications', ['user_id', 'created_at DESC'],
+     {'postgresql_include': ['is_read']}),
+)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name, table, [sa.text(c) for c in columns],
+                postgresql_concurrently=True, if_not_exists=True, **options,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -15,16 +15,27 @@ Index → Class mapping:
   5: Not_fish
   6: Parasitic diseases
   7: Viral diseases White tail disease
+
+Optional cascade: a MobileNetV3-Large gate trained on the same 8 classes
+sees every image at 224x224 first. Images it confidently calls Not_fish
+or Healthy Fish are answered by the gate; everything else (diseases and
+anything ambiguous) escalates to B4.
 """
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from torchvision import transforms
-from torchvision.models import efficientnet_b4, EfficientNet_B4_Weights
-from PIL import Image
-import numpy as np
-from typing import Dict, List
+from torchvision.models import efficientnet_b4, EfficientNet_B4_Weights, mobilenet_v3_large
+from typing import Dict, List, Optional, Union
 import os
+import threading
+import time
+
+from app.utils.images import ImageSource, load_rgb, map_isolated, synthetic_jpeg
+from app.utils.predictions import Postprocessor
+from app.utils.runtimes import MIN_AGREEMENT, load_runtime
+from app.utils.weights import load_model
 
 
 IDX_TO_CLASS = {
@@ -41,10 +52,32 @@ IDX_TO_CLASS = {
 # Which classes are considered "healthy" (no treatment needed)
 HEALTHY_CLASSES = {'Healthy Fish', 'Not_fish'}
 
+# High-confidence hits on these are CRITICAL rather than HIGH
+CRITICAL_CLASSES = {'Viral diseases White tail disease', 'Bacterial Red disease'}
+
+# B4 image size is 380x380
+INPUT_SIZE = 380
+
+# Cascade gate runs at MobileNetV3's native resolution
+GATE_INPUT_SIZE = 224
+
+
+def build_gate_model(num_classes: int = len(IDX_TO_CLASS)) -> nn.Module:
+    """MobileNetV3-Large with the same head layout as the poultry model."""
+    gate = mobilenet_v3_large(weights=None)
+    gate.classifier[3] = nn.Sequential(
+        nn.Dropout(p=0.4, inplace=True),
+        nn.Linear(gate.classifier[3].in_features, num_classes),
+    )
+    return gate
+
 
 class DiseaseDetector:
 
-    def __init__(self, model_path: str, device: str = None):
+    def __init__(self, model_path: str, device: str = None, draft_decode: bool = True, backend: str = 'eager',
+                 channels_last: bool = False, min_agreement: float = MIN_AGREEMENT,
+                 gate_path: Optional[str] = None, gate_not_fish_threshold: float = 0.9,
+                 gate_healthy_threshold: float = 0.9, mmap_weights: bool = True):
         if device is None:
             self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         else:
@@ -52,24 +85,51 @@ class DiseaseDetector:
 
         print(f"Loading model on device: {self.device}")
 
-        state_dict = torch.load(model_path, map_location=self.device, weights_only=False)
-
         self.num_classes = len(IDX_TO_CLASS)
         self.idx_to_class = IDX_TO_CLASS
         self.class_to_idx = {v: k for k, v in IDX_TO_CLASS.items()}
 
         # Build EfficientNet-B4 with custom head
-        self.model = efficientnet_b4(weights=None)
-        in_features = self.model.classifier[1].in_features
-        self.model.classifier[1] = nn.Linear(in_features, self.num_classes)
+        def build():
+            model = efficientnet_b4(weights=None)
+            model.classifier[1] = nn.Linear(model.classifier[1].in_features, self.num_classes)
+            return model
 
-        self.model.load_state_dict(state_dict)
-        self.model.to(self.device)
+        self.mmap_weights = mmap_weights
+        self.model, self.weights_mapped = load_model(build, model_path, self.device, mmap=mmap_weights)
         self.model.eval()
 
-        # B4 image size is 380x380
+        # eager / torchscript / onnxruntime / int8 — all return logits of the same shape
+        self.runtime = load_runtime(backend, self.model, model_path, self.device, min_agreement=min_agreement)
+        self.backend = self.runtime.name
+
+        # NHWC lets oneDNN pick faster conv kernels; ORT wants plain NCHW arrays
+        self.memory_format = torch.contiguous_format
+        if channels_last and self.backend != "onnxruntime":
+            self.memory_format = torch.channels_last
+            self.model.to(memory_format=self.memory_format)
+            self.weights_mapped = False  # conv weights were re-laid out into new memory
+
+        names = [IDX_TO_CLASS[i] for i in range(self.num_classes)]
+        self._postprocess = Postprocessor(
+            names, HEALTHY_CLASSES, {n: 'CRITICAL' for n in CRITICAL_CLASSES},
+            label=lambda n: (n.lower().replace(' ', '_'), n),
+        )
+
+        self.gate = self._load_gate(gate_path) if gate_path else None
+        # Per-class acceptance threshold for the gate; > 1 means "always escalate"
+        self.gate_thresholds = {'Not_fish': gate_not_fish_threshold, 'Healthy Fish': gate_healthy_threshold}
+        self._gate_thresholds = torch.tensor(
+            [self.gate_thresholds.get(n, 2.0) for n in names], device=self.device
+        )
+        # The thread executor runs batches of this one detector concurrently
+        self._counters_lock = threading.Lock()
+        self.counters = {'images': 0, 'escalated': 0, 'gate_seconds': 0.0, 'full_seconds': 0.0}
+
+        self.input_size = INPUT_SIZE
+        self.draft_decode = draft_decode
         self.transform = transforms.Compose([
-            transforms.Resize((380, 380)),
+            transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
             transforms.ToTensor(),
             transforms.Normalize(
                 mean=[0.485, 0.456, 0.406],
@@ -81,59 +141,124 @@ class DiseaseDetector:
         print(f"  Classes: {list(IDX_TO_CLASS.values())}")
         print(f"  Device: {self.device}")
 
-    def predict(self, image_path: str, top_k: int = 3) -> Dict:
-        image = Image.open(image_path).convert('RGB')
-        tensor = self.transform(image).unsqueeze(0).to(self.device)
+    def _load_gate(self, path: str) -> Optional[nn.Module]:
+        if not os.path.exists(path):
+            print(f" Gate model not found at {path} — cascade disabled")
+            return None
+        gate, _ = load_model(lambda: build_gate_model(self.num_classes), path, self.device, mmap=self.mmap_weights)
+        gate.to(memory_format=self.memory_format)
+        gate.eval()
+        print(f"✓ Cascade gate loaded from: {path}")
+        return gate
+
+    def preprocess(self, source: ImageSource) -> torch.Tensor:
+        """Decode + transform one image into a (3, 380, 380) tensor."""
+        image = load_rgb(source, draft_size=self.input_size if self.draft_decode else None)
+        return self.transform(image)
+
+    def predict(self, source: ImageSource, top_k: int = 3) -> Dict:
+        """`source` may be a file path, encoded image bytes or a file-like object."""
+        return self.predict_tensors([self.preprocess(source)], top_k=top_k)[0]
+
+    def predict_tensors(self, tensors: List[torch.Tensor], top_k: int = 3) -> List[Dict]:
+        """Run one forward pass over already-preprocessed images."""
+        batch = torch.stack(tensors).to(self.device, memory_format=self.memory_format)
+
+        with torch.inference_mode():
+            self._count(images=len(batch))
+            if self.gate is None:
+                probs = self._forward_full(batch)
+            else:
+                probs = self._forward_cascade(batch)
+
+        return self._postprocess(probs.cpu(), top_k)
 
-        with torch.no_grad():
-            outputs = self.model(tensor)
-            probs = torch.nn.functional.softmax(outputs, dim=1)
+    def _forward_full(self, batch: torch.Tensor) -> torch.Tensor:
+        start = time.perf_counter()
+        probs = torch.nn.functional.softmax(self.runtime(batch), dim=1)
+        self._count(full_seconds=time.perf_counter() - start)
+        return probs
 
-        probs_np = probs.cpu().numpy()[0]
-        top_indices = np.argsort(probs_np)[::-1][:top_k]
+    def _forward_cascade(self, batch: torch.Tensor) -> torch.Tensor:
+        start = time.perf_counter()
+        small = F.interpolate(batch, size=(GATE_INPUT_SIZE, GATE_INPUT_SIZE),
+                              mode='bilinear', antialias=True, align_corners=False)
+        probs = torch.nn.functional.softmax(self.gate(small), dim=1)
+        self._count(gate_seconds=time.perf_counter() - start)
 
-        predictions = []
-        for idx in top_indices:
-            name = self.idx_to_class[idx]
-            conf = float(probs_np[idx])
-            predictions.append({
-                'disease_code':       name.lower().replace(' ', '_'),
-                'disease_name':       name,
-                'confidence':         conf,
-                'confidence_percent': round(conf * 100, 2),
-            })
+        conf, idx = probs.max(dim=1)
+        escalate = conf < self._gate_thresholds[idx]
+        n_escalate = int(escalate.sum())
+        self._count(escalated=n_escalate)
 
-        primary = predictions[0]
-        is_healthy = primary['disease_name'] in HEALTHY_CLASSES
-        severity = self._severity(primary['disease_name'], primary['confidence'])
+        if n_escalate:
+            probs[escalate] = self._forward_full(batch[escalate]).to(probs.dtype)
+        return probs
 
+    def _count(self, **deltas):
+        with self._counters_lock:
+            for key, delta in deltas.items():
+                self.counters[key] += delta
+
+    def cascade_stats(self, counters: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Escalation rate and estimated B4 time saved. `counters` defaults to
+        this process's own; the process pool passes the sum over workers.
+        """
+        if self.gate is None:
+            return None
+        c = counters
+        if c is None:
+            with self._counters_lock:
+                c = dict(self.counters)
+        images, escalated = c['images'], c['escalated']
+        full_ms = c['full_seconds'] * 1000 / escalated if escalated else 0.0
+        gate_ms = c['gate_seconds'] * 1000 / images if images else 0.0
         return {
-            'primary_prediction': {**primary, 'severity': severity},
-            'all_predictions':    predictions,
-            'is_healthy':         is_healthy,
-            'needs_treatment':    not is_healthy and primary['confidence'] > 0.5,
+            'images':               images,
+            'escalated':            escalated,
+            'escalation_rate':      round(escalated / images, 4) if images else 0.0,
+            'gate_ms_per_image':    round(gate_ms, 2),
+            'full_ms_per_image':    round(full_ms, 2),
+            'estimated_ms_saved':   round((images - escalated) * full_ms - c['gate_seconds'] * 1000, 1),
         }
 
-    def _severity(self, disease_name: str, confidence: float) -> str:
-        if disease_name in HEALTHY_CLASSES:
-            return 'NONE'
-        if confidence >= 0.8:
-            return 'CRITICAL' if disease_name in (
-                'Viral diseases White tail disease',
-                'Bacterial Red disease'
-            ) else 'HIGH'
-        if confidence >= 0.6:
-            return 'MEDIUM'
-        return 'LOW'
-
-    def batch_predict(self, image_paths: List[str]) -> List[Dict]:
+    def predict_many(self, sources: List[ImageSource], top_k: int = 3) -> List[Union[Dict, Exception]]:
+        """
+        Decode in parallel, then one forward pass for everything that decoded.
+        A source that fails to decode yields its exception in place.
+        """
+        decoded = map_isolated(self.preprocess, sources)
+        tensors = [t for t in decoded if not isinstance(t, Exception)]
+        if not tensors:
+            return decoded
+
+        results = iter(self.predict_tensors(tensors, top_k=top_k))
+        return [d if isinstance(d, Exception) else next(results) for d in decoded]
+
+    def warm_up(self, batch_size: int):
+        """One decode + forward pass at `batch_size` on synthetic images; not counted in stats."""
+        self.predict_many([synthetic_jpeg()] * batch_size)
+        if self.gate is not None:
+            # The gate may settle the synthetic images itself, so run B4 at this size too
+            batch = torch.zeros(batch_size, 3, INPUT_SIZE, INPUT_SIZE)
+            with torch.inference_mode():
+                self.runtime(batch.to(self.device, memory_format=self.memory_format))
+        with self._counters_lock:
+            self.counters = {key: type(value)() for key, value in self.counters.items()}
+
+    def batch_predict(self, image_paths: List[str], top_k: int = 3, batch_size: int = 16) -> List[Dict]:
         results = []
-        for path in image_paths:
+        for start in range(0, len(image_paths), batch_size):
+            chunk = image_paths[start:start + batch_size]
             try:
-                r = self.predict(path)
-                r['image_path'] = path
-                r['status'] = 'success'
+                outcomes = self.predict_many(chunk, top_k=top_k)
             except Exception as e:
-                r = {'image_path': path, 'status': 'error', 'error': str(e)}
-            results.append(r)
+                outcomes = [e] * len(chunk)
+
+            for path, r in zip(chunk, outcomes):
+                if isinstance(r, Exception):
+                    results.append({'image_path': path, 'status': 'error', 'error': str(r)})
+                else:
+                    results.append({**r, 'image_path': path, 'status': 'success'})
         return results
@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 0
+    DATABASE_AUTO_MIGRATE: bool = True  # run `alembic upgrade head` on startup
     
     # Redis
     REDIS_URL: str
@@ -40,6 +41,7 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
     ALLOWED_IMAGE_EXTENSIONS: str = ".jpg,.jpeg,.png,.gif"
     UPLOAD_DIR: str = "./uploads"
+    MAX_BATCH_UPLOAD_FILES: int = 50
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -60,7 +62,68 @@ class Settings(BaseSettings):
     MODEL_PATH: str = "./models/best_B4_wiener_False.pth"       # fish
     POULTRY_MODEL_PATH: str = "./models/best_model.pt"  # ← ADD THIS
     MODEL_VERSION: str = "1.0.0"
-    
+    JPEG_DRAFT_DECODE: bool = True   # decode JPEGs at reduced DCT scale (see utils/images.py)
+    MODEL_BACKEND: str = "eager"     # "eager" | "torchscript" | "onnxruntime" | "int8"
+    MODEL_CHANNELS_LAST: bool = False
+    MODEL_MMAP_WEIGHTS: bool = True  # mmap .pth / .safetensors weights (app/utils/weights.py)
+    MODEL_MIN_AGREEMENT: float = 0.98  # int8 is refused below this top-1 agreement (scripts/quantization_report.py)
+
+    # Fish cascade: MobileNetV3 gate answers confident Not_fish / Healthy Fish, the rest go to B4
+    FISH_GATE_MODEL_PATH: str = ""            # empty = cascade off (scripts/train_gate.py)
+    FISH_GATE_NOT_FISH_THRESHOLD: float = 0.9
+    FISH_GATE_HEALTHY_THRESHOLD: float = 0.9
+
+    # /detection/predict: poultry model first, fish B4 when poultry says non_poultry or is unsure
+    ROUTE_POULTRY_MIN_CONFIDENCE: float = 0.5
+
+    # Inference micro-batching (per model)
+    FISH_MAX_BATCH_SIZE: int = 8
+    FISH_MAX_BATCH_WAIT_MS: int = 10
+    POULTRY_MAX_BATCH_SIZE: int = 16
+    POULTRY_MAX_BATCH_WAIT_MS: int = 5
+
+    # Inference executor
+    INFERENCE_BACKEND: str = "thread"  # "thread" | "process" (shared-weight worker processes)
+    INFERENCE_WORKERS: int = 1         # threads, or processes when backend=process (0 = one per core)
+    INFERENCE_TORCH_THREADS: int = 0   # 0 = torch default (all cores)
+    INFERENCE_MAX_QUEUE: int = 64      # queued images per model before 503
+
+    # Warm-up before /ready reports ready (synthetic batches through each model)
+    WARMUP_PASSES: int = 2           # per batch size, 0 = skip warm-up
+    WARMUP_BATCH_SIZES: str = ""     # e.g. "1,4,8"; empty = every size up to the model's max batch size
+
+    # Shadow evaluation of a candidate ModelVersion (POST /models/versions/{id}/shadow)
+    SHADOW_SAMPLE_RATE: float = 0.05  # fraction of served images also sent to the candidate
+    SHADOW_MAX_PENDING: int = 8       # images queued for the candidate before samples are dropped
+    SHADOW_CPU_BUDGET: float = 0.25   # candidate CPU time / wall time before samples are dropped
+
+    # Per-image top-k Prediction rows, written in bulk off the request path
+    PREDICTION_WRITE_ENABLED: bool = True
+    PREDICTION_WRITE_BATCH: int = 200      # rows per multi-row INSERT
+    PREDICTION_WRITE_FLUSH_MS: int = 1000  # flush at least this often
+    PREDICTION_WRITE_MAX_BUFFER: int = 10000  # oldest rows dropped beyond this
+
+    # Async-mode uploads (POST /detection/{id}/images/async)
+    DIAGNOSIS_QUEUE_REDIS: bool = True          # durable queue in REDIS_URL; in-process queue if False or unreachable
+    DIAGNOSIS_QUEUE_KEY: str = "diagnosis:jobs"
+    DIAGNOSIS_JOB_CONCURRENCY: int = 4          # jobs in flight per API worker
+    DIAGNOSIS_JOB_MAX_ATTEMPTS: int = 3         # retries when the inference queue is full
+
+    # Server-sent event streams (/notifications/stream, /detection/{id}/events)
+    EVENTS_REDIS: bool = True            # fan out across workers through REDIS_URL; this worker only if False
+    EVENTS_REPLAY: int = 100             # events kept per user for Last-Event-ID resume
+    EVENTS_HEARTBEAT_SECONDS: int = 15   # comment line sent on idle streams so proxies keep them open
+
+    # Disease / symptom catalogue cache (GET /diseases, GET /symptoms)
+    CATALOGUE_CACHE_TTL: int = 300            # seconds; invalidated on every admin edit anyway
+    CATALOGUE_CACHE_MAX_ENTRIES: int = 256    # distinct (list, skip, limit) pages kept
+    CATALOGUE_CACHE_REDIS: bool = True        # invalidate other workers through REDIS_URL
+
+    # Prediction cache (keyed by image hash + model + MODEL_VERSION)
+    PREDICTION_CACHE_SIZE: int = 1024       # in-process LRU entries, 0 = cache disabled
+    PREDICTION_CACHE_REDIS: bool = True     # also share results through REDIS_URL
+    PREDICTION_CACHE_TTL: int = 86400       # seconds, Redis tier only
+
     class Config:
         env_file = ".env"
         case_sensitive = True
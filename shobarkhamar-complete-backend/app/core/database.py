@@ -1,7 +1,15 @@
+import os
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+# Revision matching the schema create_all() built before migrations existed
+BASELINE_REVISION = "0001"
+# pg_advisory_lock key, so only one worker migrates at a time
+MIGRATION_LOCK = 0x5B0A
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -39,10 +47,32 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def _migrate(connection):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+
+    connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK})
+    try:
+        tables = inspect(connection).get_table_names()
+        # Alembic manages its own transactions (some migrations need autocommit)
+        connection.commit()
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK})
+        connection.commit()
+
+
 async def init_db():
-    """Initialize database tables"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Bring the schema up to date (alembic upgrade head)"""
+    if not settings.DATABASE_AUTO_MIGRATE:
+        return
+    async with engine.connect() as conn:
+        await conn.run_sync(_migrate)
 
 
 async def close_db():
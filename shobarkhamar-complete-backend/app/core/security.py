@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 import uuid
@@ -12,6 +12,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT Bearer token
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 BLACKLIST_PREFIX = "blacklist:"
 
@@ -82,6 +83,25 @@ async def get_current_user(
     return payload
 
 
+async def get_stream_user(
+    token: Optional[str] = Query(None, description="Access token, for EventSource clients that cannot set headers"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Dict:
+    """Like get_current_user, but also accepts the token as `?token=`."""
+    if credentials is not None:
+        token = credentials.credentials
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    payload = decode_token(token)
+    if payload.get("type") != "access" or not payload.get("sub"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
+
 async def get_current_active_user(current_user: Dict = Depends(get_current_user)) -> Dict:
     return current_user
 
@@ -0,0 +1,24 @@
+"""
+Inference serving layer sitting between the routers and the detectors.
+"""
+
+from app.inference.executor import InferenceExecutor, InferenceQueueFull
+from app.inference.process_pool import ProcessInferencePool, fork_available
+from app.inference.batching import MicroBatcher
+from app.inference.cache import PredictionCache
+from app.inference.routing import SpeciesRouter
+from app.inference.loading import ModelNotReady, require_batcher
+from app.inference.registry import ModelRegistry
+
+__all__ = [
+    "InferenceExecutor",
+    "InferenceQueueFull",
+    "ProcessInferencePool",
+    "fork_available",
+    "MicroBatcher",
+    "PredictionCache",
+    "SpeciesRouter",
+    "ModelNotReady",
+    "require_batcher",
+    "ModelRegistry",
+]
@@ -0,0 +1,254 @@
+"""
+Dynamic micro-batching for the disease detectors.
+
+Concurrent predict() calls are queued and collected for up to
+`max_wait_ms` or `max_batch_size` images, whichever comes first, then
+run through the detector as one batched forward pass. Each caller gets
+back exactly what `detector.predict()` would have returned.
+
+When an executor is supplied (InferenceExecutor or ProcessInferencePool)
+the forward pass runs there instead of on the event loop, and up to
+`executor.parallelism` batches per model may be in flight at once.
+
+With a PredictionCache, encoded-bytes sources are looked up by content
+hash before queueing, and identical uploads that arrive while the first
+one is still being predicted share its forward pass.
+
+swap() points new batches at another detector (and executor) without
+stopping the batcher; batches already running finish on the old one.
+
+A ShadowEvaluator in `shadow` is handed every finished batch, after the
+callers have their results, to sample for a candidate model.
+"""
+
+import asyncio
+import copy
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.inference.executor import InferenceQueueFull, run_batch
+from app.utils.images import ImageSource
+
+
+class MicroBatcher:
+
+    def __init__(
+        self,
+        detector,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 10,
+        name: str = "model",
+        executor=None,
+        max_queue: int = 64,
+        cache=None,
+        model_version: str = "",
+    ):
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self.name = name
+        self.executor = executor
+        self.max_queue = max(1, max_queue)
+        self.cache = cache
+        self.model_version = model_version
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending_digests: Dict[str, asyncio.Task] = {}
+        self.shadow = None
+
+        self.batches = 0
+        self.images = 0
+        self.max_seen_batch = 0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(getattr(self.executor, "parallelism", 1))
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}-batcher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in list(self._inflight):
+            task.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # Anything still queued will never be served — fail it loudly
+        while self._queue is not None and not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+
+    # ── public API ─────────────────────────────────────────────
+
+    async def predict(self, source: ImageSource) -> Dict:
+        """`source` is a path, encoded bytes or buffer — anything the detector decodes."""
+        if self.cache is None or not isinstance(source, (bytes, bytearray, memoryview)):
+            return await self._enqueue(source)
+
+        digest = self.cache.content_hash(source)
+        cached = await self.cache.get(self.name, self.model_version, digest)
+        if cached is not None:
+            return cached
+
+        # A retry of an upload that is still being predicted shares its result
+        task = self._pending_digests.get(digest)
+        if task is None:
+            task = asyncio.create_task(self._predict_and_store(source, digest))
+            self._pending_digests[digest] = task
+            task.add_done_callback(lambda _: self._pending_digests.pop(digest, None))
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _predict_and_store(self, source: ImageSource, digest: str) -> Dict:
+        version = self.model_version
+        result = await self._enqueue(source)
+        # Computed by the model we swapped away from while waiting — not worth keeping
+        if version == self.model_version:
+            await self.cache.set(self.name, version, digest, result)
+        return result
+
+    async def _enqueue(self, source: ImageSource) -> Dict:
+        if self._task is None or self._task.done():
+            await self.start()
+
+        if self._queue.qsize() >= self.max_queue:
+            raise InferenceQueueFull()
+
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((source, fut))
+        return await fut
+
+    def swap(self, detector, model_version: str, executor=None) -> Set[asyncio.Task]:
+        """
+        Send every batch dispatched from now on to `detector`. Returns the
+        batches still running on the previous detector, for the caller to
+        await before releasing it. Nothing queued is dropped.
+        """
+        self.detector = detector
+        self.model_version = model_version
+        if executor is not None:
+            self.executor = executor
+        return set(self._inflight)
+
+    def has_capacity(self, n: int = 1) -> bool:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + n <= self.max_queue
+
+    def stats(self) -> Dict:
+        stats = {
+            "model": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": round(self.images / self.batches, 2) if self.batches else 0.0,
+            "max_batch_seen": self.max_seen_batch,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "model_version": self.model_version,
+            "runtime": getattr(self.detector, "backend", "eager"),
+            "shadow": self.shadow.model_version_id if self.shadow is not None else None,
+        }
+
+        cascade_stats = getattr(self.detector, "cascade_stats", None)
+        if cascade_stats is not None:
+            counters = (
+                self.executor.detector_counters(self.name, self.detector) if self.executor is not None
+                else getattr(self.detector, "counters", None)
+            )
+            stats["cascade"] = cascade_stats(counters) if counters else cascade_stats()
+        return stats
+
+    # ── worker ─────────────────────────────────────────────────
+
+    async def _collect(self) -> List[Tuple[ImageSource, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                # Still drain whatever is already waiting without blocking
+                if self._queue.empty():
+                    break
+                batch.append(self._queue.get_nowait())
+                continue
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            # Wait for a free worker *before* collecting, so requests keep
+            # piling into the next batch while every worker is busy
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            # Bind the batch to the current detector, so a swap() cannot split it
+            task = asyncio.create_task(self._process(batch, self.detector, self.executor))
+            self._inflight.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        self._slots.release()
+
+    async def _process(self, batch: List[Tuple[ImageSource, asyncio.Future]], detector, executor):
+        # Callers that gave up (client disconnect) don't need a forward pass
+        batch = [(src, fut) for src, fut in batch if not fut.done()]
+        if not batch:
+            return
+
+        sources = [src for src, _ in batch]
+        start = time.perf_counter()
+        try:
+            if executor is not None:
+                outcomes = await executor.run_batch(self.name, detector, sources)
+            else:
+                outcomes = run_batch(detector, sources)
+        except asyncio.CancelledError:
+            # stop() cancelled us mid-batch; don't leave the callers hanging
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+            raise
+        except Exception as e:
+            outcomes = [e] * len(batch)
+        elapsed = time.perf_counter() - start
+
+        served = sum(1 for o in outcomes if not isinstance(o, Exception))
+        if served:
+            self.batches += 1
+            self.images += served
+            self.max_seen_batch = max(self.max_seen_batch, served)
+
+        for (_, fut), outcome in zip(batch, outcomes):
+            if fut.done():
+                continue
+            if isinstance(outcome, Exception):
+                fut.set_exception(outcome)
+            else:
+                fut.set_result(outcome)
+
+        if self.shadow is not None:
+            self.shadow.offer(sources, outcomes, elapsed)
+
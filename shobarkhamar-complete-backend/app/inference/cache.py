@@ -0,0 +1,133 @@
+"""
+Content-addressed prediction cache.
+
+Farmers re-upload the same photo and the frontend retries on flaky mobile
+networks, so the same bytes often reach the model more than once. Results
+are keyed by (model name, model version, SHA-256 of the image bytes):
+
+  1. a bounded in-process LRU, checked first;
+  2. an optional Redis tier (REDIS_URL) shared by every worker, with a TTL.
+
+The model version is part of every key, and the LRU drops a model's
+entries as soon as a different version is seen, so swapping weights
+invalidates the cache without any manual flush. The version carries a
+config_fingerprint() of the detector too, so switching backend, memory
+layout, JPEG draft decoding or the fish cascade does the same.
+"""
+
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Optional
+
+KEY_PREFIX = "pred:"
+
+
+def config_fingerprint(detector) -> str:
+    """Settings that change a detector's output for the same weights, e.g. "int8+nhwc+gate=0.9,0.85"."""
+    parts = [getattr(detector, "backend", "eager")]
+    if str(getattr(detector, "memory_format", "")).endswith("channels_last"):
+        parts.append("nhwc")
+    if not getattr(detector, "draft_decode", True):
+        parts.append("full-decode")
+    if getattr(detector, "gate", None) is not None:
+        thresholds = getattr(detector, "gate_thresholds", {})
+        parts.append("gate=" + ",".join(f"{thresholds[k]:g}" for k in sorted(thresholds)))
+    return "+".join(parts)
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries: int = 1024, redis=None, ttl: int = 86400):
+        self.max_entries = max(1, max_entries)
+        self.redis = redis
+        self.ttl = ttl
+
+        self._lru: "OrderedDict[str, Dict]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _key(model: str, version: str, digest: str) -> str:
+        return f"{KEY_PREFIX}{model}:{version}:{digest}"
+
+    def _check_version(self, model: str, version: str):
+        previous = self._versions.get(model)
+        if previous == version:
+            return
+        if previous is not None:
+            stale = f"{KEY_PREFIX}{model}:"
+            for key in [k for k in self._lru if k.startswith(stale)]:
+                del self._lru[key]
+            self.invalidations += 1
+        self._versions[model] = version
+
+    def _remember(self, key: str, result: Dict):
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, model: str, version: str, digest: str) -> Optional[Dict]:
+        self._check_version(model, version)
+        key = self._key(model, version, digest)
+
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+            return copy.deepcopy(self._lru[key])
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+            except Exception:
+                raw = None  # Redis unavailable — behave like a miss
+            if raw is not None:
+                result = json.loads(raw)
+                self._remember(key, result)
+                self.redis_hits += 1
+                return copy.deepcopy(result)
+
+        self.misses += 1
+        return None
+
+    async def set(self, model: str, version: str, digest: str, result: Dict):
+        self._check_version(model, version)
+        key = self._key(model, version, digest)
+        self._remember(key, copy.deepcopy(result))
+
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, self.ttl, json.dumps(result))
+            except Exception:
+                pass
+
+    def clear(self):
+        self._lru.clear()
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "redis": self.redis is not None,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "versions": dict(self._versions),
+        }
@@ -0,0 +1,51 @@
+"""
+Background model loading state.
+
+The lifespan no longer blocks on torch: it starts loading both models in
+worker threads and yields straight away, so auth, farms and diseases are
+served within a second of process start. Until a model has loaded, its
+inference routes answer 503 + Retry-After instead of "model not loaded",
+which tells clients (and the frontend's retry logic) to come back.
+
+`app.state.model_status[name]` is one of:
+
+  loading      load in progress — inference routes return ModelNotReady
+  ready        batcher published on app.state
+  unavailable  module not importable, weights missing or load failed —
+               routes behave as before (503 without Retry-After, or
+               upload without AI)
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+LOADING = "loading"
+READY = "ready"
+UNAVAILABLE = "unavailable"
+
+
+class ModelNotReady(HTTPException):
+    """Raised while a model is still loading (→ 503 + Retry-After)."""
+
+    def __init__(self, name: str, retry_after: int = 5):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"The {name} model is still loading, please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def model_status(state, name: str) -> Optional[str]:
+    return getattr(state, "model_status", {}).get(name)
+
+
+def require_batcher(state, name: str):
+    """
+    The MicroBatcher for model `name` ("fish" / "poultry"), None if that
+    model is unavailable, or ModelNotReady while it is still loading.
+    """
+    batcher = getattr(state, f"{name}_batcher", None)
+    if batcher is None and model_status(state, name) == LOADING:
+        raise ModelNotReady(name)
+    return batcher
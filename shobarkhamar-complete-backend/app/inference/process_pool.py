@@ -0,0 +1,227 @@
+"""
+Multi-process inference pool sharing one copy of the model weights.
+
+The detectors are loaded once in the API process, their parameters are
+moved into shared memory with `model.share_memory()`, and only then are
+the worker processes forked. Every worker therefore maps the same weight
+pages instead of holding its own EfficientNet-B4/MobileNetV3 copy, so N
+workers cost roughly one model's worth of RSS while giving N cores of
+forward-pass throughput. Weights loaded with mmap (app/utils/weights.py)
+are already file-backed pages that fork shares, so they are left in place.
+
+Requires the `fork` start method (Linux, i.e. the Docker image). On
+platforms without it the lifespan falls back to the thread executor.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from app.inference.executor import InferenceQueueFull, run_batch, warm_up
+
+
+# Populated in the parent right before fork; workers inherit it.
+_WORKER_DETECTORS: Dict[str, object] = {}
+# Created before fork too: makes each warm-up task land on a different worker
+_WARMUP_BARRIER = None
+WARMUP_BARRIER_TIMEOUT = 600
+
+
+def fork_available() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _worker_init(torch_threads: int):
+    import torch
+    torch.set_num_threads(max(1, torch_threads))
+
+
+def _worker_ping(_=None) -> int:
+    return os.getpid()
+
+
+def _worker_run_batch(name: str, sources: List) -> tuple:
+    detector = _WORKER_DETECTORS[name]
+    start = time.perf_counter()
+    outcomes = run_batch(detector, sources)
+    # Detector-side counters (e.g. cascade escalations) live in the worker
+    counters = dict(getattr(detector, "counters", {}))
+    return os.getpid(), time.perf_counter() - start, outcomes, counters
+
+
+def _worker_warm_up(batch_sizes: Dict[str, List[int]], passes: int) -> tuple:
+    timings = {name: warm_up(_WORKER_DETECTORS[name], sizes, passes) for name, sizes in batch_sizes.items()}
+    # Hold this worker until every worker has picked up its own warm-up task
+    try:
+        _WARMUP_BARRIER.wait(timeout=WARMUP_BARRIER_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    return os.getpid(), timings
+
+
+class ProcessInferencePool:
+
+    def __init__(self, detectors: Dict[str, object], workers: int = 0, torch_threads: int = 0, max_queue: int = 64):
+        cpus = os.cpu_count() or 1
+        self.workers = workers if workers > 0 else cpus
+        # Split the cores between workers unless told otherwise
+        self.torch_threads = torch_threads if torch_threads > 0 else max(1, cpus // self.workers)
+        self.max_queue = max(1, max_queue)
+
+        for name, detector in detectors.items():
+            try:
+                # mmap-loaded weights are file-backed pages that fork already shares
+                if not getattr(detector, "weights_mapped", False):
+                    detector.model.share_memory()
+                # A TorchScript runtime holds its own copy of the parameters
+                scripted = getattr(getattr(detector, "runtime", None), "module", None)
+                if scripted is not None:
+                    scripted.share_memory()
+                if getattr(detector, "gate", None) is not None:
+                    detector.gate.share_memory()
+            except RuntimeError as e:
+                # e.g. /dev/shm too small in Docker — fork's copy-on-write still shares pages
+                print(f" {name} weights not moved to shared memory ({e}) — relying on copy-on-write")
+            _WORKER_DETECTORS[name] = detector
+
+        global _WARMUP_BARRIER
+        context = multiprocessing.get_context("fork")
+        _WARMUP_BARRIER = context.Barrier(self.workers)
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_worker_init,
+            initargs=(self.torch_threads,),
+        )
+
+        self._pending = 0
+        self._pending_images = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._started_at = time.monotonic()
+        self._worker_stats: Dict[int, Dict[str, float]] = {}
+        self._detector_counters: Dict[tuple, Dict] = {}
+
+    def start(self):
+        """
+        Fork every worker now, before the parent runs any forward pass
+        (OpenMP state does not survive fork) and before requests arrive.
+        """
+        pids = set(self._pool.map(_worker_ping, range(self.workers * 2)))
+        for pid in pids:
+            self._worker_stats.setdefault(pid, {"batches": 0, "images": 0, "busy_seconds": 0.0})
+        self._started_at = time.monotonic()
+        print(f"✓ Inference pool started: {self.workers} workers × {self.torch_threads} torch threads")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def pending_images(self) -> int:
+        return self._pending_images
+
+    @property
+    def parallelism(self) -> int:
+        return self.workers
+
+    def has_capacity(self, images: int = 1) -> bool:
+        # An idle executor takes any batch, even one larger than the bound
+        return not self._pending_images or self._pending_images + images <= self.max_queue
+
+    async def submit(self, fn: Callable, *args, images: int = 1) -> Any:
+        """Run a picklable module-level `fn(*args)` in a worker process."""
+        if not self.has_capacity(images):
+            self.rejected += 1
+            raise InferenceQueueFull()
+
+        self._pending += 1
+        self._pending_images += images
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, partial(fn, *args))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            self._pending_images -= images
+        self.completed += 1
+        return result
+
+    async def run_batch(self, name: str, detector, sources: List) -> List:
+        # `detector` is ignored: the worker uses its inherited shared copy
+        pid, busy, outcomes, counters = await self.submit(_worker_run_batch, name, sources, images=len(sources))
+
+        stats = self._worker_stats.setdefault(pid, {"batches": 0, "images": 0, "busy_seconds": 0.0})
+        stats["batches"] += 1
+        stats["images"] += len(sources)
+        stats["busy_seconds"] += busy
+        self._detector_counters[(name, pid)] = counters
+        return outcomes
+
+    async def warm_up(self, detectors: Dict[str, object], batch_sizes: Dict[str, List[int]], passes: int) -> Dict:
+        """
+        Warm every model in every worker (each has its own kernel caches and
+        allocator). Returns the slowest worker's warm_up() timings per model.
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _worker_warm_up, batch_sizes, passes)
+            for _ in range(self.workers)
+        ))
+
+        slowest: Dict[str, Dict] = {}
+        for _, timings in results:
+            for name, per_size in timings.items():
+                for n, t in per_size.items():
+                    best = slowest.setdefault(name, {}).setdefault(n, t)
+                    if t["first_ms"] > best["first_ms"]:
+                        slowest[name][n] = t
+        return slowest
+
+    def detector_counters(self, name: str, detector) -> Optional[Dict]:
+        """Sum of each worker's latest cumulative counters for model `name`."""
+        snapshots = [c for (n, _), c in self._detector_counters.items() if n == name and c]
+        if not snapshots:
+            return None
+        return {key: sum(c[key] for c in snapshots) for key in snapshots[0]}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "backend": "process",
+            "workers": self.workers,
+            "torch_threads": self.torch_threads,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "pending_images": self._pending_images,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "per_worker": [
+                {
+                    "pid": pid,
+                    "batches": s["batches"],
+                    "images": s["images"],
+                    "busy_seconds": round(s["busy_seconds"], 3),
+                    "utilisation": round(min(s["busy_seconds"] / uptime, 1.0), 4),
+                }
+                for pid, s in sorted(self._worker_stats.items())
+            ],
+        }
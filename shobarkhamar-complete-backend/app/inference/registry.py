@@ -0,0 +1,226 @@
+"""
+Hot-swappable model registry.
+
+Each species serves the active row of the ModelVersion table (seeded from
+MODEL_PATH / POULTRY_MODEL_PATH on first start). Activating another
+version swaps it in without a restart:
+
+  1. the new detector is loaded in a background thread while the old one
+     keeps serving;
+  2. it is warmed up — with the process backend a new worker pool is
+     forked holding the new detector (the old workers cannot see it) and
+     every worker is warmed;
+  3. every batcher is switched over in one step on the event loop, so
+     each batch runs wholly on the old or wholly on the new model;
+  4. batches already running on the old model are drained, then the old
+     pool is shut down and the old detector released.
+
+A failed load or warm-up leaves the old model serving. The prediction
+cache is keyed by model version, so results from the old model are
+never returned for the new one.
+
+A version can also be run as a shadow (app/inference/shadow.py) next to
+the active one before it is activated.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.inference.cache import config_fingerprint
+from app.inference.shadow import CandidateProcess, ShadowEvaluator
+
+
+class ModelRegistry:
+
+    def __init__(
+        self,
+        state,
+        load: Callable[[str, str], Optional[object]],
+        warm_up: Callable[[object, Dict[str, object]], Awaitable],
+        publish: Callable[[str, object, str], None],
+        make_pool: Optional[Callable[[Dict[str, object]], object]] = None,
+        detector_attrs: Optional[Dict[str, str]] = None,
+        version_prefix: str = "",
+    ):
+        self.state = state
+        self._load = load
+        self._warm_up = warm_up
+        self._publish = publish
+        self._make_pool = make_pool
+        self._detector_attrs = detector_attrs or {}
+        self.version_prefix = version_prefix
+        # One swap at a time: a pool rebuild touches every model
+        self._lock = asyncio.Lock()
+
+        self.active: Dict[str, Dict] = {}
+        self.swaps: Dict[str, Dict] = {}
+        self.shadow_loads: Dict[str, Dict] = {}
+
+    def version_key(self, model_version_id, detector=None) -> str:
+        """
+        Batcher / cache version: MODEL_VERSION plus the registry row, when
+        there is one, plus the detector's config fingerprint.
+        """
+        key = self.version_prefix
+        if model_version_id is not None:
+            key = f"{key}/{model_version_id}"
+        if detector is not None:
+            key = f"{key}@{config_fingerprint(detector)}"
+        return key
+
+    def set_active(self, name: str, model_version_id, artifact_uri: str):
+        self.active[name] = {
+            "model_version_id": str(model_version_id) if model_version_id else None,
+            "artifact_uri": artifact_uri,
+        }
+
+    def _detectors(self) -> Dict[str, object]:
+        detectors = {}
+        for name, attr in self._detector_attrs.items():
+            detector = getattr(self.state, attr, None)
+            if detector is not None:
+                detectors[name] = detector
+        return detectors
+
+    async def swap(self, name: str, model_version_id, artifact_uri: str, path: str):
+        """Load, warm and switch to `path` for model `name`; raises if it cannot be served."""
+        swap = self.swaps[name] = {
+            "state": "loading",
+            "model_version_id": str(model_version_id),
+            "artifact_uri": artifact_uri,
+            "started_at": time.time(),
+        }
+        try:
+            async with self._lock:
+                await self._swap(name, model_version_id, path, swap)
+        except BaseException as e:
+            swap.update(state="failed", error=str(e) or type(e).__name__)
+            print(f" {name} swap to {model_version_id} failed: {swap['error']} — still serving the old model")
+            raise
+
+        swap.update(state="active", finished_at=time.time())
+        self.set_active(name, model_version_id, artifact_uri)
+        print(f"✓ {name} now serving model version {model_version_id} ({artifact_uri})")
+
+        # A promoted candidate has nothing left to be compared against
+        batcher = self._batchers().get(name)
+        shadow = getattr(batcher, "shadow", None)
+        if shadow is not None and shadow.model_version_id == str(model_version_id):
+            await self.stop_shadow(name)
+
+    async def _swap(self, name: str, model_version_id, path: str, swap: Dict):
+        detector = await asyncio.to_thread(self._load, name, path)
+        if detector is None:
+            raise RuntimeError(f"could not load {path}")
+
+        detectors = {**self._detectors(), name: detector}
+        old_executor = self.state.inference_executor
+        if self._make_pool is not None:
+            swap["state"] = "starting workers"
+            # Forking and pinging the workers blocks; requests keep being served meanwhile
+            executor = await asyncio.to_thread(self._make_pool, detectors)
+            warm = detectors
+        else:
+            executor = old_executor
+            warm = {name: detector}
+
+        swap["state"] = "warming up"
+        try:
+            await self._warm_up(executor, warm)
+        except BaseException:
+            if executor is not old_executor:
+                executor.shutdown()
+            raise
+
+        # ── switch: no await until every batcher points at the new model ──
+        version = self.version_key(model_version_id, detector)
+        batchers = self._batchers()
+        draining = set()
+        for other, batcher in batchers.items():
+            if other == name:
+                draining |= batcher.swap(detector, version, executor)
+            elif executor is not old_executor:
+                draining |= batcher.swap(batcher.detector, batcher.model_version, executor)
+        self.state.inference_executor = executor
+        if name in batchers:
+            setattr(self.state, self._detector_attrs[name], detector)
+        else:
+            # The model was unavailable until now
+            self._publish(name, detector, version)
+
+        swap["state"] = "draining"
+        swap["draining_batches"] = len(draining)
+        await asyncio.gather(*draining, return_exceptions=True)
+        if old_executor is not None and executor is not old_executor:
+            old_executor.shutdown()
+
+    async def start_shadow(
+        self, name: str, model_version_id, path: str,
+        sample_rate: float, max_pending: int, cpu_budget: float,
+    ):
+        """Load and warm a candidate, then start sampling `name`'s traffic to it."""
+        load = self.shadow_loads[name] = {
+            "state": "loading",
+            "model_version_id": str(model_version_id),
+            "started_at": time.time(),
+        }
+        try:
+            if name not in self._batchers():
+                raise RuntimeError(f"{name} model is not serving")
+            # Loaded in its own process: the candidate never runs here
+            candidate = CandidateProcess(self._load, name, path)
+            await candidate.start()
+
+            shadow = ShadowEvaluator(
+                name, None, model_version_id,
+                sample_rate=sample_rate, max_pending=max_pending, cpu_budget=cpu_budget,
+                executor=candidate,
+            )
+            load["state"] = "warming up"
+            try:
+                await self._warm_up(candidate, {name: None})
+            except BaseException:
+                candidate.shutdown()
+                raise
+        except BaseException as e:
+            load.update(state="failed", error=str(e) or type(e).__name__)
+            print(f" {name} shadow {model_version_id} failed: {load['error']}")
+            raise
+
+        batcher = self._batchers()[name]
+        previous, batcher.shadow = batcher.shadow, shadow
+        if previous is not None:
+            await previous.stop()
+        load.update(state="running", finished_at=time.time())
+        print(f"✓ {name} shadowing model version {model_version_id} on {sample_rate:.0%} of traffic")
+
+    async def stop_shadow(self, name: str) -> bool:
+        batcher = self._batchers().get(name)
+        shadow = getattr(batcher, "shadow", None)
+        if shadow is None:
+            return False
+        batcher.shadow = None
+        await shadow.stop()
+        self.shadow_loads.pop(name, None)
+        return True
+
+    def shadow_stats(self) -> Dict:
+        return {
+            "loads": self.shadow_loads,
+            "running": {
+                name: batcher.shadow.stats()
+                for name, batcher in self._batchers().items()
+                if batcher.shadow is not None
+            },
+        }
+
+    def _batchers(self) -> Dict[str, object]:
+        return {
+            name: batcher
+            for name in self._detector_attrs
+            if (batcher := getattr(self.state, f"{name}_batcher", None)) is not None
+        }
+
+    def stats(self) -> Dict:
+        return {"active": self.active, "swaps": self.swaps}
@@ -0,0 +1,88 @@
+"""
+Automatic species routing for /detection/predict.
+
+Both models have a "not my species" class (poultry `non_poultry`, fish
+`Not_fish`), so the client does not have to know which one to call. Every
+image goes to the poultry MobileNet first (224x224, cheap); only images it
+calls `non_poultry`, or cannot place with at least `min_confidence`, are
+sent on to the fish B4.
+
+Both hops go through the models' MicroBatchers, so routed requests share
+forward passes (and the prediction cache) with each other and with direct
+/fish/predict and /poultry/predict traffic.
+"""
+
+from typing import Dict, Optional
+
+from app.utils.images import ImageSource
+
+# Same values as models.disease.TargetSpecies
+FISH = "FISH"
+POULTRY = "POULTRY"
+
+NON_POULTRY = "non_poultry"
+NOT_FISH = "not_fish"
+
+
+def _primary(result: Optional[Dict]):
+    if result is None:
+        return None, 0.0
+    primary = result["primary_prediction"]
+    return primary["disease_code"], primary["confidence"]
+
+
+class SpeciesRouter:
+
+    def __init__(self, poultry_batcher=None, fish_batcher=None, min_confidence: float = 0.5):
+        self.poultry = poultry_batcher
+        self.fish = fish_batcher
+        self.min_confidence = min_confidence
+
+        self.routed = {POULTRY: 0, FISH: 0, "unknown": 0}
+        self.escalated = 0
+
+    @property
+    def available(self) -> bool:
+        return self.poultry is not None or self.fish is not None
+
+    async def predict(self, source: ImageSource) -> Dict:
+        """
+        The chosen model's prediction plus `species` (FISH, POULTRY or None
+        when neither model recognises the animal) and the `routing` trail.
+        """
+        poultry = await self.poultry.predict(source) if self.poultry is not None else None
+        poultry_code, poultry_conf = _primary(poultry)
+        routing = {"poultry": {"disease_code": poultry_code, "confidence": poultry_conf} if poultry else None,
+                   "fish": None}
+
+        if poultry is not None and poultry_code != NON_POULTRY and poultry_conf >= self.min_confidence:
+            return self._result(POULTRY, poultry, routing)
+
+        if self.fish is None:
+            species = POULTRY if poultry_code not in (None, NON_POULTRY) else None
+            return self._result(species, poultry, routing)
+
+        self.escalated += 1
+        fish = await self.fish.predict(source)
+        fish_code, fish_conf = _primary(fish)
+        routing["fish"] = {"disease_code": fish_code, "confidence": fish_conf}
+
+        if fish_code != NOT_FISH:
+            return self._result(FISH, fish, routing)
+        # Fish rejected it too: fall back to a low-confidence poultry guess if there was one
+        if poultry_code not in (None, NON_POULTRY):
+            return self._result(POULTRY, poultry, routing)
+        return self._result(None, fish, routing)
+
+    def _result(self, species: Optional[str], prediction: Dict, routing: Dict) -> Dict:
+        self.routed[species or "unknown"] += 1
+        return {**prediction, "species": species, "routing": routing}
+
+    def stats(self) -> Dict:
+        total = sum(self.routed.values())
+        return {
+            "routed": dict(self.routed),
+            "escalated_to_fish": self.escalated,
+            "escalation_rate": round(self.escalated / total, 4) if total else 0.0,
+            "min_confidence": self.min_confidence,
+        }
@@ -0,0 +1,283 @@
+"""
+Shadow evaluation of a candidate model on live traffic.
+
+A ShadowEvaluator hangs off a model's MicroBatcher. After each batch the
+active model has answered, a `sample_rate` fraction of its images is sent
+to the candidate in the background and the two predictions are compared:
+top-1 agreement, confidence and per-image latency. Clients never wait for
+the candidate.
+
+The candidate runs in its own spawned worker process (CandidateProcess)
+with one torch thread, so it uses at most one core. The API process
+never runs a candidate forward pass: with the process backend, a later
+hot swap can still fork serving workers from a parent that has not
+initialised OpenMP.
+
+The candidate is capped three ways so it cannot eat into serving:
+
+  sample_rate    fraction of served images offered to it
+  max_pending    images waiting for or running on the candidate; samples
+                 beyond this are dropped instead of queued
+  cpu_budget     CPU time the candidate has used, as a fraction of wall
+                 time since the shadow started; samples are dropped
+                 while it is over
+"""
+
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.inference.executor import run_batch, warm_up
+
+# Per-image latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+DISAGREEMENTS_KEPT = 20
+
+
+def _top1(result: Dict):
+    primary = result["primary_prediction"]
+    return primary["disease_code"], primary["confidence"]
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+# Set in the candidate process by _candidate_init
+_CANDIDATE = None
+
+
+def _candidate_init(load: Callable[[str, str], Optional[object]], name: str, path: str):
+    global _CANDIDATE
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    _CANDIDATE = load(name, path)
+
+
+def _candidate_loaded(_=None) -> bool:
+    return _CANDIDATE is not None
+
+
+def _candidate_run_batch(sources: List) -> Tuple[List, float]:
+    # process_time covers every thread of the process, torch's included
+    start = time.process_time()
+    outcomes = run_batch(_CANDIDATE, sources)
+    return outcomes, time.process_time() - start
+
+
+def _candidate_warm_up(batch_sizes: List[int], passes: int) -> Dict:
+    return warm_up(_CANDIDATE, batch_sizes, passes)
+
+
+class CandidateProcess:
+    """
+    One spawned worker process that loads the candidate with `load(name, path)`.
+
+    It is spawned, not forked, so it starts from a clean interpreter
+    whatever the API process has already run.
+    """
+
+    def __init__(self, load: Callable[[str, str], Optional[object]], name: str, path: str):
+        self.name = name
+        self._pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_candidate_init,
+            initargs=(load, name, path),
+        )
+
+    async def start(self):
+        """Wait for the worker to load the candidate; raises if it could not."""
+        loop = asyncio.get_running_loop()
+        try:
+            loaded = await loop.run_in_executor(self._pool, _candidate_loaded)
+        except BaseException:
+            # An exception in the initializer breaks the pool
+            self.shutdown()
+            raise
+        if not loaded:
+            self.shutdown()
+            raise RuntimeError(f"candidate {self.name} model could not be loaded")
+
+    async def run(self, sources: List) -> Tuple[List, float]:
+        """Outcomes for `sources` and the CPU seconds they took."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _candidate_run_batch, sources)
+
+    async def warm_up(self, detectors: Dict[str, object], batch_sizes: Dict[str, List[int]], passes: int) -> Dict:
+        loop = asyncio.get_running_loop()
+        return {self.name: await loop.run_in_executor(self._pool, _candidate_warm_up, batch_sizes[self.name], passes)}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class CandidateThread:
+    """
+    In-process stand-in for CandidateProcess, for detectors that cannot be
+    sent to another process (the fakes in tests). Only the calling thread's
+    CPU time is counted, so use CandidateProcess for real models.
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def _run(self, sources: List) -> Tuple[List, float]:
+        start = time.thread_time()
+        outcomes = run_batch(self.detector, sources)
+        return outcomes, time.thread_time() - start
+
+    async def run(self, sources: List) -> Tuple[List, float]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._run, sources)
+
+    async def warm_up(self, detectors: Dict[str, object], batch_sizes: Dict[str, List[int]], passes: int) -> Dict:
+        loop = asyncio.get_running_loop()
+        return {
+            name: await loop.run_in_executor(self._pool, warm_up, self.detector, sizes, passes)
+            for name, sizes in batch_sizes.items()
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ShadowEvaluator:
+
+    def __init__(
+        self,
+        name: str,
+        detector,
+        model_version_id,
+        sample_rate: float = 0.05,
+        max_pending: int = 8,
+        cpu_budget: float = 0.25,
+        executor=None,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.name = name
+        self.detector = detector
+        self.model_version_id = str(model_version_id)
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_pending = max(1, max_pending)
+        self.cpu_budget = max(cpu_budget, 0.0)
+        # CandidateProcess from the registry; `detector` is only used without one
+        self.executor = executor or CandidateThread(detector)
+        self._rng = rng
+
+        self._tasks = set()
+        self._pending = 0
+        self._started_at = time.monotonic()
+        self.cpu_seconds = 0.0
+
+        self.offered = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.failed = 0
+        self.compared = 0
+        self.agreed = 0
+        self.confidence_delta = 0.0
+        self.primary_ms = deque(maxlen=LATENCY_WINDOW)
+        self.shadow_ms = deque(maxlen=LATENCY_WINDOW)
+        self.disagreements = deque(maxlen=DISAGREEMENTS_KEPT)
+
+    def _within_budget(self) -> bool:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return self.cpu_seconds <= self.cpu_budget * elapsed
+
+    def offer(self, sources: List, outcomes: List, primary_seconds: float):
+        """Called by the batcher with a finished batch; never blocks or raises."""
+        served = [(src, out) for src, out in zip(sources, outcomes) if not isinstance(out, Exception)]
+        self.offered += len(served)
+        picks = [(src, out) for src, out in served if self._rng() < self.sample_rate]
+        if not picks:
+            return
+        if self._pending + len(picks) > self.max_pending or not self._within_budget():
+            self.dropped += len(picks)
+            return
+
+        self.sampled += len(picks)
+        self._pending += len(picks)
+        primary_ms = primary_seconds * 1000 / max(len(sources), 1)
+        task = asyncio.create_task(self._evaluate(picks, primary_ms))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate(self, picks: List, primary_ms: float):
+        start = time.perf_counter()
+        try:
+            outcomes, cpu_seconds = await self.executor.run([src for src, _ in picks])
+        except Exception:
+            self.failed += len(picks)
+            return
+        finally:
+            self._pending -= len(picks)
+        self.cpu_seconds += cpu_seconds
+
+        shadow_ms = (time.perf_counter() - start) * 1000 / len(picks)
+        for (_, primary), shadow in zip(picks, outcomes):
+            if isinstance(shadow, Exception):
+                self.failed += 1
+                continue
+            self._compare(primary, shadow, primary_ms, shadow_ms)
+
+    def _compare(self, primary: Dict, shadow: Dict, primary_ms: float, shadow_ms: float):
+        primary_code, primary_conf = _top1(primary)
+        shadow_code, shadow_conf = _top1(shadow)
+
+        self.compared += 1
+        self.confidence_delta += shadow_conf - primary_conf
+        self.primary_ms.append(primary_ms)
+        self.shadow_ms.append(shadow_ms)
+        if primary_code == shadow_code:
+            self.agreed += 1
+        else:
+            self.disagreements.append({
+                "active": {"disease_code": primary_code, "confidence": round(primary_conf, 4)},
+                "candidate": {"disease_code": shadow_code, "confidence": round(shadow_conf, 4)},
+                "at": time.time(),
+            })
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown()
+
+    def stats(self) -> Dict:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "model": self.name,
+            "model_version_id": self.model_version_id,
+            "sample_rate": self.sample_rate,
+            "max_pending": self.max_pending,
+            "cpu_budget": self.cpu_budget,
+            "cpu_used": round(self.cpu_seconds / elapsed, 4),
+            "offered": self.offered,
+            "sampled": self.sampled,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self._pending,
+            "compared": self.compared,
+            "agreement": round(self.agreed / self.compared, 4) if self.compared else None,
+            "mean_confidence_delta": round(self.confidence_delta / self.compared, 4) if self.compared else None,
+            "latency_ms": {
+                "active_p50": _percentile(self.primary_ms, 0.5),
+                "active_p95": _percentile(self.primary_ms, 0.95),
+                "candidate_p50": _percentile(self.shadow_ms, 0.5),
+                "candidate_p95": _percentile(self.shadow_ms, 0.95),
+            },
+            "recent_disagreements": list(self.disagreements),
+        }
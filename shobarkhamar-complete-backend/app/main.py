@@ -1,57 +1,350 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import importlib
 import os
+import time
+
+_STARTED_AT = time.perf_counter()
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
-from app.routers import auth, farms, diseases, diagnosis
+from app.core.database import init_db, close_db, AsyncSessionLocal
+from app.routers import auth, farms, diseases, diagnosis, inference, models, notifications
+from app.inference import (
+    InferenceExecutor, MicroBatcher, ModelRegistry, PredictionCache, ProcessInferencePool, SpeciesRouter, fork_available,
+)
+from app.inference.loading import LOADING, READY, UNAVAILABLE
+from app.services.model_version_service import ModelVersionService, artifact_path
+from app.services.prediction_writer import PredictionWriter
+from app.services.diagnosis_jobs import DiagnosisJobRunner, MemoryJobQueue, RedisJobQueue
+from app.services.events import event_hub
+from app.services.catalogue_cache import catalogue_cache
 
 # ── AI Models ─────────────────────────────────────────────────
-try:
-    from app.ai_model import DiseaseDetector
-    FISH_AI_AVAILABLE = True
-except ImportError:
-    FISH_AI_AVAILABLE = False
-
-try:
-    from app.poultry_model import PoultryDiseaseDetector
-    POULTRY_AI_AVAILABLE = True
-except ImportError:
-    POULTRY_AI_AVAILABLE = False
+# Detector modules (and so torch/torchvision) are imported by the loader
+# threads, not here, so the API answers before any model is in memory.
 
 FISH_MODEL_PATH    = os.getenv("MODEL_PATH",         "/app/models/best_B4_wiener_False.pth")
 POULTRY_MODEL_PATH = os.getenv("POULTRY_MODEL_PATH", "/app/models/best_model.pt")
 
+# name → (module, class, weights, label, app.state attribute)
+MODELS = {
+    "fish":    ("app.ai_model",      "DiseaseDetector",        FISH_MODEL_PATH,    "Fish",    "ai_detector"),
+    "poultry": ("app.poultry_model", "PoultryDiseaseDetector", POULTRY_MODEL_PATH, "Poultry", "poultry_detector"),
+}
 
-def _load_model(available, cls, path, label):
-    if not available:
-        print(f" {label} module not importable — skipping")
-        return None
+
+def _load_model(module, cls_name, path, label, timings, **kwargs):
+    """Runs in a loader thread; records import and load seconds in `timings`."""
     if not os.path.exists(path):
         print(f" {label} model not found at {path} — running without AI inference")
         return None
+
+    start = time.perf_counter()
+    try:
+        cls = getattr(importlib.import_module(module), cls_name)
+    except ImportError:
+        print(f" {label} module not importable — skipping")
+        return None
+    finally:
+        timings["import_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
     try:
-        m = cls(path)
+        m = cls(path, **kwargs)
         print(f"✓ {label} model loaded from: {path}")
         return m
     except Exception as e:
         print(f" {label} model failed to load: {e}")
         return None
+    finally:
+        timings["load_seconds"] = round(time.perf_counter() - start, 3)
+
+
+def _load_named(name: str, path: str, timings=None):
+    module, cls_name, _, label, _ = MODELS[name]
+    return _load_model(module, cls_name, path, label, {} if timings is None else timings, **_model_kwargs(name))
+
+
+async def _active_version(registry: ModelRegistry, name: str) -> str:
+    """Weights path of the active ModelVersion (seeded from the env path on first start)."""
+    default = MODELS[name][2]
+    try:
+        async with AsyncSessionLocal() as db:
+            version = await ModelVersionService.ensure_active(db, name, default)
+        registry.set_active(name, version.model_version_id, version.artifact_uri)
+        return artifact_path(version.artifact_uri)
+    except Exception as e:
+        print(f" Model registry unavailable ({e}) — loading {name} from {default}")
+        registry.set_active(name, None, default)
+        return default
+
+
+def _model_kwargs(name: str) -> dict:
+    kwargs = dict(
+        draft_decode=settings.JPEG_DRAFT_DECODE,
+        backend=settings.MODEL_BACKEND,
+        channels_last=settings.MODEL_CHANNELS_LAST,
+        min_agreement=settings.MODEL_MIN_AGREEMENT,
+        mmap_weights=settings.MODEL_MMAP_WEIGHTS,
+    )
+    if name == "fish":
+        kwargs.update(
+            gate_path=settings.FISH_GATE_MODEL_PATH or None,
+            gate_not_fish_threshold=settings.FISH_GATE_NOT_FISH_THRESHOLD,
+            gate_healthy_threshold=settings.FISH_GATE_HEALTHY_THRESHOLD,
+        )
+    return kwargs
+
+
+def _warmup_plan(detectors) -> dict:
+    max_batch = {"fish": settings.FISH_MAX_BATCH_SIZE, "poultry": settings.POULTRY_MAX_BATCH_SIZE}
+    wanted = [int(n) for n in settings.WARMUP_BATCH_SIZES.split(",") if n.strip()]
+    plan = {}
+    for name in detectors:
+        # Each batch size the batcher can produce gets its own kernel choice
+        sizes = range(1, max_batch[name] + 1)
+        plan[name] = sorted(set(wanted) & set(sizes)) if wanted else list(sizes)
+    return plan
+
+
+async def _warm_detectors(executor, detectors) -> dict:
+    if not detectors or settings.WARMUP_PASSES <= 0:
+        return {}
+    return await executor.warm_up(detectors, _warmup_plan(detectors), settings.WARMUP_PASSES)
+
+
+async def _warm_up(app: FastAPI, executor, detectors):
+    """Runs once the models are loaded; /ready stays 503 until it finishes."""
+    startup = app.state.startup
+    start = time.perf_counter()
+    try:
+        startup["warmup_ms"] = await _warm_detectors(executor, detectors)
+    except Exception as e:
+        print(f" Warm-up failed: {e} — serving cold")
+        startup["warmup_error"] = str(e)
+    startup["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    startup["ready"] = True
+    print(f"✓ Ready (warm-up {startup['warmup_seconds']}s)")
+
+
+def _use_process_pool() -> bool:
+    if settings.INFERENCE_BACKEND != "process":
+        return False
+    if not fork_available():
+        print(" Process inference pool needs the fork start method — using thread executor")
+        return False
+    return True
+
+
+def _make_pool(detectors):
+    pool = ProcessInferencePool(
+        detectors,
+        workers=settings.INFERENCE_WORKERS,
+        torch_threads=settings.INFERENCE_TORCH_THREADS,
+        max_queue=settings.INFERENCE_MAX_QUEUE,
+    )
+    pool.start()
+    return pool
+
+
+def _make_thread_executor():
+    return InferenceExecutor(
+        max_workers=settings.INFERENCE_WORKERS,
+        torch_threads=settings.INFERENCE_TORCH_THREADS,
+        max_queue=settings.INFERENCE_MAX_QUEUE,
+    )
+
+
+async def _make_cache():
+    if settings.PREDICTION_CACHE_SIZE <= 0:
+        return None
+    redis = await auth.get_redis() if settings.PREDICTION_CACHE_REDIS else None
+    print(f"✓ Prediction cache: {settings.PREDICTION_CACHE_SIZE} entries{' + Redis' if redis else ''}")
+    return PredictionCache(
+        max_entries=settings.PREDICTION_CACHE_SIZE,
+        redis=redis,
+        ttl=settings.PREDICTION_CACHE_TTL,
+    )
+
+
+def _make_prediction_writer(registry: ModelRegistry):
+    if not settings.PREDICTION_WRITE_ENABLED:
+        return None
+    return PredictionWriter(
+        active_version=lambda name: registry.active.get(name, {}).get("model_version_id"),
+        batch_size=settings.PREDICTION_WRITE_BATCH,
+        flush_ms=settings.PREDICTION_WRITE_FLUSH_MS,
+        max_buffer=settings.PREDICTION_WRITE_MAX_BUFFER,
+    )
+
+
+async def _start_event_hub():
+    redis = await auth.get_redis() if settings.EVENTS_REDIS else None
+    await event_hub.start(redis, replay=settings.EVENTS_REPLAY)
+    print(f"✓ Event streams: {event_hub.stats()['backend']}")
+
+
+async def _start_catalogue_cache():
+    redis = await auth.get_redis() if settings.CATALOGUE_CACHE_REDIS else None
+    await catalogue_cache.start(
+        redis, ttl=settings.CATALOGUE_CACHE_TTL, max_entries=settings.CATALOGUE_CACHE_MAX_ENTRIES,
+    )
+
+
+async def _make_job_runner(app: FastAPI):
+    redis = await auth.get_redis() if settings.DIAGNOSIS_QUEUE_REDIS else None
+    queue = RedisJobQueue(redis, settings.DIAGNOSIS_QUEUE_KEY) if redis else MemoryJobQueue()
+    print(f"✓ Diagnosis job queue: {queue.backend}")
+    return DiagnosisJobRunner(
+        queue,
+        app.state,
+        concurrency=settings.DIAGNOSIS_JOB_CONCURRENCY,
+        max_attempts=settings.DIAGNOSIS_JOB_MAX_ATTEMPTS,
+    )
+
+
+def _make_batcher(detector, executor, max_batch_size, max_wait_ms, name, cache=None, model_version=None):
+    if detector is None:
+        return None
+    return MicroBatcher(
+        detector,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        name=name,
+        executor=executor,
+        max_queue=settings.INFERENCE_MAX_QUEUE,
+        cache=cache,
+        model_version=model_version or settings.MODEL_VERSION,
+    )
+
+
+def _publish(app: FastAPI, name: str, detector, model_version=None):
+    """Put a loaded model behind its batcher; its routes stop returning 503."""
+    batching = {
+        "fish":    (settings.FISH_MAX_BATCH_SIZE,    settings.FISH_MAX_BATCH_WAIT_MS),
+        "poultry": (settings.POULTRY_MAX_BATCH_SIZE, settings.POULTRY_MAX_BATCH_WAIT_MS),
+    }
+    if model_version is None:
+        registry = app.state.model_registry
+        model_version = registry.version_key(registry.active.get(name, {}).get("model_version_id"), detector)
+    batcher = _make_batcher(
+        detector, app.state.inference_executor, *batching[name], name, app.state.prediction_cache, model_version,
+    )
+    setattr(app.state, MODELS[name][4], detector)
+    setattr(app.state, f"{name}_batcher", batcher)
+    setattr(app.state.species_router, name, batcher)
+    app.state.model_status[name] = READY
+
+
+async def _start_models(app: FastAPI, pool: bool):
+    """
+    Load both models in parallel threads, publish each one as soon as it is
+    usable, then warm up. With the process backend the pool can only fork
+    once every model is in memory, so both are published together.
+    """
+    startup = app.state.startup
+
+    async def load(name):
+        timings = startup["models"][name] = {}
+        path = await _active_version(app.state.model_registry, name)
+        detector = await asyncio.to_thread(_load_named, name, path, timings)
+        if detector is None:
+            app.state.model_status[name] = UNAVAILABLE
+        elif not pool:
+            _publish(app, name, detector)
+        return detector
+
+    try:
+        loaded = await asyncio.gather(*(load(name) for name in MODELS))
+        detectors = {name: d for name, d in zip(MODELS, loaded) if d is not None}
+        if pool and detectors:
+            # The fork carries on in its thread if startup is cancelled; wait for it so
+            # the pool can be shut down rather than leaking its workers
+            making = asyncio.ensure_future(asyncio.to_thread(_make_pool, detectors))
+            try:
+                app.state.inference_executor = await asyncio.shield(making)
+            except asyncio.CancelledError:
+                with suppress(Exception):
+                    (await making).shutdown()
+                raise
+            for name, detector in detectors.items():
+                _publish(app, name, detector)
+    except Exception as e:
+        print(f" Model loading failed: {e} — running without AI inference")
+        for name, status in app.state.model_status.items():
+            if status == LOADING:
+                app.state.model_status[name] = UNAVAILABLE
+        detectors = {}
+    startup["models_loaded_seconds"] = round(time.perf_counter() - _STARTED_AT, 3)
+
+    await _warm_up(app, app.state.inference_executor, detectors)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    app.state.startup = {
+        "ready": False,
+        "models": {},
+        "models_loaded_seconds": None,
+        "warmup_seconds": None,
+        "warmup_ms": {},
+    }
+
+    # Routers see "loading" (503 + Retry-After) until _publish() swaps the batcher in
+    app.state.model_status = {name: LOADING for name in MODELS}
+    for name, (*_, attr) in MODELS.items():
+        setattr(app.state, attr, None)
+        setattr(app.state, f"{name}_batcher", None)
+    app.state.species_router = SpeciesRouter(min_confidence=settings.ROUTE_POULTRY_MIN_CONFIDENCE)
 
-    
-    app.state.ai_detector      = _load_model(FISH_AI_AVAILABLE,    DiseaseDetector if FISH_AI_AVAILABLE else None,       FISH_MODEL_PATH,    "Fish")
-    app.state.poultry_detector = _load_model(POULTRY_AI_AVAILABLE, PoultryDiseaseDetector if POULTRY_AI_AVAILABLE else None, POULTRY_MODEL_PATH, "Poultry")
+    # Forward passes run off the event loop; the process pool is created once models are in
+    pool = _use_process_pool()
+    app.state.inference_executor = None if pool else _make_thread_executor()
+    app.state.prediction_cache = await _make_cache()
+    app.state.model_registry = ModelRegistry(
+        app.state,
+        load=_load_named,
+        warm_up=_warm_detectors,
+        publish=lambda name, detector, version: _publish(app, name, detector, version),
+        make_pool=_make_pool if pool else None,
+        detector_attrs={name: spec[4] for name, spec in MODELS.items()},
+        version_prefix=settings.MODEL_VERSION,
+    )
+    app.state.prediction_writer = _make_prediction_writer(app.state.model_registry)
+    if app.state.prediction_writer is not None:
+        await app.state.prediction_writer.start()
+    await _start_event_hub()
+    await _start_catalogue_cache()
+    # Jobs wait (ModelNotReady is retried) until their model is published
+    app.state.diagnosis_jobs = await _make_job_runner(app)
+    await app.state.diagnosis_jobs.start()
+
+    models_task = asyncio.create_task(_start_models(app, pool))
 
     yield
 
+    # Stop loading first, so nothing is published while the rest shuts down
+    models_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await models_task
+    await app.state.diagnosis_jobs.stop()
+    for name in MODELS:
+        await app.state.model_registry.stop_shadow(name)
+    for batcher in (app.state.fish_batcher, app.state.poultry_batcher):
+        if batcher is not None:
+            await batcher.stop()
+    if app.state.inference_executor is not None:
+        app.state.inference_executor.shutdown()
+    if app.state.prediction_writer is not None:
+        await app.state.prediction_writer.stop()
+    await event_hub.stop()
+    await catalogue_cache.stop()
     await close_db()
 
 
@@ -79,6 +372,9 @@ app.include_router(farms.router,             prefix=f"/api/{settings.API_VERSION
 app.include_router(diseases.router,          prefix=f"/api/{settings.API_VERSION}")
 app.include_router(diseases.symptoms_router, prefix=f"/api/{settings.API_VERSION}")
 app.include_router(diagnosis.router,         prefix=f"/api/{settings.API_VERSION}")
+app.include_router(inference.router,         prefix=f"/api/{settings.API_VERSION}")
+app.include_router(models.router,            prefix=f"/api/{settings.API_VERSION}")
+app.include_router(notifications.router,     prefix=f"/api/{settings.API_VERSION}")
 
 
 @app.get("/")
@@ -97,6 +393,17 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """503 until models are loaded and warmed up — point the platform's health check here."""
+    startup = getattr(app.state, "startup", None)
+    ready = bool(startup and startup["ready"])
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": getattr(app.state, "model_status", None), "startup": startup},
+    )
+
+
 @app.get(f"/api/{settings.API_VERSION}/about")
 async def about():
     return {
@@ -8,7 +8,6 @@ from typing import Optional
 from datetime import datetime
 import uuid
 import os
-import tempfile
 from pathlib import Path
 
 # Import AI model
@@ -118,26 +117,19 @@ async def create_diagnosis(
     Create disease diagnosis using AI model
     
     This endpoint:
-    1. Saves uploaded image temporarily
-    2. Runs AI inference (if model available)
+    1. Reads the uploaded image into memory
+    2. Runs AI inference (if model available) straight from those bytes
     3. Returns prediction with confidence scores
     """
     diagnosis_id = str(uuid.uuid4())
     
-    # Save image temporarily for AI processing
-    temp_dir = tempfile.gettempdir()
-    temp_image_path = os.path.join(temp_dir, f"{diagnosis_id}_{image.filename}")
-    
     try:
-        # Save uploaded image
         contents = await image.read()
-        with open(temp_image_path, "wb") as f:
-            f.write(contents)
         
         # Run AI prediction
         if ai_detector is not None:
             # Real AI prediction
-            ai_result = ai_detector.predict(temp_image_path, top_k=3)
+            ai_result = ai_detector.predict(contents, top_k=3)
             
             primary_pred = ai_result['primary_prediction']
             
@@ -187,11 +179,6 @@ async def create_diagnosis(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI processing failed: {str(e)}")
     
-    finally:
-        # Cleanup temporary file
-        if os.path.exists(temp_image_path):
-            os.remove(temp_image_path)
-    
     # Create diagnosis record
     diagnosis = {
         "diagnosis_id": diagnosis_id,
@@ -0,0 +1,7 @@
+from app.models.user import User, UserRole
+from app.models.disease import Disease, Symptom, SeverityLevel, TargetSpecies
+from app.models.farm import Farm, FarmUnit, FarmType, FarmStatus, UnitType
+from app.models.treatment import Treatment, DiseaseTreatment, ApplicationMethod
+from app.models.diagnosis import Diagnosis, DiagnosisImage, DiagnosisSymptom, DiagnosisStatus
+from app.models.ai_models import ModelVersion, Prediction, AITrainingData, LabelSource
+from app.models.notification import Notification, Feedback, NotificationType
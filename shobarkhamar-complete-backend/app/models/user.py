@@ -0,0 +1,31 @@
+import uuid
+import enum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+
+
+class UserRole(str, enum.Enum):
+    ADMIN = "admin"
+    FARMER = "farmer"
+    VET = "vet"
+
+
+class User(Base):
+    __tablename__ = "users"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(200), nullable=False)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    password_hash = Column(String(255), nullable=False)
+    phone = Column(String(20), nullable=True)
+    address = Column(String(500), nullable=True)
+    role = Column(Enum(UserRole), default=UserRole.FARMER)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    farms = relationship("Farm", back_populates="owner", lazy="select")
+    diagnoses = relationship("Diagnosis", back_populates="user", lazy="select")
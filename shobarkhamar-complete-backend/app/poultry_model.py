@@ -7,8 +7,12 @@ import torch
 import torch.nn as nn
 import torchvision.transforms as transforms
 from torchvision.models import mobilenet_v3_large, MobileNet_V3_Large_Weights
-from PIL import Image
-from typing import Dict
+from typing import Dict, List, Union
+
+from app.utils.images import ImageSource, load_rgb, map_isolated, synthetic_jpeg
+from app.utils.predictions import Postprocessor
+from app.utils.runtimes import MIN_AGREEMENT, load_runtime
+from app.utils.weights import load_model
 
 POULTRY_CLASS_NAMES = [
     "cocci",
@@ -27,9 +31,12 @@ SEVERITY_MAP = {
     "cocci": "HIGH",
 }
 
+INPUT_SIZE = 224
+
 
 class PoultryDiseaseDetector:
-    def __init__(self, model_path: str, device: str = None):
+    def __init__(self, model_path: str, device: str = None, draft_decode: bool = True, backend: str = "eager",
+                 channels_last: bool = False, min_agreement: float = MIN_AGREEMENT, mmap_weights: bool = True):
         if device is None:
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         else:
@@ -38,22 +45,39 @@ class PoultryDiseaseDetector:
         print(f"Loading poultry model on device: {self.device}")
 
         # Build MobileNetV3-Large with custom head (matches training)
-        self.model = mobilenet_v3_large(weights=None)
-        in_features = self.model.classifier[3].in_features
-        self.model.classifier[3] = nn.Sequential(
-            nn.Dropout(p=0.4, inplace=True),
-            nn.Linear(in_features, len(POULTRY_CLASS_NAMES)),
-        )
-
-        state_dict = torch.load(model_path, map_location=self.device, weights_only=False)
-        self.model.load_state_dict(state_dict)
-        self.model.to(self.device)
+        def build():
+            model = mobilenet_v3_large(weights=None)
+            model.classifier[3] = nn.Sequential(
+                nn.Dropout(p=0.4, inplace=True),
+                nn.Linear(model.classifier[3].in_features, len(POULTRY_CLASS_NAMES)),
+            )
+            return model
+
+        self.model, self.weights_mapped = load_model(build, model_path, self.device, mmap=mmap_weights)
         self.model.eval()
 
+        # eager / torchscript / onnxruntime / int8 — all return logits of the same shape
+        self.runtime = load_runtime(backend, self.model, model_path, self.device, min_agreement=min_agreement)
+        self.backend = self.runtime.name
+
+        # NHWC lets oneDNN pick faster conv kernels; ORT wants plain NCHW arrays
+        self.memory_format = torch.contiguous_format
+        if channels_last and self.backend != "onnxruntime":
+            self.memory_format = torch.channels_last
+            self.model.to(memory_format=self.memory_format)
+            self.weights_mapped = False  # conv weights were re-laid out into new memory
+
         self.class_names = POULTRY_CLASS_NAMES
 
+        self._postprocess = Postprocessor(
+            self.class_names, HEALTHY_CLASSES, SEVERITY_MAP,
+            label=lambda c: (c, c.replace("_", " ").title()),
+        )
+
+        self.input_size = INPUT_SIZE
+        self.draft_decode = draft_decode
         self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
+            transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
             transforms.ToTensor(),
             transforms.Normalize(
                 mean=[0.485, 0.456, 0.406],
@@ -63,42 +87,54 @@ class PoultryDiseaseDetector:
         print("✓ Poultry model loaded successfully")
         print(f"  Classes: {self.class_names}")
 
-    def predict(self, image_path: str, top_k: int = 3) -> Dict:
-        img = Image.open(image_path).convert("RGB")
-        tensor = self.transform(img).unsqueeze(0).to(self.device)
-
-        with torch.no_grad():
-            outputs = self.model(tensor)
-            probs = torch.softmax(outputs, dim=1)[0]
-
-        top_probs, top_idxs = torch.topk(probs, k=min(top_k, len(self.class_names)))
-
-        predictions = []
-        for prob, idx in zip(top_probs.tolist(), top_idxs.tolist()):
-            name = self.class_names[idx]
-            predictions.append({
-                "disease_code": name,
-                "disease_name": name.replace("_", " ").title(),
-                "confidence": prob,
-                "confidence_percent": round(prob * 100, 2),
-            })
-
-        primary = predictions[0]
-        is_healthy = primary["disease_code"] in HEALTHY_CLASSES
-        confidence = primary["confidence"]
-
-        if is_healthy:
-            severity = "NONE"
-        elif confidence >= 0.8:
-            severity = SEVERITY_MAP.get(primary["disease_code"], "HIGH")
-        elif confidence >= 0.6:
-            severity = "MEDIUM"
-        else:
-            severity = "LOW"
-
-        return {
-            "primary_prediction": {**primary, "severity": severity},
-            "all_predictions": predictions,
-            "is_healthy": is_healthy,
-            "needs_treatment": not is_healthy and confidence > 0.5,
-        }
+    def preprocess(self, source: ImageSource) -> torch.Tensor:
+        """Decode + transform one image into a (3, 224, 224) tensor."""
+        img = load_rgb(source, draft_size=self.input_size if self.draft_decode else None)
+        return self.transform(img)
+
+    def predict(self, source: ImageSource, top_k: int = 3) -> Dict:
+        """`source` may be a file path, encoded image bytes or a file-like object."""
+        return self.predict_tensors([self.preprocess(source)], top_k=top_k)[0]
+
+    def predict_tensors(self, tensors: List[torch.Tensor], top_k: int = 3) -> List[Dict]:
+        """Run one forward pass over already-preprocessed images."""
+        batch = torch.stack(tensors).to(self.device, memory_format=self.memory_format)
+
+        with torch.inference_mode():
+            outputs = self.runtime(batch)
+            probs = torch.softmax(outputs, dim=1).cpu()
+
+        return self._postprocess(probs, top_k)
+
+    def predict_many(self, sources: List[ImageSource], top_k: int = 3) -> List[Union[Dict, Exception]]:
+        """
+        Decode in parallel, then one forward pass for everything that decoded.
+        A source that fails to decode yields its exception in place.
+        """
+        decoded = map_isolated(self.preprocess, sources)
+        tensors = [t for t in decoded if not isinstance(t, Exception)]
+        if not tensors:
+            return decoded
+
+        results = iter(self.predict_tensors(tensors, top_k=top_k))
+        return [d if isinstance(d, Exception) else next(results) for d in decoded]
+
+    def warm_up(self, batch_size: int):
+        """One decode + forward pass at `batch_size` on synthetic images."""
+        self.predict_many([synthetic_jpeg()] * batch_size)
+
+    def batch_predict(self, image_paths: List[str], top_k: int = 3, batch_size: int = 32) -> List[Dict]:
+        results = []
+        for start in range(0, len(image_paths), batch_size):
+            chunk = image_paths[start:start + batch_size]
+            try:
+                outcomes = self.predict_many(chunk, top_k=top_k)
+            except Exception as e:
+                outcomes = [e] * len(chunk)
+
+            for path, r in zip(chunk, outcomes):
+                if isinstance(r, Exception):
+                    results.append({"image_path": path, "status": "error", "error": str(r)})
+                else:
+                    results.append({**r, "image_path": path, "status": "success"})
+        return results
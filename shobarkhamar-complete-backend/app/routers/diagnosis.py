@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, Request, HTTPException
+from fastapi import APIRouter, Depends, status, UploadFile, File, Request, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Set
 from uuid import UUID
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.security import get_current_user, get_stream_user
+from app.inference import InferenceQueueFull, require_batcher
+from app.models.diagnosis import DiagnosisStatus
+from app.models.disease import TargetSpecies
 from app.schemas.diagnosis import (
     DiagnosisCreate, DiagnosisUpdate, DiagnosisResponse,
-    DiagnosisListResponse, ImageUploadResponse, AIResultResponse
+    DiagnosisListResponse, ImageUploadResponse, AIResultResponse,
+    DiagnosisJobResponse, DiagnosisStatusResponse, HistoryTotal,
+    DiagnosisExpand, DiagnosisSummary
 )
 from app.services.diagnosis_service import DiagnosisService
-import tempfile, os
+from app.services.events import event_hub
+import asyncio, json
 
 router = APIRouter(prefix="/detection", tags=["Detection"])
 
@@ -26,18 +35,51 @@ async def create_diagnosis(
     return DiagnosisResponse.from_orm(diagnosis)
 
 
-@router.get("/history", response_model=DiagnosisListResponse)
+def _parse_expand(values: List[str]) -> Set[DiagnosisExpand]:
+    """`?expand=images,final_disease` or `?expand=images&expand=final_disease`"""
+    try:
+        return {DiagnosisExpand(v.strip()) for value in values for v in value.split(",") if v.strip()}
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"expand accepts: {', '.join(e.value for e in DiagnosisExpand)}",
+        )
+
+
+# exclude_unset: images / final_disease are left out of rows unless expanded
+@router.get("/history", response_model=DiagnosisListResponse, response_model_exclude_unset=True)
 async def get_diagnosis_history(
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    farm_id: Optional[UUID] = None,
+    status_filter: Optional[DiagnosisStatus] = Query(None, alias="status"),
+    species: Optional[TargetSpecies] = None,
+    total: HistoryTotal = Query(HistoryTotal.NONE, description="Also return the number of matching diagnoses"),
+    expand: List[str] = Query([], description="Nested data to include per row: images, final_disease"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; ignored with a cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    Newest first. Follow `next_cursor` for older pages; each page is an index seek, however deep.
+
+    Rows carry `image_count` and `first_image_url` rather than the images;
+    `?expand=images,final_disease` adds the nested objects.
+    """
     user_id = UUID(current_user["sub"])
-    diagnoses = await DiagnosisService.get_by_user(db, user_id, skip, limit)
+    rows, next_cursor = await DiagnosisService.get_by_user(
+        db, user_id, limit, cursor, farm_id, status_filter, species, skip, expand=_parse_expand(expand),
+    )
+    count = None
+    if total != HistoryTotal.NONE:
+        count = await DiagnosisService.count_by_user(
+            db, user_id, farm_id, status_filter, species, estimate=total == HistoryTotal.ESTIMATE,
+        )
     return DiagnosisListResponse(
-        diagnoses=[DiagnosisResponse.from_orm(d) for d in diagnoses],
-        total=len(diagnoses)
+        diagnoses=[DiagnosisSummary(**row) for row in rows],
+        next_cursor=next_cursor,
+        total=count,
+        total_estimated=total == HistoryTotal.ESTIMATE,
     )
 
 
@@ -84,9 +126,10 @@ async def upload_diagnosis_image(
     Returns ImageUploadResponse which includes the full updated diagnosis
     with ai_result so the frontend gets everything in one call.
     """
-    ai_detector = getattr(request.app.state, "ai_detector", None)
+    batcher = require_batcher(request.app.state, "fish")
     image, ai_result = await DiagnosisService.upload_image(
-        db, diagnosis_id, file, ai_detector=ai_detector
+        db, diagnosis_id, file, batcher=batcher,
+        writer=getattr(request.app.state, "prediction_writer", None),
     )
 
     diagnosis = await DiagnosisService.get_by_id(db, diagnosis_id)
@@ -106,25 +149,20 @@ async def upload_diagnosis_image(
 
 # ── NEW: stateless quick-predict endpoints ────────────────────
 
-async def _run_predict(detector, file: UploadFile, model_label: str) -> dict:
-    """Save upload to temp file, run inference, clean up."""
-    if detector is None:
+async def _run_predict(batcher, file: UploadFile, model_label: str) -> dict:
+    """Decode the upload straight from memory and run batched inference."""
+    if batcher is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"{model_label} AI model is not loaded. Place the .pth file in /app/models/.",
         )
 
-    suffix = os.path.splitext(file.filename or ".jpg")[1] or ".jpg"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
-
     try:
-        return detector.predict(tmp_path)
+        return await batcher.predict(await file.read())
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
-    finally:
-        os.unlink(tmp_path)
 
 
 @router.post(
@@ -141,8 +179,8 @@ async def predict_fish_disease(
     Upload a fish image → returns AI prediction result immediately.
     Does **not** create a Diagnosis record. Use /analyze + /{id}/images for the full flow.
     """
-    detector = getattr(request.app.state, "ai_detector", None)
-    return await _run_predict(detector, file, "Fish")
+    batcher = require_batcher(request.app.state, "fish")
+    return await _run_predict(batcher, file, "Fish")
 
 
 @router.post(
@@ -159,8 +197,33 @@ async def predict_poultry_disease(
     Upload a poultry image → returns AI prediction result immediately.
     Does **not** create a Diagnosis record.
     """
-    detector = getattr(request.app.state, "poultry_detector", None)
-    return await _run_predict(detector, file, "Poultry")
+    batcher = require_batcher(request.app.state, "poultry")
+    return await _run_predict(batcher, file, "Poultry")
+
+
+@router.post(
+    "/predict",
+    tags=["Detection"],
+    summary="Species-routed quick-predict (stateless, no DB write)",
+)
+async def predict_any_species(
+    request: Request,
+    file: UploadFile = File(..., description="Fish or poultry image (jpg/png)"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Upload a fish or poultry image without saying which → the poultry model
+    runs first and the fish model only when poultry reports `non_poultry`
+    or is unsure. The response is that model's prediction plus `species`
+    (`FISH`, `POULTRY`, or null if neither recognises it) and `routing`.
+    """
+    # Routing needs both models settled, or fish images would be misrouted
+    for name in ("poultry", "fish"):
+        require_batcher(request.app.state, name)
+    species_router = getattr(request.app.state, "species_router", None)
+    if species_router is not None and not species_router.available:
+        species_router = None
+    return await _run_predict(species_router, file, "Fish/poultry")
 
 
 @router.post("/{diagnosis_id}/images/fish", response_model=ImageUploadResponse)
@@ -171,9 +234,10 @@ async def upload_fish_image(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    ai_detector = getattr(request.app.state, "ai_detector", None)
+    batcher = require_batcher(request.app.state, "fish")
     image, ai_result = await DiagnosisService.upload_image(
-        db, diagnosis_id, file, ai_detector=ai_detector
+        db, diagnosis_id, file, batcher=batcher,
+        writer=getattr(request.app.state, "prediction_writer", None),
     )
     diagnosis = await DiagnosisService.get_by_id(db, diagnosis_id)
     diagnosis_response = DiagnosisResponse.from_orm(diagnosis)
@@ -196,9 +260,10 @@ async def upload_poultry_image(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    ai_detector = getattr(request.app.state, "poultry_detector", None)
+    batcher = require_batcher(request.app.state, "poultry")
     image, ai_result = await DiagnosisService.upload_image(
-        db, diagnosis_id, file, ai_detector=ai_detector
+        db, diagnosis_id, file, batcher=batcher,
+        writer=getattr(request.app.state, "prediction_writer", None),
     )
     diagnosis = await DiagnosisService.get_by_id(db, diagnosis_id)
     diagnosis_response = DiagnosisResponse.from_orm(diagnosis)
@@ -211,3 +276,197 @@ async def upload_poultry_image(
         captured_at=image.captured_at,
         diagnosis=diagnosis_response,
     )
+
+
+# ── Bulk upload with streamed per-image results ───────────────
+
+# Keeps batch pipelines alive after the response stream is gone
+_batch_tasks: set = set()
+
+
+def _batcher_for(request: Request, species: TargetSpecies):
+    if species == TargetSpecies.POULTRY:
+        return require_batcher(request.app.state, "poultry")
+    return require_batcher(request.app.state, "fish")
+
+
+async def _stream_events(queue: asyncio.Queue, sse: bool) -> AsyncIterator[str]:
+    while True:
+        event = await queue.get()
+        if event is None:
+            return
+        payload = json.dumps(event, default=str)
+        if sse:
+            yield f"event: {event['event']}\ndata: {payload}\n\n"
+        else:
+            yield payload + "\n"
+
+
+@router.post("/{diagnosis_id}/images/batch")
+async def upload_diagnosis_images_batch(
+    request: Request,
+    diagnosis_id: UUID,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload many images for one diagnosis in a single call.
+
+    Images are decoded from memory and run through batched inference while
+    they are written to UPLOAD_DIR in the background; one result per
+    image is streamed back as it finishes — NDJSON by default, or SSE when
+    the client sends `Accept: text/event-stream`. The final `summary` event
+    is sent after every DiagnosisImage row and the Diagnosis aggregate have
+    been committed in one transaction.
+    """
+    if len(files) > settings.MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MAX_BATCH_UPLOAD_FILES} images per batch",
+        )
+
+    diagnosis = await DiagnosisService.get_by_id(db, diagnosis_id)
+    batcher = _batcher_for(request, diagnosis.target_species)
+    if batcher is not None and not batcher.has_capacity(len(files)):
+        raise InferenceQueueFull()
+
+    # Read now: the UploadFiles are closed once this handler returns
+    uploads = [
+        {"filename": file.filename, "data": await file.read()}
+        for file in files
+    ]
+
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(
+        DiagnosisService.process_image_batch(
+            diagnosis_id, uploads, batcher, emit=queue.put_nowait,
+            writer=getattr(request.app.state, "prediction_writer", None),
+        )
+    )
+    _batch_tasks.add(task)
+
+    def _done(t: asyncio.Task):
+        _batch_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            queue.put_nowait({"event": "error", "error": str(t.exception())})
+        queue.put_nowait(None)
+
+    task.add_done_callback(_done)
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        _stream_events(queue, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+
+
+# ── Async mode: queued uploads, polled or streamed ────────────
+
+TERMINAL_STATUSES = {DiagnosisStatus.COMPLETED.value, DiagnosisStatus.FAILED.value}
+
+
+@router.post(
+    "/{diagnosis_id}/images/async",
+    response_model=DiagnosisJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def upload_diagnosis_image_async(
+    request: Request,
+    diagnosis_id: UUID,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload an image and return straight away; inference runs from the job
+    queue with the model for the diagnosis' species. Follow progress
+    (PENDING → PROCESSING → COMPLETED / FAILED) by polling `status_url`
+    or streaming `events_url` (SSE).
+    """
+    jobs = getattr(request.app.state, "diagnosis_jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue is not running")
+
+    image, diagnosis = await DiagnosisService.enqueue_image(db, diagnosis_id, file)
+    model = "poultry" if diagnosis.target_species == TargetSpecies.POULTRY else "fish"
+    try:
+        job_id = await jobs.submit(diagnosis_id, image.diagnosis_image_id, image.image_url, model)
+    except Exception as e:
+        await DiagnosisService.set_status(diagnosis_id, DiagnosisStatus.FAILED)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not queue job: {e}")
+
+    return DiagnosisJobResponse(
+        job_id=job_id,
+        diagnosis_id=diagnosis_id,
+        diagnosis_image_id=image.diagnosis_image_id,
+        image_url=image.image_url,
+        status=DiagnosisStatus.PENDING,
+        status_url=request.app.url_path_for("get_diagnosis_status", diagnosis_id=str(diagnosis_id)),
+        events_url=request.app.url_path_for("stream_diagnosis_status", diagnosis_id=str(diagnosis_id)),
+    )
+
+
+@router.get("/{diagnosis_id}/status", response_model=DiagnosisStatusResponse)
+async def get_diagnosis_status(
+    diagnosis_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Status and AI result only — cheap enough to poll."""
+    return await DiagnosisService.get_status(db, diagnosis_id, UUID(current_user["sub"]))
+
+
+async def _status_events(request: Request, diagnosis_id: UUID, owner_id: UUID) -> AsyncIterator[str]:
+    # Subscribe before reading the current status so no change falls in between
+    async with event_hub.subscribe(owner_id) as subscription:
+        async with AsyncSessionLocal() as session:
+            current = await DiagnosisService.get_status(session, diagnosis_id)
+        current.pop('user_id')
+        last = None
+        while True:
+            if current != last:
+                yield f"event: status\ndata: {json.dumps(current, default=str)}\n\n"
+                last = current
+                if current["status"] in TERMINAL_STATUSES:
+                    return
+
+            try:
+                event = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                # Changes published by a worker without Redis never arrive here
+                async with AsyncSessionLocal() as session:
+                    current = await DiagnosisService.get_status(session, diagnosis_id)
+                current.pop('user_id')
+                continue
+            if event is None:
+                return  # fell too far behind or shutting down; the client reconnects
+
+            _, name, data = event
+            data = json.loads(data)
+            if name == "diagnosis" and data["diagnosis_id"] == str(diagnosis_id):
+                current = {**last, **data}
+
+
+@router.get("/{diagnosis_id}/events")
+async def stream_diagnosis_status(
+    request: Request,
+    diagnosis_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_stream_user)
+):
+    """
+    Server-sent events: one `status` event now and on every change, ending
+    after COMPLETED or FAILED. Replaces polling `/status`. Browsers'
+    EventSource cannot set headers, so the token may also be sent as `?token=`.
+    """
+    # 404 for someone else's diagnosis, before subscribing to its owner's events
+    owner_id = (await DiagnosisService.get_status(db, diagnosis_id, UUID(current_user["sub"])))['user_id']
+    return StreamingResponse(
+        _status_events(request, diagnosis_id, owner_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,30 +1,48 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status, UploadFile, File, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import List
 from uuid import UUID
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_user, require_admin
 from app.schemas.disease import (
     DiseaseCreate, DiseaseUpdate, DiseaseResponse, DiseaseListResponse,
-    SymptomCreate, SymptomUpdate, SymptomResponse
+    SymptomCreate, SymptomUpdate, SymptomResponse, CatalogueImportResponse
 )
-from app.services.disease_service import DiseaseService, SymptomService
+from app.services.disease_service import DiseaseService, SymptomService, CatalogueService
+from app.services.catalogue_cache import CatalogueEntry, catalogue_cache, etag_matches
 
 router = APIRouter(prefix="/diseases", tags=["Disease Database"])
 
+# Clients may keep a copy but must revalidate it (If-None-Match) before use
+CATALOGUE_CACHE_CONTROL = "public, no-cache"
+
+
+def _catalogue_response(request: Request, entry: CatalogueEntry) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": CATALOGUE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("", response_model=DiseaseListResponse)
 async def get_diseases(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all diseases"""
-    diseases = await DiseaseService.get_all(db, skip, limit)
-    
-    return DiseaseListResponse(
-        diseases=[DiseaseResponse.from_orm(disease) for disease in diseases],
-        total=len(diseases)
-    )
+    """Get all diseases (served from the catalogue cache; send If-None-Match for a 304)"""
+    async def load() -> bytes:
+        diseases = [DiseaseResponse.from_orm(disease) for disease in await DiseaseService.get_all(db, skip, limit)]
+        for disease in diseases:
+            disease.symptoms.sort(key=lambda s: (s.symptom_name, str(s.symptom_id)))
+        total = await DiseaseService.count(db)
+        return DiseaseListResponse(diseases=diseases, total=total).model_dump_json().encode()
+
+    entry = await catalogue_cache.get(("diseases", skip, limit), load)
+    return _catalogue_response(request, entry)
 
 
 @router.get("/{disease_id}", response_model=DiseaseResponse)
@@ -48,6 +66,43 @@ async def create_disease(
     return DiseaseResponse.from_orm(disease)
 
 
+@router.post("/import", response_model=CatalogueImportResponse)
+async def import_catalogue(
+    file: UploadFile = File(..., description="Catalogue as .json or .csv"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Load diseases, symptoms and treatments in one transaction (Admin only).
+
+    JSON: `{"symptoms": [...], "treatments": [...], "diseases": [...]}`,
+    where each disease lists its symptoms by name and its treatments as
+    `{"treatment_name", "effectiveness_notes", "is_primary_treatment"}`.
+    CSV: one row per disease and symptom and/or treatment, with the
+    columns in CatalogueService.CSV_COLUMNS. Existing records with the same
+    name are updated; nothing is written if any row is invalid.
+    """
+    data = await file.read(settings.MAX_UPLOAD_SIZE + 1)
+    if len(data) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Catalogue larger than {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+    name = (file.filename or "").lower()
+    if name.endswith(".csv") or file.content_type == "text/csv":
+        catalogue = CatalogueService.parse_csv(data)
+    elif name.endswith(".json") or file.content_type == "application/json":
+        catalogue = CatalogueService.parse_json(data)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload a .json or .csv catalogue"
+        )
+
+    return await CatalogueService.import_catalogue(db, catalogue)
+
+
 @router.put("/{disease_id}", response_model=DiseaseResponse)
 async def update_disease(
     disease_id: UUID,
@@ -73,16 +128,23 @@ async def delete_disease(
 # Symptom endpoints
 symptoms_router = APIRouter(prefix="/symptoms", tags=["Disease Database"])
 
+SymptomListAdapter = TypeAdapter(List[SymptomResponse])
+
 
 @symptoms_router.get("", response_model=list[SymptomResponse])
 async def get_symptoms(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all symptoms"""
-    symptoms = await SymptomService.get_all(db, skip, limit)
-    return [SymptomResponse.from_orm(symptom) for symptom in symptoms]
+    """Get all symptoms (served from the catalogue cache; send If-None-Match for a 304)"""
+    async def load() -> bytes:
+        symptoms = [SymptomResponse.from_orm(symptom) for symptom in await SymptomService.get_all(db, skip, limit)]
+        return SymptomListAdapter.dump_json(symptoms)
+
+    entry = await catalogue_cache.get(("symptoms", skip, limit), load)
+    return _catalogue_response(request, entry)
 
 
 @symptoms_router.get("/{symptom_id}", response_model=SymptomResponse)
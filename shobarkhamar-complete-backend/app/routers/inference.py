@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Request
+from app.core.security import require_admin
+from app.services.catalogue_cache import catalogue_cache
+from app.services.events import event_hub
+
+router = APIRouter(prefix="/inference", tags=["Inference"])
+
+
+@router.get("/stats")
+async def get_inference_stats(
+    request: Request,
+    current_user: dict = Depends(require_admin)
+):
+    """Executor / worker utilisation, per-model batching, cache, routing, prediction-write, job-queue, event-stream and catalogue-cache stats (Admin only)"""
+    executor = getattr(request.app.state, "inference_executor", None)
+    cache = getattr(request.app.state, "prediction_cache", None)
+    species_router = getattr(request.app.state, "species_router", None)
+    writer = getattr(request.app.state, "prediction_writer", None)
+    jobs = getattr(request.app.state, "diagnosis_jobs", None)
+    batchers = {
+        name: batcher.stats()
+        for name, batcher in (
+            ("fish",    getattr(request.app.state, "fish_batcher", None)),
+            ("poultry", getattr(request.app.state, "poultry_batcher", None)),
+        )
+        if batcher is not None
+    }
+    return {
+        "executor": executor.stats() if executor is not None else None,
+        "batchers": batchers,
+        "cache": cache.stats() if cache is not None else None,
+        "routing": species_router.stats() if species_router is not None else None,
+        "prediction_writes": writer.stats() if writer is not None else None,
+        "diagnosis_jobs": await jobs.stats() if jobs is not None else None,
+        "event_streams": event_hub.stats(),
+        "catalogue_cache": catalogue_cache.stats(),
+    }
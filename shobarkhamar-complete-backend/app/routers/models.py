@@ -0,0 +1,186 @@
+import asyncio
+import os
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.security import require_admin
+from app.inference.loading import LOADING
+from app.schemas.prediction import ModelVersionCreate, ModelVersionResponse, ModelVersionListResponse, ShadowCreate
+from app.services.model_version_service import ModelVersionService, artifact_path
+
+router = APIRouter(prefix="/models", tags=["Model Registry"])
+
+# Keeps running swaps / shadow loads referenced until they finish
+_swap_tasks = set()
+
+
+def _background(coro):
+    task = asyncio.create_task(coro)
+    _swap_tasks.add(task)
+    task.add_done_callback(_swap_tasks.discard)
+
+
+async def _swap_and_activate(registry, version_id: UUID, model_name: str, artifact_uri: str):
+    """Mark the version active in the database only once it is actually serving."""
+    try:
+        await registry.swap(model_name, version_id, artifact_uri, artifact_path(artifact_uri))
+    except Exception:
+        return  # recorded in registry.swaps; the old version stays active
+    async with AsyncSessionLocal() as db:
+        await ModelVersionService.activate(db, version_id)
+
+
+def _registry(request: Request):
+    registry = getattr(request.app.state, "model_registry", None)
+    if registry is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Model registry not running")
+    return registry
+
+
+async def _quietly(coro):
+    # Failures are recorded on the registry for the status endpoints
+    try:
+        await coro
+    except Exception:
+        pass
+
+
+def _start_swap(request: Request, version) -> dict:
+    registry = _registry(request)
+    name = version.model_name
+    if request.app.state.model_status.get(name) == LOADING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{name} model is still loading")
+    if registry.swaps.get(name, {}).get("state") not in (None, "active", "failed"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"A {name} model swap is already running")
+    if not os.path.exists(artifact_path(version.artifact_uri)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Artifact not found on the API host")
+
+    _background(_swap_and_activate(registry, version.model_version_id, name, version.artifact_uri))
+    return {
+        "model_version_id": str(version.model_version_id),
+        "model_name": name,
+        "state": "swapping",
+    }
+
+
+@router.get("/versions", response_model=ModelVersionListResponse)
+async def get_model_versions(
+    model_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """List registered model versions (Admin only)"""
+    versions = await ModelVersionService.get_all(db, model_name)
+    return ModelVersionListResponse(
+        model_versions=[ModelVersionResponse.from_orm(v) for v in versions],
+        total=len(versions)
+    )
+
+
+@router.post("/versions", status_code=status.HTTP_201_CREATED)
+async def create_model_version(
+    version_data: ModelVersionCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Register a model version; with `activate`, swap it in right away (Admin only)"""
+    version = await ModelVersionService.create(db, version_data)
+    response = {"model_version": ModelVersionResponse.from_orm(version), "swap": None}
+    if version_data.activate:
+        response["swap"] = _start_swap(request, version)
+    return response
+
+
+@router.post("/versions/{model_version_id}/activate", status_code=status.HTTP_202_ACCEPTED)
+async def activate_model_version(
+    model_version_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Hot-swap the serving model to this version (Admin only).
+
+    Returns at once; the old model keeps serving until the new one is
+    loaded and warm. Poll GET /models/status for progress.
+    """
+    version = await ModelVersionService.get_by_id(db, model_version_id)
+    return _start_swap(request, version)
+
+
+@router.get("/status")
+async def get_model_status(
+    request: Request,
+    current_user: dict = Depends(require_admin)
+):
+    """Serving version and last swap per model (Admin only)"""
+    registry = getattr(request.app.state, "model_registry", None)
+    return {
+        "models": getattr(request.app.state, "model_status", None),
+        **(registry.stats() if registry is not None else {"active": {}, "swaps": {}}),
+    }
+
+
+@router.post("/versions/{model_version_id}/shadow", status_code=status.HTTP_202_ACCEPTED)
+async def shadow_model_version(
+    model_version_id: UUID,
+    request: Request,
+    shadow_data: Optional[ShadowCreate] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Run this version next to the active one on a sample of live traffic (Admin only).
+
+    Predictions are compared off the response path; poll GET /models/shadow
+    for agreement and latency. Replaces any shadow already running for the model.
+    """
+    version = await ModelVersionService.get_by_id(db, model_version_id)
+    registry = _registry(request)
+    name = version.model_name
+
+    if getattr(request.app.state, f"{name}_batcher", None) is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{name} model is not serving")
+    if registry.active.get(name, {}).get("model_version_id") == str(version.model_version_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Version is already active")
+    if not os.path.exists(artifact_path(version.artifact_uri)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Artifact not found on the API host")
+
+    shadow_data = shadow_data or ShadowCreate()
+    sample_rate = shadow_data.sample_rate or settings.SHADOW_SAMPLE_RATE
+    _background(_quietly(registry.start_shadow(
+        name, version.model_version_id, artifact_path(version.artifact_uri),
+        sample_rate=sample_rate,
+        max_pending=shadow_data.max_pending or settings.SHADOW_MAX_PENDING,
+        cpu_budget=shadow_data.cpu_budget or settings.SHADOW_CPU_BUDGET,
+    )))
+    return {
+        "model_version_id": str(version.model_version_id),
+        "model_name": name,
+        "sample_rate": sample_rate,
+        "state": "loading",
+    }
+
+
+@router.get("/shadow")
+async def get_shadow_stats(
+    request: Request,
+    current_user: dict = Depends(require_admin)
+):
+    """Agreement and latency of each running shadow vs the active model (Admin only)"""
+    return _registry(request).shadow_stats()
+
+
+@router.delete("/shadow/{model_name}", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_shadow(
+    model_name: str,
+    request: Request,
+    current_user: dict = Depends(require_admin)
+):
+    """Stop shadowing for a model (Admin only)"""
+    if not await _registry(request).stop_shadow(model_name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No shadow running for this model")
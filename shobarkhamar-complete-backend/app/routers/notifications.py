@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_user, get_stream_user
+from app.schemas.notification import NotificationUpdate, NotificationResponse, NotificationListResponse
+from app.services.events import event_hub, event_id_key, valid_event_id
+from app.services.notification_service import NotificationService
+import asyncio
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+# Client reconnect delay after the stream drops (ms)
+STREAM_RETRY_MS = 3000
+
+
+@router.get("", response_model=NotificationListResponse)
+async def list_notifications(
+    unread_only: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    notifications, total, unread = await NotificationService.get_by_user(
+        db, UUID(current_user["sub"]), unread_only, skip, limit
+    )
+    return NotificationListResponse(
+        notifications=[NotificationResponse.from_orm(n) for n in notifications],
+        total=total,
+        unread_count=unread,
+    )
+
+
+@router.patch("/{notification_id}", response_model=NotificationResponse)
+async def update_notification(
+    notification_id: UUID,
+    notification_data: NotificationUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    return await NotificationService.mark_read(db, notification_id, UUID(current_user["sub"]), notification_data.is_read)
+
+
+@router.post("/read-all", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_all_notifications_read(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    await NotificationService.mark_all_read(db, UUID(current_user["sub"]))
+
+
+def _frame(event_id: str, event: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+async def _user_events(request: Request, user_id: str, last_event_id: Optional[str]) -> AsyncIterator[str]:
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    # Subscribe first, then replay: an event published in between arrives
+    # both ways and the id check below drops the second copy
+    async with event_hub.subscribe(user_id) as subscription:
+        last = event_id_key(last_event_id) if valid_event_id(last_event_id) else (0, 0)
+        for event_id, event, data in await event_hub.replay(user_id, last_event_id):
+            yield _frame(event_id, event, data)
+            last = max(last, event_id_key(event_id))
+
+        while True:
+            try:
+                item = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                return  # fell too far behind or shutting down; the client reconnects with Last-Event-ID
+
+            event_id, event, data = item
+            if event_id_key(event_id) <= last:
+                continue
+            last = event_id_key(event_id)
+            yield _frame(event_id, event, data)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description="Resume point when Last-Event-ID cannot be sent"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: dict = Depends(get_stream_user)
+):
+    """
+    Server-sent events for the signed-in user: `diagnosis` (status changes
+    of any of their diagnoses) and `notification` (new notifications).
+    Every event carries an `id`; a reconnecting EventSource sends it back
+    as Last-Event-ID and gets the events it missed first. Accepts the
+    access token as `?token=` since EventSource cannot set headers.
+    """
+    return StreamingResponse(
+        _user_events(request, current_user["sub"], last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
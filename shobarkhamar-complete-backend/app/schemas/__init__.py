@@ -7,7 +7,8 @@ from app.schemas.farm import (
 )
 from app.schemas.disease import (
     DiseaseCreate, DiseaseUpdate, DiseaseResponse, DiseaseListResponse,
-    SymptomCreate, SymptomUpdate, SymptomResponse
+    SymptomCreate, SymptomUpdate, SymptomResponse,
+    CatalogueDisease, CatalogueTreatmentLink, CatalogueImport, CatalogueImportResponse
 )
 from app.schemas.treatment import (
     TreatmentCreate, TreatmentUpdate, TreatmentResponse, TreatmentListResponse,
@@ -15,11 +16,13 @@ from app.schemas.treatment import (
 )
 from app.schemas.diagnosis import (
     DiagnosisCreate, DiagnosisUpdate, DiagnosisResponse, DiagnosisListResponse,
-    ImageUploadRequest, ImageUploadResponse, DiagnosisImageResponse
+    ImageUploadRequest, ImageUploadResponse, DiagnosisImageResponse,
+    DiagnosisJobResponse, DiagnosisStatusResponse, HistoryTotal,
+    DiagnosisExpand, DiagnosisSummary
 )
 from app.schemas.prediction import (
     PredictionResponse, PredictionListResponse,
-    ModelVersionResponse,
+    ModelVersionCreate, ModelVersionResponse, ModelVersionListResponse, ShadowCreate,
     AITrainingDataCreate, AITrainingDataResponse
 )
 from app.schemas.notification import (
@@ -38,6 +41,7 @@ __all__ = [
     # Disease & Symptom
     "DiseaseCreate", "DiseaseUpdate", "DiseaseResponse", "DiseaseListResponse",
     "SymptomCreate", "SymptomUpdate", "SymptomResponse",
+    "CatalogueDisease", "CatalogueTreatmentLink", "CatalogueImport", "CatalogueImportResponse",
     
     # Treatment
     "TreatmentCreate", "TreatmentUpdate", "TreatmentResponse", "TreatmentListResponse",
@@ -46,10 +50,12 @@ __all__ = [
     # Diagnosis
     "DiagnosisCreate", "DiagnosisUpdate", "DiagnosisResponse", "DiagnosisListResponse",
     "ImageUploadRequest", "ImageUploadResponse", "DiagnosisImageResponse",
+    "DiagnosisJobResponse", "DiagnosisStatusResponse", "HistoryTotal",
+    "DiagnosisExpand", "DiagnosisSummary",
     
     # Prediction & AI
     "PredictionResponse", "PredictionListResponse",
-    "ModelVersionResponse",
+    "ModelVersionCreate", "ModelVersionResponse", "ModelVersionListResponse", "ShadowCreate",
     "AITrainingDataCreate", "AITrainingDataResponse",
     
     # Notification & Feedback
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from enum import Enum
 from datetime import datetime
 from uuid import UUID
 from app.models.diagnosis import DiagnosisStatus, TargetSpecies
@@ -65,9 +66,43 @@ class DiagnosisResponse(BaseModel):
         from_attributes = True
 
 
+class HistoryTotal(str, Enum):
+    NONE = "none"
+    ESTIMATE = "estimate"  # planner row estimate, no rows read
+    EXACT = "exact"
+
+
+class DiagnosisExpand(str, Enum):
+    IMAGES = "images"
+    FINAL_DISEASE = "final_disease"
+
+
+class DiagnosisSummary(BaseModel):
+    """History row: the diagnosis columns, with its images counted rather than nested"""
+    diagnosis_id: UUID
+    farm_id: UUID
+    unit_id: Optional[UUID] = None
+    target_species: TargetSpecies
+    status: DiagnosisStatus
+    symptoms_text: Optional[str] = None
+    final_disease_id: Optional[UUID] = None
+    final_disease_name: Optional[str] = None
+    ai_confidence: Optional[float] = None
+    ai_disease_code: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    image_count: int = 0
+    first_image_url: Optional[str] = None
+    # Only present when asked for with ?expand=
+    images: Optional[List[DiagnosisImageResponse]] = None
+    final_disease: Optional[DiseaseResponse] = None
+
+
 class DiagnosisListResponse(BaseModel):
-    diagnoses: List[DiagnosisResponse]
-    total: int
+    diagnoses: List[DiagnosisSummary]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last one
+    total: Optional[int] = None        # only with ?total=exact or ?total=estimate
+    total_estimated: bool = False
 
 
 class ImageUploadRequest(BaseModel):
@@ -81,3 +116,21 @@ class ImageUploadResponse(BaseModel):
     captured_at: datetime
     # Full updated diagnosis so the frontend gets AI results immediately
     diagnosis: Optional[DiagnosisResponse] = None
+
+
+class DiagnosisJobResponse(BaseModel):
+    """202 body of an async-mode upload"""
+    job_id: str
+    diagnosis_id: UUID
+    diagnosis_image_id: UUID
+    image_url: str
+    status: DiagnosisStatus
+    status_url: str
+    events_url: str
+
+
+class DiagnosisStatusResponse(BaseModel):
+    diagnosis_id: UUID
+    status: DiagnosisStatus
+    ai_result: Optional[AIResultResponse] = None
+    updated_at: datetime
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from uuid import UUID
 from app.models.disease import SeverityLevel, TargetSpecies
+from app.schemas.treatment import TreatmentCreate
 
 
 # Symptom Schemas
@@ -61,3 +62,30 @@ class DiseaseResponse(DiseaseBase):
 class DiseaseListResponse(BaseModel):
     diseases: List[DiseaseResponse]
     total: int
+
+
+# Catalogue import — records refer to each other by name, since new ones have no ids yet
+class CatalogueTreatmentLink(BaseModel):
+    treatment_name: str = Field(..., min_length=1, max_length=200)
+    effectiveness_notes: Optional[str] = None
+    is_primary_treatment: bool = False
+
+
+class CatalogueDisease(DiseaseBase):
+    symptoms: List[str] = []
+    treatments: List[CatalogueTreatmentLink] = []
+
+
+class CatalogueImport(BaseModel):
+    symptoms: List[SymptomCreate] = []
+    treatments: List[TreatmentCreate] = []
+    diseases: List[CatalogueDisease] = []
+
+
+class CatalogueImportResponse(BaseModel):
+    diseases_created: int = 0
+    diseases_updated: int = 0
+    symptoms_created: int = 0
+    symptoms_updated: int = 0
+    treatments_created: int = 0
+    treatments_updated: int = 0
@@ -24,6 +24,16 @@ class PredictionListResponse(BaseModel):
     total: int
 
 
+class ModelVersionCreate(BaseModel):
+    model_name: str = Field(..., pattern="^(fish|poultry)$")
+    framework: Optional[str] = "pytorch"
+    artifact_uri: str = Field(..., min_length=1)
+    activate: bool = False
+
+    class Config:
+        protected_namespaces = ()
+
+
 class ModelVersionResponse(BaseModel):
     model_version_id: UUID
     model_name: str
@@ -36,6 +46,18 @@ class ModelVersionResponse(BaseModel):
         from_attributes = True
 
 
+class ModelVersionListResponse(BaseModel):
+    model_versions: List[ModelVersionResponse]
+    total: int
+
+
+class ShadowCreate(BaseModel):
+    """Unset fields fall back to SHADOW_SAMPLE_RATE / SHADOW_MAX_PENDING / SHADOW_CPU_BUDGET"""
+    sample_rate: Optional[float] = Field(None, gt=0, le=1)
+    max_pending: Optional[int] = Field(None, ge=1)
+    cpu_budget: Optional[float] = Field(None, gt=0, le=1)
+
+
 class AITrainingDataCreate(BaseModel):
     diagnosis_id: UUID
     diagnosis_image_id: UUID
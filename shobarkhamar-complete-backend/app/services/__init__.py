@@ -4,8 +4,12 @@ Services module containing business logic for all entities.
 
 from app.services.user_service import UserService
 from app.services.farm_service import FarmService, FarmUnitService
-from app.services.disease_service import DiseaseService, SymptomService
+from app.services.disease_service import DiseaseService, SymptomService, CatalogueService
 from app.services.diagnosis_service import DiagnosisService
+from app.services.model_version_service import ModelVersionService
+from app.services.prediction_writer import PredictionWriter
+from app.services.diagnosis_jobs import DiagnosisJobRunner
+from app.services.notification_service import NotificationService
 
 __all__ = [
     "UserService",
@@ -13,5 +17,10 @@ __all__ = [
     "FarmUnitService",
     "DiseaseService",
     "SymptomService",
+    "CatalogueService",
     "DiagnosisService",
+    "ModelVersionService",
+    "PredictionWriter",
+    "DiagnosisJobRunner",
+    "NotificationService",
 ]
@@ -0,0 +1,172 @@
+"""
+Read-through cache for the disease / symptom catalogue.
+
+The catalogue only changes when an admin edits it, so GET /diseases and
+GET /symptoms serve serialized responses from memory. Each entry keeps
+its JSON body and a strong ETag, the hash of those bytes: identical
+content gives the same ETag on every worker, and clients revalidating
+with If-None-Match get a 304 without a body.
+
+DiseaseService / SymptomService call invalidate() after every committed
+write. That clears this worker's entries and bumps its version, so a
+load that was already running when the write landed is not stored. The
+other workers hear about it on a Redis channel. Entries also expire
+after CATALOGUE_CACHE_TTL in case an invalidation is missed (no Redis,
+or the subscription dropped).
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+
+CHANNEL = "catalogue:invalidate"
+
+
+class CatalogueEntry(NamedTuple):
+    body: bytes
+    etag: str
+    loaded_at: float
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class CatalogueCache:
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256):
+        self.ttl = ttl
+        # One entry per (list, skip, limit); the oldest goes first when full
+        self.max_entries = max(1, max_entries)
+        self.version = 0
+        self.redis = None
+        self._entries: Dict[Hashable, CatalogueEntry] = {}
+        # (key, version) → load in progress; concurrent misses wait on it
+        self._loading: Dict[tuple, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._origin = uuid.uuid4().hex
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    async def start(self, redis=None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        if ttl is not None:
+            self.ttl = ttl
+        if max_entries is not None:
+            self.max_entries = max(1, max_entries)
+        self.redis = redis
+        if redis is not None:
+            self._listener = asyncio.create_task(self._listen(), name="catalogue-cache")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    # ── public API ─────────────────────────────────────────────
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[bytes]]) -> CatalogueEntry:
+        """Cached entry for `key`, calling `load()` for the serialized body on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl:
+            self.hits += 1
+            return entry
+
+        version = self.version
+        pending = self._loading.get((key, version))
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[(key, version)] = future
+        try:
+            body = await load()
+            entry = CatalogueEntry(body, make_etag(body), time.monotonic())
+            # Invalidated while loading: serve it to this request, but don't keep it
+            if self.version == version:
+                self._entries.pop(key, None)
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+                self._entries[key] = entry
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        finally:
+            self._loading.pop((key, version), None)
+
+    async def invalidate(self):
+        """Drop every entry here and on the other workers. Never raises."""
+        self._clear()
+        if self.redis is not None:
+            try:
+                await self.redis.publish(CHANNEL, self._origin)
+            except Exception as e:
+                print(f"⚠️  Catalogue invalidation not published, other workers refresh after the TTL: {e}")
+
+    # ── internals ──────────────────────────────────────────────
+
+    def _clear(self):
+        self.version += 1
+        self._entries.clear()
+        self.invalidations += 1
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                # Anything published while unsubscribed was missed
+                self._clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message" and message["data"] != self._origin:
+                        self._clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Catalogue invalidation subscription lost ({e}), reconnecting")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict:
+        return {
+            "backend":       "redis" if self.redis is not None else "memory",
+            "version":       self.version,
+            "entries":       len(self._entries),
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "coalesced":     self.coalesced,
+            "invalidations": self.invalidations,
+        }
+
+
+# One per process, like event_hub; started by the lifespan
+catalogue_cache = CatalogueCache()
@@ -0,0 +1,262 @@
+"""
+Job queue for async-mode diagnosis uploads.
+
+`POST /detection/{id}/images/async` stores the image, marks the diagnosis
+PENDING and returns 202; a DiagnosisJobRunner in every API worker takes
+the job off the queue and runs it through the same MicroBatcher as a
+synchronous upload (PENDING → PROCESSING → COMPLETED / FAILED).
+
+With Redis the queue is a list shared by every worker and survives
+restarts: a job is moved onto the consumer's own processing list while it
+runs and removed only once its result is committed. Every runner checks
+for processing lists whose consumer's heartbeat has expired, at start-up
+and every heartbeat TTL after that, and puts their jobs back. Without Redis
+an in-process asyncio queue is used instead — jobs are then lost if the
+process exits before running them.
+
+The runner consumes inside the API process, rather than in a Celery
+worker, because that is where the models and batchers live.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.inference.loading import ModelNotReady, require_batcher
+from app.models.diagnosis import DiagnosisStatus
+from app.services.diagnosis_service import DiagnosisService
+
+# Seconds a consumer blocks on an empty queue before checking for shutdown
+POLL_TIMEOUT = 1
+
+
+class MemoryJobQueue:
+    backend = "memory"
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def put(self, job: Dict):
+        self._queue.put_nowait(job)
+
+    async def get(self, timeout: float) -> Optional[Tuple[Dict, None]]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout), None
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, token):
+        pass
+
+    async def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def heartbeat(self):
+        pass
+
+    async def recover(self) -> int:
+        return 0
+
+
+class RedisJobQueue:
+    """
+    Reliable-queue pattern: BLMOVE takes a job onto this consumer's own
+    processing list, LREM drops it once done. Another consumer's
+    processing list is only reclaimed after its heartbeat key expired.
+    """
+    backend = "redis"
+
+    def __init__(self, redis, key: str, heartbeat_ttl: float = 30):
+        self.redis = redis
+        self.key = key
+        self.heartbeat_ttl = heartbeat_ttl
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.processing = f"{key}:processing:{self.consumer}"
+
+    def _alive_key(self, consumer: str) -> str:
+        return f"{self.key}:alive:{consumer}"
+
+    async def put(self, job: Dict):
+        await self.redis.lpush(self.key, json.dumps(job))
+
+    async def get(self, timeout: float) -> Optional[Tuple[Dict, str]]:
+        raw = await self.redis.blmove(self.key, self.processing, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        return json.loads(raw), raw
+
+    async def ack(self, raw: str):
+        await self.redis.lrem(self.processing, 1, raw)
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.key)
+
+    async def heartbeat(self):
+        await self.redis.set(self._alive_key(self.consumer), 1, px=int(self.heartbeat_ttl * 1000))
+
+    async def recover(self) -> int:
+        """Requeue jobs left on the processing list of consumers that are gone."""
+        moved = 0
+        async for processing in self.redis.scan_iter(match=f"{self.key}:processing:*"):
+            consumer = processing.rsplit(":", 1)[1]
+            if consumer == self.consumer or await self.redis.exists(self._alive_key(consumer)):
+                continue
+            # Oldest first, onto the end that is consumed next
+            while await self.redis.lmove(processing, self.key, "RIGHT", "RIGHT") is not None:
+                moved += 1
+        return moved
+
+
+class DiagnosisJobRunner:
+
+    def __init__(self, queue, state, concurrency: int = 4, max_attempts: int = 3, retry_delay: Optional[float] = None):
+        self.queue = queue
+        self.state = state
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        # None = wait as long as the 503's Retry-After says
+        self.retry_delay = retry_delay
+
+        self._tasks = []
+
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    async def start(self):
+        await self.queue.heartbeat()
+        self.recovered += await self.queue.recover()
+        if self.recovered:
+            print(f"✓ Requeued {self.recovered} diagnosis jobs from stopped workers")
+        self._tasks = [
+            asyncio.create_task(self._consume(), name=f"diagnosis-jobs-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeat(), name="diagnosis-jobs-heartbeat"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ── public API ─────────────────────────────────────────────
+
+    async def submit(self, diagnosis_id: UUID, diagnosis_image_id: UUID, image_url: str, model: str) -> str:
+        job = {
+            "job_id":             uuid.uuid4().hex,
+            "diagnosis_id":       str(diagnosis_id),
+            "diagnosis_image_id": str(diagnosis_image_id),
+            "image_url":          image_url,
+            "model":              model,
+            "attempts":           0,
+            "enqueued_at":        time.time(),
+        }
+        await self.queue.put(job)
+        self.enqueued += 1
+        return job["job_id"]
+
+    # ── worker ─────────────────────────────────────────────────
+
+    async def _heartbeat(self):
+        ttl = getattr(self.queue, "heartbeat_ttl", 30)
+        next_recovery = time.monotonic() + ttl
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                await self.queue.heartbeat()
+            except Exception as e:
+                print(f"⚠️  Diagnosis queue heartbeat failed: {e}")
+
+            # A worker that restarted has a new consumer id; its old processing
+            # list can only be reclaimed once the old heartbeat has expired
+            if time.monotonic() >= next_recovery:
+                next_recovery = time.monotonic() + ttl
+                try:
+                    recovered = await self.queue.recover()
+                except Exception as e:
+                    print(f"⚠️  Diagnosis job recovery failed: {e}")
+                    continue
+                if recovered:
+                    self.recovered += recovered
+                    print(f"✓ Requeued {recovered} diagnosis jobs from stopped workers")
+
+    async def _consume(self):
+        while True:
+            try:
+                item = await self.queue.get(POLL_TIMEOUT)
+            except Exception as e:
+                print(f"⚠️  Diagnosis queue unavailable: {e}")
+                await asyncio.sleep(POLL_TIMEOUT)
+                continue
+            if item is None:
+                continue
+
+            job, token = item
+            await self._run(job)
+            try:
+                await self.queue.ack(token)
+            except Exception as e:
+                print(f"⚠️  Could not acknowledge diagnosis job {job['job_id']}: {e}")
+
+    async def _run(self, job: Dict):
+        diagnosis_id = UUID(job["diagnosis_id"])
+        try:
+            batcher = require_batcher(self.state, job["model"])
+            result = await DiagnosisService.run_job(
+                job, batcher, writer=getattr(self.state, "prediction_writer", None),
+            )
+        except HTTPException as e:
+            # Queue full or model still loading: try again later
+            attempts = job["attempts"] + (0 if isinstance(e, ModelNotReady) else 1)
+            if attempts < self.max_attempts:
+                delay = self.retry_delay
+                if delay is None:
+                    delay = int((e.headers or {}).get("Retry-After", 1))
+                await asyncio.sleep(delay)
+                await self.queue.put({**job, "attempts": attempts})
+                self.retried += 1
+                return
+            result = await self._fail(diagnosis_id, e.detail)
+        except Exception as e:
+            result = await self._fail(diagnosis_id, e)
+
+        if result == DiagnosisStatus.COMPLETED:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def _fail(self, diagnosis_id: UUID, error) -> DiagnosisStatus:
+        print(f"⚠️  Diagnosis job {diagnosis_id} failed: {error}")
+        try:
+            await DiagnosisService.set_status(diagnosis_id, DiagnosisStatus.FAILED)
+        except Exception as e:
+            print(f"⚠️  Could not mark diagnosis {diagnosis_id} failed: {e}")
+        return DiagnosisStatus.FAILED
+
+    async def stats(self) -> Dict:
+        try:
+            depth = await self.queue.depth()
+        except Exception:
+            depth = None
+        return {
+            "backend":     self.queue.backend,
+            "concurrency": self.concurrency,
+            "queued":      depth,
+            "enqueued":    self.enqueued,
+            "completed":   self.completed,
+            "failed":      self.failed,
+            "retried":     self.retried,
+            "recovered":   self.recovered,
+        }
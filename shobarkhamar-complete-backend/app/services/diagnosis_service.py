@@ -1,14 +1,23 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, select, update, delete, insert, func, text, tuple_
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status, UploadFile
 from uuid import UUID
-from typing import List, Optional
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+import asyncio
+import enum
+import json
 import os
 from datetime import datetime
 from app.models.diagnosis import Diagnosis, DiagnosisSymptom, DiagnosisImage, DiagnosisStatus
-from app.schemas.diagnosis import DiagnosisCreate, DiagnosisUpdate
+from app.schemas.diagnosis import DiagnosisCreate, DiagnosisUpdate, DiagnosisExpand
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.disease import Disease, TargetSpecies
+from app.services.disease_service import SymptomService
+from app.services.events import event_hub
+from app.services.notification_service import NotificationService
 
 
 # Disease name mapping from VGG16 class codes
@@ -49,8 +58,44 @@ def _build_ai_result(disease_code: str, confidence: float) -> dict:
     }
 
 
+def _aggregate_primary(predictions: List[Dict]) -> Optional[Dict]:
+    """
+    Pick the prediction that represents a multi-image diagnosis: the most
+    confident disease finding if any image shows one, otherwise the most
+    confident healthy/not-X result.
+    """
+    if not predictions:
+        return None
+    diseased = [p for p in predictions if not p['is_healthy']]
+    pool = diseased or predictions
+    return max(pool, key=lambda p: p['primary_prediction']['confidence'])['primary_prediction']
+
+
+# What a history row selects instead of the Diagnosis entity (DiagnosisSummary)
+HISTORY_COLUMNS = (
+    Diagnosis.diagnosis_id, Diagnosis.farm_id, Diagnosis.unit_id, Diagnosis.target_species,
+    Diagnosis.status, Diagnosis.symptoms_text, Diagnosis.final_disease_id, Diagnosis.ai_confidence,
+    Diagnosis.ai_disease_code, Diagnosis.created_at, Diagnosis.updated_at,
+)
+
+
 class DiagnosisService:
 
+    @staticmethod
+    async def _status_changed(
+        user_id: UUID, diagnosis_id: UUID, status_value: DiagnosisStatus, ai_result: Optional[Dict] = None,
+    ) -> None:
+        """Push the change to the owner's event streams; a finished diagnosis also becomes a notification."""
+        data = {'diagnosis_id': str(diagnosis_id), 'status': status_value.value}
+        if ai_result is not None:
+            data['ai_result'] = ai_result
+        await event_hub.publish(user_id, 'diagnosis', data)
+        if status_value == DiagnosisStatus.COMPLETED and ai_result is not None:
+            try:
+                await NotificationService.notify_diagnosis(user_id, diagnosis_id, ai_result)
+            except Exception as e:
+                print(f"⚠️  Could not create notification for {diagnosis_id}: {e}")
+
     @staticmethod
     async def _fetch_full(db: AsyncSession, diagnosis_id: UUID) -> Diagnosis:
         result = await db.execute(
@@ -72,15 +117,171 @@ class DiagnosisService:
         return await DiagnosisService._fetch_full(db, diagnosis_id)
 
     @staticmethod
-    async def get_by_user(db, user_id: UUID, skip=0, limit=100) -> List[Diagnosis]:
-        result = await db.execute(
-            select(Diagnosis)
-            .options(selectinload(Diagnosis.images), selectinload(Diagnosis.final_disease))
-            .where(Diagnosis.user_id == user_id)
-            .offset(skip).limit(limit)
-            .order_by(Diagnosis.created_at.desc())
+    def _history_filters(
+        user_id: UUID,
+        farm_id: Optional[UUID] = None,
+        status_value: Optional[DiagnosisStatus] = None,
+        species: Optional[TargetSpecies] = None,
+    ) -> Dict:
+        """Column → value for the history filters that are set; user_id always."""
+        filters = {'user_id': user_id, 'farm_id': farm_id, 'status': status_value, 'target_species': species}
+        return {column: value for column, value in filters.items() if value is not None}
+
+    @staticmethod
+    async def get_by_user(
+        db: AsyncSession,
+        user_id: UUID,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        farm_id: Optional[UUID] = None,
+        status_value: Optional[DiagnosisStatus] = None,
+        species: Optional[TargetSpecies] = None,
+        skip: int = 0,
+        expand: Collection[DiagnosisExpand] = (),
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Newest first, keyset-paginated on (created_at, diagnosis_id) — the
+        ix_diagnoses_user_history index order. Returns the page and the
+        cursor for the next one (None on the last page). `skip` is only
+        honoured without a cursor, for clients that still page by offset.
+
+        Rows are plain dicts of HISTORY_COLUMNS plus the final disease's
+        name, the image count and the first image's URL, all from one
+        statement. `expand` adds the nested images / final disease (with
+        its symptoms) as ORM objects, one query each for the whole page.
+        """
+        query = DiagnosisService.history_query(user_id, farm_id, status_value, species, cursor)
+        if not cursor and skip:
+            query = query.offset(skip)
+
+        # One extra row tells whether there is a next page
+        result = await db.execute(query.limit(limit + 1))
+        rows = [dict(row) for row in result.mappings()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['diagnosis_id'])
+
+        if expand and rows:
+            await DiagnosisService._expand_history(db, rows, expand)
+        return rows, next_cursor
+
+    @staticmethod
+    def history_query(
+        user_id: UUID,
+        farm_id: Optional[UUID] = None,
+        status_value: Optional[DiagnosisStatus] = None,
+        species: Optional[TargetSpecies] = None,
+        cursor: Optional[str] = None,
+    ) -> Select:
+        """get_by_user's statement, without the page limit"""
+        filters = DiagnosisService._history_filters(user_id, farm_id, status_value, species)
+        image_count = (
+            select(func.count())
+            .where(DiagnosisImage.diagnosis_id == Diagnosis.diagnosis_id)
+            .correlate(Diagnosis)
+            .scalar_subquery()
+        )
+        first_image_url = (
+            select(DiagnosisImage.image_url)
+            .where(DiagnosisImage.diagnosis_id == Diagnosis.diagnosis_id)
+            .order_by(DiagnosisImage.captured_at, DiagnosisImage.diagnosis_image_id)
+            .limit(1)
+            .correlate(Diagnosis)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                *HISTORY_COLUMNS,
+                Disease.disease_name.label('final_disease_name'),
+                image_count.label('image_count'),
+                first_image_url.label('first_image_url'),
+            )
+            .outerjoin(Disease, Disease.disease_id == Diagnosis.final_disease_id)
+            .where(*(getattr(Diagnosis, column) == value for column, value in filters.items()))
+            .order_by(Diagnosis.created_at.desc(), Diagnosis.diagnosis_id.desc())
+        )
+        if cursor:
+            query = query.where(
+                tuple_(Diagnosis.created_at, Diagnosis.diagnosis_id) < tuple_(*decode_cursor(cursor))
+            )
+        return query
+
+    @staticmethod
+    async def _expand_history(db: AsyncSession, rows: List[Dict], expand: Collection[DiagnosisExpand]) -> None:
+        if DiagnosisExpand.IMAGES in expand:
+            result = await db.execute(DiagnosisService.images_query([row['diagnosis_id'] for row in rows]))
+            images: Dict[UUID, List[DiagnosisImage]] = {}
+            for image in result.scalars():
+                images.setdefault(image.diagnosis_id, []).append(image)
+            for row in rows:
+                row['images'] = images.get(row['diagnosis_id'], [])
+
+        if DiagnosisExpand.FINAL_DISEASE in expand:
+            disease_ids = {row['final_disease_id'] for row in rows if row['final_disease_id']}
+            diseases = {}
+            if disease_ids:
+                result = await db.execute(
+                    select(Disease)
+                    .options(selectinload(Disease.symptoms))
+                    .where(Disease.disease_id.in_(disease_ids))
+                )
+                diseases = {disease.disease_id: disease for disease in result.scalars()}
+            for row in rows:
+                row['final_disease'] = diseases.get(row['final_disease_id'])
+
+    @staticmethod
+    def images_query(diagnosis_ids: List[UUID]) -> Select:
+        """Images of a history page, for expand=images"""
+        return (
+            select(DiagnosisImage)
+            .where(DiagnosisImage.diagnosis_id.in_(diagnosis_ids))
+            .order_by(DiagnosisImage.captured_at, DiagnosisImage.diagnosis_image_id)
+        )
+
+    @staticmethod
+    async def count_by_user(
+        db: AsyncSession,
+        user_id: UUID,
+        farm_id: Optional[UUID] = None,
+        status_value: Optional[DiagnosisStatus] = None,
+        species: Optional[TargetSpecies] = None,
+        estimate: bool = False,
+    ) -> int:
+        """
+        Rows matching the history filters. `estimate` asks the planner
+        instead of counting — no rows are read, but the figure is only as
+        good as the table statistics.
+        """
+        filters = DiagnosisService._history_filters(user_id, farm_id, status_value, species)
+        if estimate:
+            where = " AND ".join(f"{column} = :{column}" for column in filters)
+            params = {c: v.name if isinstance(v, enum.Enum) else v for c, v in filters.items()}
+            result = await db.execute(
+                text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM diagnoses WHERE {where}"), params
+            )
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+        result = await db.execute(DiagnosisService.count_query(user_id, farm_id, status_value, species))
+        return result.scalar_one()
+
+    @staticmethod
+    def count_query(
+        user_id: UUID,
+        farm_id: Optional[UUID] = None,
+        status_value: Optional[DiagnosisStatus] = None,
+        species: Optional[TargetSpecies] = None,
+    ) -> Select:
+        """count_by_user's exact statement"""
+        filters = DiagnosisService._history_filters(user_id, farm_id, status_value, species)
+        return (
+            select(func.count())
+            .select_from(Diagnosis)
+            .where(*(getattr(Diagnosis, column) == value for column, value in filters.items()))
         )
-        return result.scalars().all()
 
     @staticmethod
     async def create(db: AsyncSession, user_id: UUID, diagnosis_data: DiagnosisCreate) -> Diagnosis:
@@ -94,9 +295,7 @@ class DiagnosisService:
         )
         db.add(diagnosis)
         await db.flush()
-
-        for symptom_id in (diagnosis_data.symptom_ids or []):
-            db.add(DiagnosisSymptom(diagnosis_id=diagnosis.diagnosis_id, symptom_id=symptom_id))
+        await DiagnosisService._add_symptoms(db, diagnosis.diagnosis_id, diagnosis_data.symptom_ids or [])
 
         await db.commit()
         return await DiagnosisService._fetch_full(db, diagnosis.diagnosis_id)
@@ -107,76 +306,353 @@ class DiagnosisService:
         for field, value in diagnosis_data.dict(exclude_unset=True, exclude={'symptom_ids'}).items():
             setattr(diagnosis, field, value)
         if diagnosis_data.symptom_ids is not None:
-            for sid in diagnosis_data.symptom_ids:
-                db.add(DiagnosisSymptom(diagnosis_id=diagnosis_id, symptom_id=sid))
+            await db.execute(delete(DiagnosisSymptom).where(DiagnosisSymptom.diagnosis_id == diagnosis_id))
+            await DiagnosisService._add_symptoms(db, diagnosis_id, diagnosis_data.symptom_ids)
+            # Reloaded by _fetch_full below
+            db.expire(diagnosis, ["symptoms"])
         diagnosis.updated_at = datetime.utcnow()
         await db.commit()
+        if diagnosis_data.status is not None:
+            await DiagnosisService._status_changed(diagnosis.user_id, diagnosis_id, diagnosis.status)
         return await DiagnosisService._fetch_full(db, diagnosis_id)
 
+    @staticmethod
+    async def _add_symptoms(db: AsyncSession, diagnosis_id: UUID, symptom_ids: List[UUID]) -> None:
+        """Link the symptoms in one INSERT, after checking they all exist in one SELECT"""
+        symptoms = await SymptomService.get_many(db, symptom_ids)
+        if symptoms:
+            await db.execute(
+                insert(DiagnosisSymptom),
+                [{"diagnosis_id": diagnosis_id, "symptom_id": symptom.symptom_id} for symptom in symptoms],
+            )
+
     @staticmethod
     async def delete(db: AsyncSession, diagnosis_id: UUID) -> None:
         diagnosis = await DiagnosisService._fetch_full(db, diagnosis_id)
         await db.delete(diagnosis)
         await db.commit()
 
+    @staticmethod
+    def persist_upload(diagnosis_id: UUID, original_name: Optional[str], data: bytes, index: int = 0):
+        """
+        Start writing an upload to UPLOAD_DIR on a worker thread.
+
+        Returns (image_url, write_task) right away so inference can run
+        on the in-memory bytes while the disk write happens; await the
+        task before committing a row that points at the file.
+        """
+        ext = os.path.splitext(original_name or 'img.jpg')[1] or '.jpg'
+        filename = f"{diagnosis_id}_{datetime.utcnow().timestamp()}_{index}{ext}"
+        file_path = os.path.join(settings.UPLOAD_DIR, filename)
+
+        def write():
+            os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+            with open(file_path, 'wb') as buf:
+                buf.write(data)
+
+        return f'/uploads/{filename}', asyncio.create_task(asyncio.to_thread(write))
+
+    @staticmethod
+    async def discard_upload(image_url: str, saved: asyncio.Task) -> None:
+        """Remove a persist_upload file whose row will not be committed, once its write has finished"""
+        await asyncio.gather(saved, return_exceptions=True)
+        path = os.path.join(settings.UPLOAD_DIR, os.path.basename(image_url))
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            pass
+
     @staticmethod
     async def upload_image(
         db: AsyncSession,
         diagnosis_id: UUID,
         file: UploadFile,
-        ai_detector=None,
+        batcher=None,
+        writer=None,
     ):
         """
-        1. Save image to disk
-        2. Run AI inference if model is loaded
+        1. Save image to disk (in the background, off the inference path)
+        2. Run AI inference on the in-memory bytes through the model's MicroBatcher
         3. Store ai_disease_code + ai_confidence on the Diagnosis row
-        4. Return (DiagnosisImage, ai_result_dict | None)
+        4. Hand the top-k predictions to the PredictionWriter (written in bulk later)
+        5. Return (DiagnosisImage, ai_result_dict | None)
         """
         await DiagnosisService._fetch_full(db, diagnosis_id)  # verify exists
 
-        # Save file
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        ext = os.path.splitext(file.filename or 'img.jpg')[1] or '.jpg'
-        filename = f"{diagnosis_id}_{datetime.utcnow().timestamp()}{ext}"
-        file_path = os.path.join(settings.UPLOAD_DIR, filename)
-        with open(file_path, 'wb') as buf:
-            buf.write(await file.read())
+        data = await file.read()
+        image_url, saved = DiagnosisService.persist_upload(diagnosis_id, file.filename, data)
+        try:
+            # Image record
+            diagnosis_image = DiagnosisImage(
+                diagnosis_id=diagnosis_id,
+                image_url=image_url,
+            )
+            db.add(diagnosis_image)
 
-        # Image record
-        diagnosis_image = DiagnosisImage(
-            diagnosis_id=diagnosis_id,
-            image_url=f'/uploads/{filename}',
-        )
-        db.add(diagnosis_image)
+            # Re-fetch for update
+            result = await db.execute(select(Diagnosis).where(Diagnosis.diagnosis_id == diagnosis_id))
+            diagnosis = result.scalar_one()
 
-        # Re-fetch for update
-        result = await db.execute(select(Diagnosis).where(Diagnosis.diagnosis_id == diagnosis_id))
-        diagnosis = result.scalar_one()
+            ai_result = None
+            prediction = None
 
-        ai_result = None
+            if batcher is not None:
+                try:
+                    diagnosis.status = DiagnosisStatus.PROCESSING
+                    await db.flush()
 
-        if ai_detector is not None:
-            try:
-                diagnosis.status = DiagnosisStatus.PROCESSING
-                await db.flush()
+                    prediction = await batcher.predict(data)
+                    primary = prediction['primary_prediction']
 
-                prediction = ai_detector.predict(file_path)
-                primary = prediction['primary_prediction']
+                    diagnosis.ai_confidence  = primary['confidence']
+                    diagnosis.ai_disease_code = primary['disease_code']
+                    diagnosis.status = DiagnosisStatus.COMPLETED
+                    ai_result = _build_ai_result(primary['disease_code'], primary['confidence'])
 
-                diagnosis.ai_confidence  = primary['confidence']
-                diagnosis.ai_disease_code = primary['disease_code']
+                    print(f"✓ AI: {primary['disease_name']} ({primary['confidence_percent']}%)")
+                except HTTPException:
+                    raise  # queue full → 503, let the client retry
+                except Exception as e:
+                    prediction = None
+                    diagnosis.status = DiagnosisStatus.FAILED
+                    print(f"⚠️  AI inference error: {e}")
+            else:
                 diagnosis.status = DiagnosisStatus.COMPLETED
-                ai_result = _build_ai_result(primary['disease_code'], primary['confidence'])
 
-                print(f"✓ AI: {primary['disease_name']} ({primary['confidence_percent']}%)")
+            await saved  # never commit a row pointing at a file that isn't there yet
+            diagnosis.updated_at = datetime.utcnow()
+            await db.commit()
+        except BaseException:
+            # 503 (queue full), a failed commit or a client disconnect: no row will point at the file
+            await DiagnosisService.discard_upload(image_url, saved)
+            raise
+        await db.refresh(diagnosis_image)
+
+        if writer is not None and prediction is not None:
+            writer.record(batcher.name, diagnosis_id, diagnosis_image.diagnosis_image_id, prediction)
+        await DiagnosisService._status_changed(diagnosis.user_id, diagnosis_id, diagnosis.status, ai_result)
+
+        return diagnosis_image, ai_result
+
+    @staticmethod
+    async def enqueue_image(db: AsyncSession, diagnosis_id: UUID, file: UploadFile) -> Tuple[DiagnosisImage, Diagnosis]:
+        """
+        Async-mode upload: write the file and its DiagnosisImage row and mark
+        the diagnosis PENDING. Inference runs later from the job queue.
+        """
+        diagnosis = await DiagnosisService._fetch_full(db, diagnosis_id)
+
+        data = await file.read()
+        image_url, saved = DiagnosisService.persist_upload(diagnosis_id, file.filename, data)
+        try:
+            diagnosis_image = DiagnosisImage(diagnosis_id=diagnosis_id, image_url=image_url)
+            db.add(diagnosis_image)
+            diagnosis.status = DiagnosisStatus.PENDING
+            diagnosis.updated_at = datetime.utcnow()
+
+            await saved  # the worker reads the image back from UPLOAD_DIR
+            await db.commit()
+        except BaseException:
+            await DiagnosisService.discard_upload(image_url, saved)
+            raise
+        await db.refresh(diagnosis_image)
+        await DiagnosisService._status_changed(diagnosis.user_id, diagnosis_id, DiagnosisStatus.PENDING)
+        return diagnosis_image, diagnosis
+
+    @staticmethod
+    async def set_status(diagnosis_id: UUID, status_value: DiagnosisStatus) -> None:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(Diagnosis)
+                    .where(Diagnosis.diagnosis_id == diagnosis_id)
+                    .values(status=status_value, updated_at=datetime.utcnow())
+                    .returning(Diagnosis.user_id)
+                )
+                user_id = result.scalar_one_or_none()
+        if user_id is not None:
+            await DiagnosisService._status_changed(user_id, diagnosis_id, status_value)
+
+    @staticmethod
+    async def get_status(db: AsyncSession, diagnosis_id: UUID, user_id: Optional[UUID] = None) -> Dict:
+        """
+        Status columns only — what pollers and the event stream need.
+        With `user_id`, another user's diagnosis is a 404 like a missing one.
+        """
+        query = select(
+            Diagnosis.user_id, Diagnosis.status, Diagnosis.ai_disease_code, Diagnosis.ai_confidence,
+            Diagnosis.updated_at,
+        ).where(Diagnosis.diagnosis_id == diagnosis_id)
+        if user_id is not None:
+            query = query.where(Diagnosis.user_id == user_id)
+        result = await db.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Diagnosis not found")
+
+        ai_result = _build_ai_result(row.ai_disease_code, row.ai_confidence) if row.ai_disease_code else None
+        return {
+            'diagnosis_id': str(diagnosis_id),
+            'user_id':      row.user_id,
+            'status':       row.status.value,
+            'ai_result':    ai_result,
+            'updated_at':   row.updated_at,
+        }
+
+    @staticmethod
+    async def run_job(job: Dict, batcher, writer=None) -> DiagnosisStatus:
+        """
+        Inference for one queued image, with its own session:
+        PROCESSING → COMPLETED / FAILED. HTTPExceptions (queue full, model
+        still loading) propagate so the job can be retried.
+        """
+        diagnosis_id = UUID(job['diagnosis_id'])
+        await DiagnosisService.set_status(diagnosis_id, DiagnosisStatus.PROCESSING)
+
+        prediction = None
+        if batcher is not None:
+            path = os.path.join(settings.UPLOAD_DIR, os.path.basename(job['image_url']))
+
+            def read():
+                with open(path, 'rb') as buf:
+                    return buf.read()
+
+            try:
+                data = await asyncio.to_thread(read)
+                prediction = await batcher.predict(data)
+            except HTTPException:
+                raise
             except Exception as e:
-                diagnosis.status = DiagnosisStatus.FAILED
                 print(f"⚠️  AI inference error: {e}")
-        else:
-            diagnosis.status = DiagnosisStatus.COMPLETED
+                await DiagnosisService.set_status(diagnosis_id, DiagnosisStatus.FAILED)
+                return DiagnosisStatus.FAILED
 
-        diagnosis.updated_at = datetime.utcnow()
-        await db.commit()
-        await db.refresh(diagnosis_image)
+        ai_result = None
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                values = {'status': DiagnosisStatus.COMPLETED, 'updated_at': datetime.utcnow()}
+                if prediction is not None:
+                    primary = prediction['primary_prediction']
+                    values.update(ai_confidence=primary['confidence'], ai_disease_code=primary['disease_code'])
+                    ai_result = _build_ai_result(primary['disease_code'], primary['confidence'])
+                result = await session.execute(
+                    update(Diagnosis).where(Diagnosis.diagnosis_id == diagnosis_id).values(**values)
+                    .returning(Diagnosis.user_id)
+                )
+                user_id = result.scalar_one_or_none()
 
-        return diagnosis_image, ai_result
+        if writer is not None and prediction is not None:
+            writer.record(batcher.name, diagnosis_id, UUID(job['diagnosis_image_id']), prediction)
+        if user_id is not None:
+            await DiagnosisService._status_changed(user_id, diagnosis_id, DiagnosisStatus.COMPLETED, ai_result)
+        return DiagnosisStatus.COMPLETED
+
+    @staticmethod
+    async def process_image_batch(
+        diagnosis_id: UUID,
+        uploads: List[Dict],
+        batcher,
+        emit: Callable[[Dict], None],
+        writer=None,
+    ) -> None:
+        """
+        Run in-memory uploads ({'filename', 'data'}) through the batcher and
+        `emit` one event per image as it finishes, while the files are
+        written to UPLOAD_DIR in the background. Then write every
+        DiagnosisImage row and the Diagnosis aggregate in a single
+        transaction and emit a summary.
+
+        Runs with its own session so it completes (and commits) even if the
+        client streaming the events disconnects half way.
+        """
+        writes = []
+        for i, upload in enumerate(uploads):
+            upload['image_url'], saved = DiagnosisService.persist_upload(
+                diagnosis_id, upload['filename'], upload['data'], index=i
+            )
+            writes.append(saved)
+
+        async def run(i: int, upload: Dict):
+            try:
+                return i, await batcher.predict(upload['data']), None
+            except Exception as e:
+                return i, None, e
+
+        predictions: List[Optional[Dict]] = [None] * len(uploads)
+
+        try:
+            if batcher is not None:
+                for next_done in asyncio.as_completed([run(i, u) for i, u in enumerate(uploads)]):
+                    i, prediction, error = await next_done
+                    event = {
+                        'event':     'image',
+                        'index':     i,
+                        'filename':  uploads[i]['filename'],
+                        'image_url': uploads[i]['image_url'],
+                    }
+                    if error is not None:
+                        detail = getattr(error, 'detail', None) or str(error)
+                        emit({**event, 'status': 'error', 'error': detail})
+                        continue
+
+                    predictions[i] = prediction
+                    primary = prediction['primary_prediction']
+                    emit({
+                        **event,
+                        'status':          'success',
+                        'ai_result':       _build_ai_result(primary['disease_code'], primary['confidence']),
+                        'all_predictions': prediction['all_predictions'],
+                    })
+
+            succeeded = [p for p in predictions if p is not None]
+            primary = _aggregate_primary(succeeded)
+            await asyncio.gather(*writes)
+
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    images = [
+                        DiagnosisImage(diagnosis_id=diagnosis_id, image_url=u['image_url'])
+                        for u in uploads
+                    ]
+                    session.add_all(images)
+
+                    result = await session.execute(select(Diagnosis).where(Diagnosis.diagnosis_id == diagnosis_id))
+                    diagnosis = result.scalar_one()
+                    if primary is not None:
+                        diagnosis.ai_confidence   = primary['confidence']
+                        diagnosis.ai_disease_code = primary['disease_code']
+                        diagnosis.status = DiagnosisStatus.COMPLETED
+                    elif batcher is None:
+                        diagnosis.status = DiagnosisStatus.COMPLETED
+                    else:
+                        diagnosis.status = DiagnosisStatus.FAILED
+                    diagnosis.updated_at = datetime.utcnow()
+                    status_value = diagnosis.status
+                    user_id = diagnosis.user_id
+
+                image_ids = [str(img.diagnosis_image_id) for img in images]
+        except BaseException:
+            # Nothing was committed, so no row points at these files
+            await asyncio.gather(*(
+                DiagnosisService.discard_upload(u['image_url'], saved) for u, saved in zip(uploads, writes)
+            ))
+            raise
+
+        if writer is not None:
+            for img, prediction in zip(images, predictions):
+                if prediction is not None:
+                    writer.record(batcher.name, diagnosis_id, img.diagnosis_image_id, prediction)
+
+        ai_result = _build_ai_result(primary['disease_code'], primary['confidence']) if primary else None
+        await DiagnosisService._status_changed(user_id, diagnosis_id, status_value, ai_result)
+
+        emit({
+            'event':        'summary',
+            'diagnosis_id': str(diagnosis_id),
+            'status':       status_value.value,
+            'images':       len(uploads),
+            'succeeded':    len(succeeded),
+            'failed':       len(uploads) - len(succeeded) if batcher is not None else 0,
+            'image_ids':    image_ids,
+            'ai_result':    ai_result,
+        })
@@ -1,11 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, delete
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
 from uuid import UUID
-from typing import List
-from app.models.disease import Disease, Symptom
-from app.schemas.disease import DiseaseCreate, DiseaseUpdate, SymptomCreate, SymptomUpdate
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import csv
+import io
+from app.models.disease import Disease, Symptom, disease_symptoms
+from app.models.treatment import Treatment, DiseaseTreatment
+from app.schemas.disease import (
+    DiseaseCreate, DiseaseUpdate, SymptomCreate, SymptomUpdate,
+    CatalogueImport, CatalogueImportResponse
+)
+from app.services.catalogue_cache import catalogue_cache
 
 
 class DiseaseService:
@@ -35,10 +43,16 @@ class DiseaseService:
         result = await db.execute(
             select(Disease)
             .options(selectinload(Disease.symptoms))
+            .order_by(Disease.disease_name, Disease.disease_id)
             .offset(skip)
             .limit(limit)
         )
         return result.scalars().all()
+
+    @staticmethod
+    async def count(db: AsyncSession) -> int:
+        result = await db.execute(select(func.count()).select_from(Disease))
+        return result.scalar_one()
     
     @staticmethod
     async def create(db: AsyncSession, disease_data: DiseaseCreate) -> Disease:
@@ -62,17 +76,14 @@ class DiseaseService:
             severity_level=disease_data.severity_level
         )
         
-        # Add symptoms
-        if disease_data.symptom_ids:
-            for symptom_id in disease_data.symptom_ids:
-                symptom = await SymptomService.get_by_id(db, symptom_id)
-                disease.symptoms.append(symptom)
+        disease.symptoms = await SymptomService.get_many(db, disease_data.symptom_ids)
         
         db.add(disease)
         await db.commit()
-        await db.refresh(disease)
+        await catalogue_cache.invalidate()
         
-        return disease
+        # refresh() would expire the symptoms, which can't lazy-load here
+        return await DiseaseService.get_by_id(db, disease.disease_id)
     
     @staticmethod
     async def update(db: AsyncSession, disease_id: UUID, disease_data: DiseaseUpdate) -> Disease:
@@ -85,15 +96,12 @@ class DiseaseService:
         
         # Update symptoms if provided
         if disease_data.symptom_ids is not None:
-            disease.symptoms = []
-            for symptom_id in disease_data.symptom_ids:
-                symptom = await SymptomService.get_by_id(db, symptom_id)
-                disease.symptoms.append(symptom)
+            disease.symptoms = await SymptomService.get_many(db, disease_data.symptom_ids)
         
         await db.commit()
-        await db.refresh(disease)
+        await catalogue_cache.invalidate()
         
-        return disease
+        return await DiseaseService.get_by_id(db, disease_id)
     
     @staticmethod
     async def delete(db: AsyncSession, disease_id: UUID) -> None:
@@ -101,6 +109,7 @@ class DiseaseService:
         disease = await DiseaseService.get_by_id(db, disease_id)
         await db.delete(disease)
         await db.commit()
+        await catalogue_cache.invalidate()
 
 
 class SymptomService:
@@ -119,12 +128,32 @@ class SymptomService:
             )
         
         return symptom
+
+    @staticmethod
+    async def get_many(db: AsyncSession, symptom_ids: Iterable[UUID]) -> List[Symptom]:
+        """Symptoms for `symptom_ids` in one query, in the given order; 404 lists every missing id"""
+        symptom_ids = list(dict.fromkeys(symptom_ids))
+        if not symptom_ids:
+            return []
+
+        result = await db.execute(select(Symptom).where(Symptom.symptom_id.in_(symptom_ids)))
+        found = {symptom.symptom_id: symptom for symptom in result.scalars()}
+
+        missing = [str(symptom_id) for symptom_id in symptom_ids if symptom_id not in found]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"message": "Symptoms not found", "missing_ids": missing}
+            )
+
+        return [found[symptom_id] for symptom_id in symptom_ids]
     
     @staticmethod
     async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Symptom]:
         """Get all symptoms"""
         result = await db.execute(
             select(Symptom)
+            .order_by(Symptom.symptom_name, Symptom.symptom_id)
             .offset(skip)
             .limit(limit)
         )
@@ -138,6 +167,7 @@ class SymptomService:
         db.add(symptom)
         await db.commit()
         await db.refresh(symptom)
+        await catalogue_cache.invalidate()
         
         return symptom
     
@@ -151,6 +181,7 @@ class SymptomService:
         
         await db.commit()
         await db.refresh(symptom)
+        await catalogue_cache.invalidate()
         
         return symptom
     
@@ -160,3 +191,247 @@ class SymptomService:
         symptom = await SymptomService.get_by_id(db, symptom_id)
         await db.delete(symptom)
         await db.commit()
+        await catalogue_cache.invalidate()
+
+
+class CatalogueService:
+    """
+    Bulk import of a disease / symptom / treatment catalogue.
+
+    Records are matched to existing rows by name (symptoms by name and
+    species, since "Lethargy" is a different row for fish and poultry,
+    and a disease's symptoms are those of its own species): matches are
+    updated, the rest inserted with one multi-row INSERT per table, and each
+    imported disease's symptom and treatment links are replaced. The
+    whole import is one transaction, so a bad reference leaves the
+    catalogue untouched.
+    """
+
+    # One row per disease and symptom and/or treatment; disease columns
+    # only need to be filled on the first row of each disease
+    CSV_COLUMNS = (
+        "disease_name", "target_species", "description", "contagious", "severity_level",
+        "symptom_name", "symptom_description",
+        "treatment_name", "medication_name", "application_method", "dosage_text", "duration_days",
+        "precaution", "alternatives_note", "effectiveness_notes", "is_primary_treatment",
+    )
+    DISEASE_FIELDS = ("disease_name", "target_species", "description", "contagious", "severity_level")
+    TREATMENT_FIELDS = (
+        "treatment_name", "medication_name", "application_method", "dosage_text", "duration_days",
+        "precaution", "alternatives_note",
+    )
+
+    @staticmethod
+    def parse_json(data: bytes) -> CatalogueImport:
+        try:
+            return CatalogueImport.model_validate_json(data)
+        except ValidationError as e:
+            raise CatalogueService._invalid(e)
+
+    @staticmethod
+    def parse_csv(data: bytes) -> CatalogueImport:
+        """Fold the flat CSV rows into the same structure as the JSON format"""
+        try:
+            reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8")
+
+        unknown = set(reader.fieldnames or ()) - set(CatalogueService.CSV_COLUMNS)
+        if unknown or "disease_name" not in (reader.fieldnames or ()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"message": "Unexpected CSV columns", "unknown": sorted(unknown),
+                        "expected": list(CatalogueService.CSV_COLUMNS)}
+            )
+
+        diseases: Dict[str, dict] = {}
+        symptom_descriptions: Dict[Tuple[str, str], Optional[str]] = {}
+        treatments: Dict[str, dict] = {}
+        for line, row in enumerate(reader, start=2):
+            row = {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+            if "disease_name" not in row:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"CSV line {line}: disease_name is required"
+                )
+
+            disease = diseases.setdefault(row["disease_name"], {"symptoms": [], "treatments": []})
+            for field in CatalogueService.DISEASE_FIELDS:
+                if field in row:
+                    disease.setdefault(field, row[field])
+
+            name = row.get("symptom_name")
+            if name:
+                if name not in disease["symptoms"]:
+                    disease["symptoms"].append(name)
+                symptom_descriptions.setdefault((row["disease_name"], name), row.get("symptom_description"))
+
+            name = row.get("treatment_name")
+            if name:
+                disease["treatments"].append({
+                    "treatment_name": name,
+                    "effectiveness_notes": row.get("effectiveness_notes"),
+                    "is_primary_treatment": row.get("is_primary_treatment", False),
+                })
+                # Without an application_method the row only links a treatment defined elsewhere
+                if "application_method" in row:
+                    treatments.setdefault(name, {
+                        field: row[field] for field in CatalogueService.TREATMENT_FIELDS if field in row
+                    })
+
+        # A symptom takes its disease's species, which may be given on a later row
+        symptoms: Dict[Tuple[str, Optional[str]], dict] = {}
+        for (disease_name, name), description in symptom_descriptions.items():
+            species = diseases[disease_name].get("target_species")
+            symptom = symptoms.setdefault((name, species), {"symptom_name": name, "target_species": species})
+            # A blank description cell leaves the stored one alone
+            if description:
+                symptom.setdefault("symptom_description", description)
+
+        try:
+            return CatalogueImport(
+                symptoms=list(symptoms.values()),
+                treatments=list(treatments.values()),
+                diseases=list(diseases.values()),
+            )
+        except ValidationError as e:
+            raise CatalogueService._invalid(e)
+
+    @staticmethod
+    async def import_catalogue(db: AsyncSession, catalogue: CatalogueImport) -> CatalogueImportResponse:
+        CatalogueService._check_unique("symptom", [
+            f"{s.symptom_name} ({s.target_species.value})" for s in catalogue.symptoms
+        ])
+        CatalogueService._check_unique("treatment", [t.treatment_name for t in catalogue.treatments])
+        CatalogueService._check_unique("disease", [d.disease_name for d in catalogue.diseases])
+
+        symptom_refs = {(name, d.target_species) for d in catalogue.diseases for name in d.symptoms}
+        symptom_ids, symptoms_created, symptoms_updated = await CatalogueService._upsert(
+            db, Symptom, ("symptom_name", "target_species"), "symptom_id",
+            catalogue.symptoms,
+            referenced=symptom_refs,
+        )
+        treatment_refs = {(link.treatment_name,) for d in catalogue.diseases for link in d.treatments}
+        treatment_ids, treatments_created, treatments_updated = await CatalogueService._upsert(
+            db, Treatment, ("treatment_name",), "treatment_id",
+            catalogue.treatments,
+            referenced=treatment_refs,
+        )
+
+        missing = {
+            "symptoms": sorted(
+                f"{name} ({species.value})" for name, species in symptom_refs - symptom_ids.keys()
+            ),
+            "treatments": sorted(name for name, in treatment_refs - treatment_ids.keys()),
+        }
+        if missing["symptoms"] or missing["treatments"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"message": "Diseases refer to symptoms or treatments that do not exist", "missing": missing}
+            )
+
+        disease_ids, diseases_created, diseases_updated = await CatalogueService._upsert(
+            db, Disease, ("disease_name",), "disease_id",
+            catalogue.diseases, exclude={"symptoms", "treatments"},
+        )
+        disease_ids = {name: disease_id for (name,), disease_id in disease_ids.items()}
+
+        imported = [disease_ids[d.disease_name] for d in catalogue.diseases]
+        if imported:
+            await db.execute(delete(disease_symptoms).where(disease_symptoms.c.disease_id.in_(imported)))
+            await db.execute(delete(DiseaseTreatment).where(DiseaseTreatment.disease_id.in_(imported)))
+
+        symptom_links = [
+            {"disease_id": disease_ids[d.disease_name], "symptom_id": symptom_ids[(name, d.target_species)]}
+            for d in catalogue.diseases for name in dict.fromkeys(d.symptoms)
+        ]
+        treatment_links = list({
+            (d.disease_name, link.treatment_name): {
+                "disease_id": disease_ids[d.disease_name],
+                "treatment_id": treatment_ids[(link.treatment_name,)],
+                "effectiveness_notes": link.effectiveness_notes,
+                "is_primary_treatment": link.is_primary_treatment,
+            }
+            for d in catalogue.diseases for link in d.treatments
+        }.values())
+        if symptom_links:
+            await db.execute(insert(disease_symptoms), symptom_links)
+        if treatment_links:
+            await db.execute(insert(DiseaseTreatment), treatment_links)
+
+        await db.commit()
+        await catalogue_cache.invalidate()
+
+        return CatalogueImportResponse(
+            diseases_created=diseases_created, diseases_updated=diseases_updated,
+            symptoms_created=symptoms_created, symptoms_updated=symptoms_updated,
+            treatments_created=treatments_created, treatments_updated=treatments_updated,
+        )
+
+    @staticmethod
+    async def _upsert(
+        db: AsyncSession, model, key_fields: Tuple[str, ...], id_field: str, rows: List[BaseModel],
+        referenced: Iterable[tuple] = (), exclude: Set[str] = frozenset()
+    ) -> Tuple[Dict[tuple, UUID], int, int]:
+        """
+        Update the rows of `model` whose `key_fields` values match, insert
+        the others. A match only gets the fields its record sets, so an
+        omitted optional field keeps its stored value; inserts take the
+        schema defaults.
+
+        Returns key tuple → id for every row plus any `referenced` keys that
+        already exist, looked up in the same query.
+        """
+        def key(item) -> tuple:
+            return tuple(getattr(item, field) for field in key_fields)
+
+        keys = {key(row) for row in rows} | set(referenced)
+        if not keys:
+            return {}, 0, 0
+
+        # Narrow by name in SQL; the rest of the key is compared here
+        name_field = key_fields[0]
+        result = await db.execute(
+            select(model).where(getattr(model, name_field).in_({k[0] for k in keys}))
+        )
+        existing = {}
+        for obj in result.scalars():
+            if key(obj) in keys:
+                existing.setdefault(key(obj), obj)
+
+        new_rows = []
+        for row in rows:
+            obj = existing.get(key(row))
+            if obj is None:
+                # Every row of one multi-row INSERT needs the same columns
+                new_rows.append(row.dict(exclude=exclude))
+            else:
+                for field, value in row.dict(exclude_unset=True, exclude=exclude).items():
+                    setattr(obj, field, value)
+        await db.flush()
+
+        ids = {k: getattr(obj, id_field) for k, obj in existing.items()}
+        if new_rows:
+            columns = [getattr(model, field) for field in key_fields]
+            result = await db.execute(insert(model).returning(*columns, getattr(model, id_field)), new_rows)
+            ids.update((tuple(row[:-1]), row[-1]) for row in result.tuples().all())
+
+        return ids, len(new_rows), len(rows) - len(new_rows)
+
+    @staticmethod
+    def _check_unique(kind: str, names: List[str]):
+        seen, duplicates = set(), set()
+        for name in names:
+            (duplicates if name in seen else seen).add(name)
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"message": f"Duplicate {kind} names in import", "duplicates": sorted(duplicates)}
+            )
+
+    @staticmethod
+    def _invalid(error: ValidationError) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[{"loc": list(e["loc"]), "msg": e["msg"]} for e in error.errors()]
+        )
@@ -0,0 +1,219 @@
+"""
+Per-user event fan-out for the server-sent-event streams.
+
+publish() sends an event (diagnosis status change, new notification) to
+every stream the user has open, on any API worker:
+
+  - with Redis, the event is appended to the user's capped stream
+    (`events:{user_id}`, XADD) — which gives it an id and keeps the last
+    EVENTS_REPLAY events for resuming — and then PUBLISHed on one shared
+    channel that every worker is subscribed to; each worker hands it to
+    the streams it holds for that user;
+  - without Redis, only streams on this worker see it, and the replay
+    buffer is kept in memory.
+
+A client reconnecting with `Last-Event-ID` gets the events it missed
+from replay() before live ones; ids are Redis stream ids (`<ms>-<seq>`)
+and are compared numerically to drop duplicates.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+CHANNEL = "events"
+STREAM_PREFIX = "events:"
+# A user's replay stream is dropped after this long without events
+STREAM_TTL = 86400
+# Events buffered per open stream; a stream that falls further behind is closed
+SUBSCRIBER_BUFFER = 256
+
+_EVENT_ID = re.compile(r"^\d+-\d+$")
+
+Event = Tuple[str, str, str]  # (id, event name, JSON data)
+
+
+def event_id_key(event_id: str) -> Tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq)
+
+
+def valid_event_id(event_id: Optional[str]) -> bool:
+    return bool(event_id) and bool(_EVENT_ID.match(event_id))
+
+
+class Subscription:
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        self.overflowed = False
+
+    def deliver(self, event: Event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Close after what is buffered instead of skipping; the client resumes from its last id
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event; None once closed. Raises asyncio.TimeoutError when idle."""
+        if self.overflowed and self.queue.empty():
+            return None
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventHub:
+
+    def __init__(self, replay: int = 100):
+        self.replay_size = max(1, replay)
+        self.redis = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._local: Dict[str, deque] = {}
+        self._last_ms = 0
+        self._seq = 0
+
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    async def start(self, redis=None, replay: Optional[int] = None):
+        if replay is not None:
+            self.replay_size = max(1, replay)
+        self.redis = redis
+        if redis is not None:
+            self._listener = asyncio.create_task(self._listen(), name="event-hub")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.deliver(None)
+
+    # ── public API ─────────────────────────────────────────────
+
+    async def publish(self, user_id, event: str, data: Dict) -> str:
+        """Send `event` to every open stream of `user_id`; returns its id. Never raises."""
+        user_id = str(user_id)
+        payload = json.dumps(data, default=str)
+        self.published += 1
+
+        if self.redis is not None:
+            try:
+                key = f"{STREAM_PREFIX}{user_id}"
+                event_id = await self.redis.xadd(
+                    key, {"event": event, "data": payload}, maxlen=self.replay_size, approximate=True,
+                )
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.expire(key, STREAM_TTL)
+                    pipe.publish(CHANNEL, json.dumps({"user_id": user_id, "id": event_id, "event": event, "data": payload}))
+                    await pipe.execute()
+                return event_id
+            except Exception as e:
+                print(f"⚠️  Event fan-out through Redis failed, delivering locally: {e}")
+
+        event_id = self._next_id()
+        self._local.setdefault(user_id, deque(maxlen=self.replay_size)).append((event_id, event, payload))
+        self._deliver(user_id, (event_id, event, payload))
+        return event_id
+
+    async def replay(self, user_id, last_event_id: str) -> List[Event]:
+        """Events for `user_id` after `last_event_id` that are still retained."""
+        user_id = str(user_id)
+        if not valid_event_id(last_event_id):
+            return []
+        if self.redis is not None:
+            try:
+                entries = await self.redis.xrange(f"{STREAM_PREFIX}{user_id}", min=f"({last_event_id}", max="+")
+                return [(event_id, fields["event"], fields["data"]) for event_id, fields in entries]
+            except Exception as e:
+                print(f"⚠️  Event replay failed: {e}")
+                return []
+        after = event_id_key(last_event_id)
+        return [e for e in self._local.get(user_id, ()) if event_id_key(e[0]) > after]
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        subscription = Subscription(str(user_id))
+        self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+            if subscription.overflowed:
+                self.overflows += 1
+
+    # ── internals ──────────────────────────────────────────────
+
+    def _next_id(self) -> str:
+        now = int(time.time() * 1000)
+        if now > self._last_ms:
+            self._last_ms, self._seq = now, 0
+        else:
+            self._seq += 1
+        return f"{self._last_ms}-{self._seq}"
+
+    def _deliver(self, user_id: str, event: Event):
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.deliver(event)
+            self.delivered += 1
+
+    async def _listen(self):
+        while True:
+            try:
+                self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.subscribe(CHANNEL)
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    item = json.loads(message["data"])
+                    self._deliver(item["user_id"], (item["id"], item["event"], item["data"]))
+            except asyncio.CancelledError:
+                await self._close_pubsub()
+                raise
+            except Exception as e:
+                print(f"⚠️  Event subscription lost ({e}), reconnecting")
+                await self._close_pubsub()
+                await asyncio.sleep(1)
+
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    def stats(self) -> Dict:
+        return {
+            "backend":      "redis" if self.redis is not None else "memory",
+            "users":        len(self._subscribers),
+            "streams":      sum(len(s) for s in self._subscribers.values()),
+            "published":    self.published,
+            "delivered":    self.delivered,
+            "overflows":    self.overflows,
+        }
+
+
+# One per process, like the Redis client in routers/auth.py; started by the lifespan
+event_hub = EventHub()
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from uuid import UUID
@@ -32,12 +32,17 @@ class FarmService:
     @staticmethod
     async def get_by_owner(db: AsyncSession, owner_id: UUID) -> List[Farm]:
         """Get all farms by owner"""
-        result = await db.execute(
+        result = await db.execute(FarmService.owner_query(owner_id))
+        return result.scalars().all()
+
+    @staticmethod
+    def owner_query(owner_id: UUID) -> Select:
+        """get_by_owner's statement; the units come from a second, selectin query"""
+        return (
             select(Farm)
             .options(selectinload(Farm.units))
             .where(Farm.user_id == owner_id)
         )
-        return result.scalars().all()
     
     @staticmethod
     async def create(db: AsyncSession, owner_id: UUID, farm_data: FarmCreate) -> Farm:
@@ -0,0 +1,112 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from fastapi import HTTPException, status
+from uuid import UUID
+from typing import List, Optional
+import os
+from app.models.ai_models import ModelVersion
+from app.schemas.prediction import ModelVersionCreate
+
+
+def artifact_path(artifact_uri: str) -> str:
+    """Local filesystem path for a ModelVersion artifact (`file://` or plain path)."""
+    return artifact_uri[len("file://"):] if artifact_uri.startswith("file://") else artifact_uri
+
+
+class ModelVersionService:
+    """Service for the ModelVersion registry (one active version per model_name)"""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, model_version_id: UUID) -> ModelVersion:
+        """Get model version by ID"""
+        result = await db.execute(
+            select(ModelVersion).where(ModelVersion.model_version_id == model_version_id)
+        )
+        version = result.scalar_one_or_none()
+
+        if not version:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Model version not found"
+            )
+
+        return version
+
+    @staticmethod
+    async def get_all(db: AsyncSession, model_name: Optional[str] = None) -> List[ModelVersion]:
+        """Get all model versions, newest first"""
+        query = select(ModelVersion).order_by(ModelVersion.created_at.desc())
+        if model_name:
+            query = query.where(ModelVersion.model_name == model_name)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_active(db: AsyncSession, model_name: str) -> Optional[ModelVersion]:
+        """Get the active version for `model_name`, if any"""
+        result = await db.execute(
+            select(ModelVersion)
+            .where(ModelVersion.model_name == model_name, ModelVersion.is_active.is_(True))
+            .order_by(ModelVersion.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def ensure_active(db: AsyncSession, model_name: str, artifact_uri: str) -> ModelVersion:
+        """
+        Active version for `model_name`; on first start, registers
+        `artifact_uri` (MODEL_PATH / POULTRY_MODEL_PATH) as the active one.
+        """
+        version = await ModelVersionService.get_active(db, model_name)
+        if version:
+            return version
+
+        version = ModelVersion(
+            model_name=model_name,
+            framework="pytorch",
+            artifact_uri=artifact_uri,
+            is_active=True,
+        )
+        db.add(version)
+        await db.commit()
+        await db.refresh(version)
+        return version
+
+    @staticmethod
+    async def create(db: AsyncSession, version_data: ModelVersionCreate) -> ModelVersion:
+        """Register a new (inactive) model version"""
+        if not os.path.exists(artifact_path(version_data.artifact_uri)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Artifact not found on the API host"
+            )
+
+        version = ModelVersion(
+            model_name=version_data.model_name,
+            framework=version_data.framework,
+            artifact_uri=version_data.artifact_uri,
+            is_active=False,
+        )
+        db.add(version)
+        await db.commit()
+        await db.refresh(version)
+        return version
+
+    @staticmethod
+    async def activate(db: AsyncSession, model_version_id: UUID) -> ModelVersion:
+        """Make this the only active version of its model, in one transaction"""
+        version = await ModelVersionService.get_by_id(db, model_version_id)
+
+        await db.execute(
+            update(ModelVersion)
+            .where(
+                ModelVersion.model_name == version.model_name,
+                ModelVersion.model_version_id != version.model_version_id,
+            )
+            .values(is_active=False)
+        )
+        version.is_active = True
+        await db.commit()
+        await db.refresh(version)
+        return version
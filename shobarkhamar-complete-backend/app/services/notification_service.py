@@ -0,0 +1,107 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, update, func
+from fastapi import HTTPException, status
+from uuid import UUID
+from typing import Dict, List, Tuple
+from datetime import datetime
+from app.core.database import AsyncSessionLocal
+from app.models.notification import Notification, NotificationType
+from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.services.events import event_hub
+
+
+class NotificationService:
+    """Service for user notifications; new ones are pushed to the user's event stream"""
+
+    @staticmethod
+    async def get_by_user(
+        db: AsyncSession, user_id: UUID, unread_only: bool = False, skip: int = 0, limit: int = 50
+    ) -> Tuple[List[Notification], int, int]:
+        """Newest notifications for a user, plus total and unread counts"""
+        result = await db.execute(NotificationService.user_query(user_id, unread_only, skip, limit))
+
+        counts = await db.execute(
+            select(func.count(), func.count().filter(Notification.is_read.is_(False)))
+            .where(Notification.user_id == user_id)
+        )
+        total, unread = counts.one()
+        return result.scalars().all(), total, unread
+
+    @staticmethod
+    def user_query(user_id: UUID, unread_only: bool = False, skip: int = 0, limit: int = 50) -> Select:
+        """get_by_user's page of notifications"""
+        query = select(Notification).where(Notification.user_id == user_id)
+        if unread_only:
+            query = query.where(Notification.is_read.is_(False))
+        return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
+
+    @staticmethod
+    async def mark_read(db: AsyncSession, notification_id: UUID, user_id: UUID, is_read: bool = True) -> Notification:
+        """Mark one of the user's notifications read / unread"""
+        result = await db.execute(
+            select(Notification).where(
+                Notification.notification_id == notification_id,
+                Notification.user_id == user_id,
+            )
+        )
+        notification = result.scalar_one_or_none()
+
+        if not notification:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notification not found"
+            )
+
+        notification.is_read = is_read
+        await db.commit()
+        await db.refresh(notification)
+        return notification
+
+    @staticmethod
+    async def mark_all_read(db: AsyncSession, user_id: UUID) -> None:
+        await db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+            .values(is_read=True)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def create(db: AsyncSession, notification_data: NotificationCreate) -> Notification:
+        """Store a notification and push it to the user's open streams"""
+        notification = Notification(**notification_data.dict(), sent_at=datetime.utcnow())
+        db.add(notification)
+        await db.commit()
+        await db.refresh(notification)
+
+        await event_hub.publish(
+            notification.user_id, "notification",
+            NotificationResponse.from_orm(notification).dict(),
+        )
+        return notification
+
+    @staticmethod
+    async def notify_diagnosis(user_id: UUID, diagnosis_id: UUID, ai_result: Dict) -> None:
+        """DIAGNOSIS_COMPLETE (healthy) or DISEASE_ALERT for a finished diagnosis, in its own session"""
+        if ai_result['is_healthy']:
+            notification = NotificationCreate(
+                user_id=user_id,
+                diagnosis_id=diagnosis_id,
+                type=NotificationType.DIAGNOSIS_COMPLETE,
+                title="Diagnosis Complete — Healthy",
+                body="No disease detected.",
+            )
+        else:
+            notification = NotificationCreate(
+                user_id=user_id,
+                diagnosis_id=diagnosis_id,
+                type=NotificationType.DISEASE_ALERT,
+                title=f"Disease Detected: {ai_result['disease_name']}",
+                body=(
+                    f"{ai_result['disease_name']} detected with {ai_result['confidence_percent']}% confidence "
+                    f"(severity {ai_result['severity']}). Check treatment recommendations."
+                ),
+            )
+
+        async with AsyncSessionLocal() as session:
+            await NotificationService.create(session, notification)
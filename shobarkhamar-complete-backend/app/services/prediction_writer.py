@@ -0,0 +1,200 @@
+"""
+Buffered writer for per-image top-k Prediction rows.
+
+Requests hand their predictions to record(), which only appends to an
+in-memory buffer. A background task flushes the buffer as one multi-row
+INSERT whenever it holds `batch_size` rows or `flush_ms` has passed, so
+the history costs no database round trip on the request path.
+
+Prediction.predicted_disease_id must reference the disease catalogue, so
+each top-k entry is matched to a Disease by name (per species). Classes
+with no catalogue entry — healthy / not-fish results, or a catalogue that
+has not been seeded — are counted as `unmatched` and not written.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.ai_models import Prediction
+from app.models.disease import Disease, TargetSpecies
+
+# Poultry classes are short codes; the catalogue uses the full names
+POULTRY_CODE_NAMES = {
+    'cocci': 'Coccidiosis',
+    'ncd':   'Newcastle Disease',
+    'salmo': 'Salmonellosis',
+}
+
+MODEL_SPECIES = {'fish': TargetSpecies.FISH, 'poultry': TargetSpecies.POULTRY}
+
+# Re-read the disease catalogue at most this often
+CATALOGUE_TTL = 300
+
+
+class PredictionWriter:
+
+    def __init__(
+        self,
+        active_version: Callable[[str], Optional[str]],
+        batch_size: int = 200,
+        flush_ms: int = 1000,
+        max_buffer: int = 10000,
+        session_factory=AsyncSessionLocal,
+    ):
+        self._active_version = active_version
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_ms) / 1000
+        self._session_factory = session_factory
+
+        # Oldest rows go first if the database falls behind for long
+        self._buffer = deque(maxlen=max(self.batch_size, max_buffer))
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._diseases: Dict[tuple, UUID] = {}
+        self._diseases_loaded_at: Optional[float] = None  # monotonic() can be below the TTL at boot
+
+        self.recorded = 0
+        self.written = 0
+        self.unmatched = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="prediction-writer")
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    # ── public API ─────────────────────────────────────────────
+
+    def record(self, model_name: str, diagnosis_id: UUID, diagnosis_image_id: UUID, prediction: Dict):
+        """Queue one image's top-k predictions; never blocks or touches the database."""
+        model_version_id = self._active_version(model_name)
+        if model_version_id is None:
+            return  # model registry unavailable — nothing to link the rows to
+
+        created_at = datetime.utcnow()
+        for entry in prediction.get('all_predictions') or [prediction['primary_prediction']]:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append({
+                'model_name':         model_name,
+                'entry':              entry,
+                'diagnosis_id':       diagnosis_id,
+                'diagnosis_image_id': diagnosis_image_id,
+                'model_version_id':   model_version_id,
+                'created_at':         created_at,
+            })
+            self.recorded += 1
+
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    # ── worker ─────────────────────────────────────────────────
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._buffer:
+                if not await self.flush() or len(self._buffer) < self.batch_size:
+                    break
+
+    async def _load_diseases(self, session):
+        result = await session.execute(select(Disease.disease_id, Disease.disease_name, Disease.target_species))
+        self._diseases = {
+            (species, name.strip().lower()): disease_id
+            for disease_id, name, species in result.all()
+        }
+        self._diseases_loaded_at = time.monotonic()
+
+    def _disease_id(self, model_name: str, entry: Dict) -> Optional[UUID]:
+        species = MODEL_SPECIES.get(model_name)
+        code = entry.get('disease_code', '')
+        for name in (POULTRY_CODE_NAMES.get(code), entry.get('disease_name'), code):
+            if not name:
+                continue
+            key = name.strip().lower()
+            disease_id = self._diseases.get((species, key)) or self._diseases.get((TargetSpecies.MIXED, key))
+            if disease_id is not None:
+                return disease_id
+        return None
+
+    async def flush(self) -> bool:
+        """Write up to `batch_size` buffered rows in one INSERT; False if the write failed."""
+        if not self._buffer:
+            return True
+        pending = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+        try:
+            async with self._session_factory() as session:
+                if (self._diseases_loaded_at is None
+                        or time.monotonic() - self._diseases_loaded_at > CATALOGUE_TTL):
+                    await self._load_diseases(session)
+
+                rows: List[Dict] = []
+                for item in pending:
+                    disease_id = self._disease_id(item['model_name'], item['entry'])
+                    if disease_id is None:
+                        self.unmatched += 1
+                        continue
+                    rows.append({
+                        'diagnosis_id':         item['diagnosis_id'],
+                        'diagnosis_image_id':   item['diagnosis_image_id'],
+                        'predicted_disease_id': disease_id,
+                        'model_version_id':     item['model_version_id'],
+                        'confidence':           round(float(item['entry']['confidence']), 4),
+                        'created_at':           item['created_at'],
+                    })
+
+                if rows:
+                    # executemany → one multi-row INSERT ... VALUES per batch
+                    await session.execute(insert(Prediction), rows)
+                    await session.commit()
+        except Exception as e:
+            self.failed += len(pending)
+            print(f"⚠️  Prediction write failed ({len(pending)} rows dropped): {e}")
+            return False
+
+        self.written += len(rows)
+        self.flushes += 1
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            'batch_size':  self.batch_size,
+            'flush_ms':    int(self.flush_interval * 1000),
+            'buffered':    len(self._buffer),
+            'recorded':    self.recorded,
+            'written':     self.written,
+            'unmatched':   self.unmatched,
+            'dropped':     self.dropped,
+            'failed':      self.failed,
+            'flushes':     self.flushes,
+        }
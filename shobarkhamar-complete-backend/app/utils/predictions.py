@@ -0,0 +1,67 @@
+"""
+Softmax output → predict() result dicts, shared by the fish and poultry
+detectors. Severity and health are looked up per class in precomputed
+tensors, so a whole batch is post-processed with a few tensor ops.
+"""
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import torch
+
+SEVERITY_LEVELS = ['NONE', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+
+class Postprocessor:
+    """
+    `class_names` is in model output order; `label` turns one into its
+    (disease_code, disease_name). A confident (>= 0.8) hit on a disease
+    gets its `severity_map` level, HIGH if it has none; `healthy_classes`
+    are always NONE.
+    """
+
+    def __init__(
+        self,
+        class_names: Sequence[str],
+        healthy_classes: Iterable[str],
+        severity_map: Dict[str, str],
+        label: Callable[[str], Tuple[str, str]],
+    ):
+        self.labels = [label(name) for name in class_names]
+        healthy_classes = set(healthy_classes)
+        self._healthy_mask = torch.tensor([name in healthy_classes for name in class_names])
+        self._high_severity = torch.tensor([
+            SEVERITY_LEVELS.index(severity_map.get(name, 'HIGH')) for name in class_names
+        ])
+
+    def __call__(self, probs: torch.Tensor, top_k: int) -> List[Dict]:
+        top_probs, top_idxs = torch.topk(probs, k=min(top_k, len(self.labels)), dim=1)
+        conf, idx = top_probs[:, 0], top_idxs[:, 0]
+
+        healthy = self._healthy_mask[idx]
+        severity = 1 + (conf >= 0.6).long()                                   # LOW / MEDIUM
+        severity = torch.where(conf >= 0.8, self._high_severity[idx], severity)
+        severity = severity.masked_fill(healthy, 0)                           # NONE
+        needs_treatment = ~healthy & (conf > 0.5)
+
+        results = []
+        for probs_row, idx_row, sev, is_healthy, needs in zip(
+            top_probs.tolist(), top_idxs.tolist(),
+            severity.tolist(), healthy.tolist(), needs_treatment.tolist(),
+        ):
+            predictions = []
+            for i, c in zip(idx_row, probs_row):
+                code, name = self.labels[i]
+                predictions.append({
+                    'disease_code':       code,
+                    'disease_name':       name,
+                    'confidence':         c,
+                    'confidence_percent': round(c * 100, 2),
+                })
+
+            results.append({
+                'primary_prediction': {**predictions[0], 'severity': SEVERITY_LEVELS[sev]},
+                'all_predictions':    predictions,
+                'is_healthy':         is_healthy,
+                'needs_treatment':    needs,
+            })
+        return results
@@ -0,0 +1,225 @@
+"""
+Forward-pass runtimes shared by the fish and poultry detectors.
+
+  eager        the torchvision nn.Module as trained (default)
+  torchscript  traced + frozen graph, `<weights>.ts`
+  onnxruntime  ONNX graph run by ONNX Runtime's CPU provider, `<weights>.onnx`
+  int8         static post-training INT8 quantised graph (CPU), `<weights>.int8.ts`
+
+Artifacts are produced by `scripts/export_models.py`, which also measures
+output-probability parity against the eager model and records it in a
+`<artifact>.json` sidecar together with the SHA-256 of the source weights.
+At load time the sidecar is checked instead of re-running the comparison,
+so the API process never runs a forward pass before forking its workers.
+A missing, stale or out-of-tolerance artifact falls back to eager.
+
+TorchScript and ONNX must match eager probabilities to within PARITY_ATOL.
+INT8 is lossy by design, so it is judged instead on top-1 agreement over
+a real validation folder (`scripts/quantization_report.py`) and refused
+below the configured minimum.
+
+Every runtime maps a (N, 3, H, W) float batch to (N, num_classes) logits,
+so predict() returns exactly the same structure whichever one is used.
+"""
+
+import copy
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+RUNTIME_BACKENDS = ("eager", "torchscript", "onnxruntime", "int8")
+
+ARTIFACT_SUFFIX = {
+    "torchscript": ".ts",
+    "onnxruntime": ".onnx",
+    "int8": ".int8.ts",
+}
+
+# Max absolute difference in softmax probabilities tolerated vs eager
+PARITY_ATOL = 1e-4
+
+# Lossy backends: minimum top-1 agreement with eager on validation images
+LOSSY_BACKENDS = {"int8"}
+MIN_AGREEMENT = 0.98
+
+
+def artifact_path(model_path: str, backend: str) -> str:
+    return os.path.splitext(model_path)[0] + ARTIFACT_SUFFIX[backend]
+
+
+def sidecar_path(artifact: str) -> str:
+    return artifact + ".json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EagerRuntime:
+    name = "eager"
+
+    def __init__(self, model: torch.nn.Module):
+        self.model = model
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        return self.model(batch)
+
+
+class TorchScriptRuntime:
+    name = "torchscript"
+
+    def __init__(self, path: str, device: torch.device):
+        self.module = torch.jit.load(path, map_location=device)
+        self.module.eval()
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        return self.module(batch)
+
+
+class Int8Runtime(TorchScriptRuntime):
+    name = "int8"
+
+    def __init__(self, path: str):
+        # Quantised kernels are CPU-only (fbgemm / x86)
+        if "x86" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "x86"
+        super().__init__(path, torch.device("cpu"))
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        return self.module(batch.cpu())
+
+
+class OnnxRuntime:
+    name = "onnxruntime"
+
+    def __init__(self, path: str):
+        import onnxruntime  # optional dependency, only needed for this backend
+        self._ort = onnxruntime
+        self.path = path
+        self._session: Optional[Tuple[int, object]] = None
+        self._get_session()  # fail at load time, not on the first request
+
+    def _get_session(self):
+        # ORT thread pools don't survive fork: each worker opens its own session
+        if self._session is None or self._session[0] != os.getpid():
+            options = self._ort.SessionOptions()
+            options.intra_op_num_threads = torch.get_num_threads()
+            session = self._ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+            self._session = (os.getpid(), session)
+        return self._session[1]
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        session = self._get_session()
+        feed = {session.get_inputs()[0].name: batch.detach().cpu().numpy()}
+        return torch.from_numpy(session.run(None, feed)[0])
+
+
+def export_torchscript(model: torch.nn.Module, input_size: int, path: str):
+    example = torch.randn(1, 3, input_size, input_size, device=next(model.parameters()).device)
+    with torch.no_grad():
+        traced = torch.jit.freeze(torch.jit.trace(model.eval(), example))
+    traced.save(path)
+
+
+def export_onnx(model: torch.nn.Module, input_size: int, path: str, opset: int = 17):
+    example = torch.randn(1, 3, input_size, input_size, device=next(model.parameters()).device)
+    torch.onnx.export(
+        model.eval(), (example,), path,
+        input_names=["input"], output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+        dynamo=False,
+    )
+
+
+def quantize_int8(model: torch.nn.Module, calibration: List[torch.Tensor]) -> torch.nn.Module:
+    """
+    Static post-training quantisation (FX graph mode, x86 qconfig):
+    observers record activation ranges over the `calibration` batches,
+    then conv/linear layers are converted to INT8 kernels.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    model = copy.deepcopy(model).cpu().eval()
+    prepared = prepare_fx(model, get_default_qconfig_mapping("x86"), (calibration[0],))
+    with torch.inference_mode():
+        for batch in calibration:
+            prepared(batch)
+    return convert_fx(prepared)
+
+
+def export_int8(model: torch.nn.Module, calibration: List[torch.Tensor], path: str):
+    quantized = quantize_int8(model, calibration)
+    with torch.no_grad():
+        traced = torch.jit.freeze(torch.jit.trace(quantized, calibration[0][:1]))
+    traced.save(path)
+
+
+def open_runtime(backend: str, path: str, device: torch.device):
+    if backend == "torchscript":
+        return TorchScriptRuntime(path, device)
+    if backend == "onnxruntime":
+        return OnnxRuntime(path)
+    if backend == "int8":
+        if device.type != "cpu":
+            raise ValueError("INT8 kernels are CPU-only")
+        return Int8Runtime(path)
+    raise ValueError(f"Unknown runtime backend: {backend}")
+
+
+def write_sidecar(artifact: str, info: Dict):
+    with open(sidecar_path(artifact), "w") as f:
+        json.dump(info, f, indent=2)
+
+
+def _check_accuracy(backend: str, info: Dict, atol: float, min_agreement: float) -> str:
+    if backend in LOSSY_BACKENDS:
+        if not info.get("validation_images"):
+            raise ValueError("no validation-set agreement recorded — run scripts/quantization_report.py")
+        agreement = info.get("top1_agreement", 0.0)
+        if agreement < min_agreement:
+            raise ValueError(f"top-1 agreement {agreement:.1%} below required {min_agreement:.1%}")
+        return f"top-1 agreement {agreement:.1%} on {info['validation_images']} images"
+
+    max_diff = info.get("max_prob_diff", float("inf"))
+    if max_diff > atol:
+        raise ValueError(f"parity {max_diff} exceeds tolerance {atol}")
+    return f"max |Δp| {max_diff:.2e}"
+
+
+def load_runtime(backend: str, model: torch.nn.Module, model_path: str, device: torch.device,
+                 atol: float = PARITY_ATOL, min_agreement: float = MIN_AGREEMENT):
+    """
+    Return the runtime for `backend`, or the eager model when the exported
+    artifact is missing, was exported from different weights, or did not
+    pass its parity / agreement check.
+    """
+    if backend == "eager":
+        return EagerRuntime(model)
+    if backend not in RUNTIME_BACKENDS:
+        raise ValueError(f"Unknown runtime backend '{backend}', expected one of {RUNTIME_BACKENDS}")
+
+    artifact = artifact_path(model_path, backend)
+    try:
+        with open(sidecar_path(artifact)) as f:
+            info = json.load(f)
+        if not os.path.exists(artifact):
+            raise FileNotFoundError(artifact)
+        if info.get("source_sha256") != file_sha256(model_path):
+            raise ValueError("exported from different weights — re-run scripts/export_models.py")
+        accuracy = _check_accuracy(backend, info, atol, min_agreement)
+        runtime = open_runtime(backend, artifact, device)
+    except Exception as e:
+        print(f" {backend} runtime unavailable for {os.path.basename(model_path)} ({e}) — using eager")
+        return EagerRuntime(model)
+
+    print(f"✓ {backend} runtime: {artifact} ({accuracy})")
+    return runtime
@@ -0,0 +1,65 @@
+"""
+Weight loading shared by the fish and poultry detectors.
+
+A plain `torch.load` reads the whole checkpoint into anonymous memory, in
+every process that loads it, and `load_state_dict` then copies it again
+into the randomly initialised model. Instead:
+
+  *.safetensors   read with safetensors (no pickle), memory-mapped
+  *.pth / *.pt    torch.load(mmap=True) — zipfile checkpoints only; a
+                  legacy pickle logs a hint and is read normally
+
+and the model is built on the meta device, with the loaded tensors
+assigned as its parameters (`load_state_dict(assign=True)`). No random
+init is ever allocated, and on CPU the weights stay backed by the file's
+page cache: shared by every process that maps the same file, and by
+forked inference workers without a share_memory() copy.
+
+`scripts/convert_weights.py` converts the existing checkpoints and
+measures load time and RSS for each mode.
+"""
+
+import os
+from typing import Callable, Dict, Tuple
+
+import torch
+import torch.nn as nn
+
+SAFETENSORS_SUFFIX = ".safetensors"
+
+
+def is_safetensors(path: str) -> bool:
+    return path.endswith(SAFETENSORS_SUFFIX)
+
+
+def load_state_dict(path: str, device: torch.device, mmap: bool = True) -> Tuple[Dict[str, torch.Tensor], bool]:
+    """Returns (state_dict, mapped) — `mapped` is True when tensors are file-backed."""
+    if is_safetensors(path):
+        from safetensors.torch import load_file  # optional dependency, only needed for .safetensors
+        return load_file(path, device=str(device)), device.type == "cpu"
+
+    if mmap:
+        try:
+            return torch.load(path, map_location=device, weights_only=False, mmap=True), device.type == "cpu"
+        except RuntimeError as e:
+            # Legacy (non-zipfile) pickles cannot be mapped
+            print(f" {os.path.basename(path)} not mmap-able ({e}) — convert with scripts/convert_weights.py")
+    return torch.load(path, map_location=device, weights_only=False), False
+
+
+def load_model(build: Callable[[], nn.Module], path: str, device: torch.device,
+               mmap: bool = True) -> Tuple[nn.Module, bool]:
+    """
+    `build()` returns the untrained architecture; it runs on the meta device
+    so only the checkpoint's tensors are ever materialised. Returns
+    (model on `device`, mapped).
+    """
+    state_dict, mapped = load_state_dict(path, device, mmap=mmap)
+    with torch.device("meta"):
+        model = build()
+    model.load_state_dict(state_dict, assign=True)
+
+    leftover = [name for name, t in list(model.named_parameters()) + list(model.named_buffers()) if t.is_meta]
+    if leftover:
+        raise RuntimeError(f"{os.path.basename(path)} does not initialise {leftover[:5]}")
+    return model.to(device), mapped
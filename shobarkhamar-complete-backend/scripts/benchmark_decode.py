@@ -0,0 +1,117 @@
+"""
+Benchmark JPEG draft-mode decoding against the full-resolution decode path.
+
+For every image in a folder it preprocesses twice — full decode + Resize
+(the original transforms.Compose path) and DCT-scaled draft decode +
+Resize — and reports decode latency, decoded pixel buffer size and how
+far the resulting model inputs differ. With --weights it also runs both
+tensors through the model and reports top-1 agreement and the largest
+probability difference.
+
+Usage (from the backend root):
+    python scripts/benchmark_decode.py --model fish --images ./val_images
+    python scripts/benchmark_decode.py --model poultry --images ./val_images \
+        --weights ./models/best_model.pt
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from torchvision import transforms
+
+from app.utils.images import load_rgb
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+NORMALIZE = transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+
+
+def _build_detector(model: str, weights: str):
+    if model == "fish":
+        from app.ai_model import DiseaseDetector
+        return DiseaseDetector(weights, device="cpu")
+    from app.poultry_model import PoultryDiseaseDetector
+    return PoultryDiseaseDetector(weights, device="cpu")
+
+
+def _timed_preprocess(path: str, size: int, draft: bool):
+    transform = transforms.Compose([transforms.Resize((size, size)), transforms.ToTensor(), NORMALIZE])
+    start = time.perf_counter()
+    image = load_rgb(path, draft_size=size if draft else None)
+    decoded_pixels = image.width * image.height
+    tensor = transform(image)
+    return time.perf_counter() - start, decoded_pixels, tensor
+
+
+def _summary(values):
+    values = sorted(values)
+    return {
+        "mean": statistics.mean(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["fish", "poultry"], required=True)
+    parser.add_argument("--images", required=True, help="folder of validation images")
+    parser.add_argument("--weights", help="model weights; enables the accuracy comparison")
+    parser.add_argument("--limit", type=int, default=0, help="only use the first N images")
+    args = parser.parse_args()
+
+    size = 380 if args.model == "fish" else 224
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(args.images)
+        for name in names
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        sys.exit(f"No images found in {args.images}")
+
+    detector = _build_detector(args.model, args.weights) if args.weights else None
+    torch.set_grad_enabled(False)
+
+    full_t, draft_t, full_px, draft_px, input_diff = [], [], [], [], []
+    agree, max_prob_diff = 0, 0.0
+
+    for path in paths:
+        t_full, px_full, x_full = _timed_preprocess(path, size, draft=False)
+        t_draft, px_draft, x_draft = _timed_preprocess(path, size, draft=True)
+
+        full_t.append(t_full * 1000)
+        draft_t.append(t_draft * 1000)
+        full_px.append(px_full)
+        draft_px.append(px_draft)
+        input_diff.append((x_full - x_draft).abs().mean().item())
+
+        if detector is not None:
+            probs = torch.softmax(detector.model(torch.stack([x_full, x_draft])), dim=1)
+            agree += int(probs[0].argmax() == probs[1].argmax())
+            max_prob_diff = max(max_prob_diff, (probs[0] - probs[1]).abs().max().item())
+
+    full, draft = _summary(full_t), _summary(draft_t)
+    print(f"\n{len(paths)} images, {args.model} model input {size}x{size}\n")
+    print(f"{'':22}{'full decode':>14}{'draft decode':>14}")
+    for key in ("mean", "p50", "p95"):
+        print(f"{'preprocess ms ' + key:22}{full[key]:>14.2f}{draft[key]:>14.2f}")
+    print(f"{'decoded MB (RGB) mean':22}"
+          f"{statistics.mean(full_px) * 3 / 2**20:>14.2f}{statistics.mean(draft_px) * 3 / 2**20:>14.2f}")
+    print(f"\nspeed-up (mean): {full['mean'] / draft['mean']:.2f}x")
+    print(f"mean |input difference|: {statistics.mean(input_diff):.4f} (normalised units)")
+
+    if detector is not None:
+        print(f"top-1 agreement: {agree}/{len(paths)} ({agree / len(paths):.1%})")
+        print(f"max probability difference: {max_prob_diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
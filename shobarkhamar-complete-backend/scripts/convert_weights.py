@@ -0,0 +1,147 @@
+"""
+Convert the fish / poultry checkpoints for memory-mapped loading and
+measure the difference.
+
+For each checkpoint this writes, next to it:
+
+  <weights>.safetensors      safetensors copy (no pickle, mmap-able)
+  <weights>.zip.pt           only for legacy-pickle checkpoints: the same
+                             state dict re-saved in torch's zipfile format,
+                             which torch.load(mmap=True) requires
+
+and checks that every tensor round-trips bit-exactly. Point MODEL_PATH /
+POULTRY_MODEL_PATH at the file you want to serve; re-run
+scripts/export_models.py afterwards, since artifacts are tied to the
+exact weights file.
+
+With --measure, each loading mode is timed in a fresh process (so the
+page cache is the only thing shared between runs) and its memory
+reported once the detector is built and every weight has been read:
+
+  load s     wall time of the detector constructor
+  anon MB    private (RssAnon) memory — what every extra process pays again
+  file MB    file-backed (RssFile) memory — shared through the page cache
+
+Usage (from the backend root):
+    python scripts/convert_weights.py --model all --measure
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.utils.weights import SAFETENSORS_SUFFIX
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter per mode; prints one JSON line
+_MEASURE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import torch
+
+def rss():
+    fields = {{}}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) / 1024
+    return fields
+
+if {model!r} == "fish":
+    from app.ai_model import DiseaseDetector as cls
+else:
+    from app.poultry_model import PoultryDiseaseDetector as cls
+
+before = rss()
+start = time.perf_counter()
+detector = cls({path!r}, device="cpu", mmap_weights={mmap!r})
+elapsed = time.perf_counter() - start
+# Read every weight once, as the first forward pass would, so mapped pages show up
+with torch.no_grad():
+    sum(float(p.sum()) for p in detector.model.parameters())
+after = rss()
+print(json.dumps({{
+    "load_s": elapsed,
+    "anon_mb": after["RssAnon"] - before["RssAnon"],
+    "file_mb": after["RssFile"] - before["RssFile"],
+    "mapped": detector.weights_mapped,
+}}))
+"""
+
+
+def _is_legacy(path: str) -> bool:
+    return not zipfile.is_zipfile(path)
+
+
+def convert(weights: str) -> dict:
+    from safetensors.torch import load_file, save_file
+
+    state_dict = torch.load(weights, map_location="cpu", weights_only=False)
+    outputs = {}
+
+    safetensors_path = os.path.splitext(weights)[0] + SAFETENSORS_SUFFIX
+    save_file({k: v.contiguous() for k, v in state_dict.items()}, safetensors_path)
+    restored = load_file(safetensors_path)
+    assert restored.keys() == state_dict.keys() and all(torch.equal(restored[k], state_dict[k]) for k in state_dict)
+    outputs["safetensors"] = safetensors_path
+    print(f"✓ {safetensors_path}")
+
+    if _is_legacy(weights):
+        zip_path = os.path.splitext(weights)[0] + ".zip.pt"
+        torch.save(state_dict, zip_path)
+        outputs["zip"] = zip_path
+        print(f"✓ {zip_path} (legacy pickle re-saved in zipfile format)")
+    return outputs
+
+
+def measure(model: str, path: str, mmap: bool) -> dict:
+    code = _MEASURE.format(root=BACKEND_ROOT, model=model, path=path, mmap=mmap)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def report(model: str, weights: str, outputs: dict):
+    mmap_source = outputs.get("zip", weights)
+    rows = [
+        ("torch.load, no mmap",  weights,                False),
+        ("torch.load mmap=True", mmap_source,            True),
+        ("safetensors",          outputs["safetensors"], True),
+    ]
+    print(f"\n{model}")
+    print(f"  {'mode':<22}{'load s':>8}{'anon MB':>10}{'file MB':>10}{'mapped':>8}")
+    for label, path, mmap in rows:
+        r = measure(model, path, mmap)
+        print(f"  {label:<22}{r['load_s']:>8.2f}{r['anon_mb']:>10.1f}{r['file_mb']:>10.1f}{str(r['mapped']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["fish", "poultry", "all"], default="all")
+    parser.add_argument("--fish-weights", default=os.getenv("MODEL_PATH", "./models/best_B4_wiener_False.pth"))
+    parser.add_argument("--poultry-weights", default=os.getenv("POULTRY_MODEL_PATH", "./models/best_model.pt"))
+    parser.add_argument("--measure", action="store_true", help="time and measure RSS of each loading mode")
+    args = parser.parse_args()
+
+    models = ["fish", "poultry"] if args.model == "all" else [args.model]
+    weights = {"fish": args.fish_weights, "poultry": args.poultry_weights}
+
+    for model in models:
+        if not os.path.exists(weights[model]):
+            print(f" {model} weights not found at {weights[model]} — skipping")
+            continue
+        outputs = convert(weights[model])
+        if args.measure:
+            report(model, weights[model], outputs)
+
+
+if __name__ == "__main__":
+    main()
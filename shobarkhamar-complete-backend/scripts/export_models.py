@@ -0,0 +1,142 @@
+"""
+Export the fish / poultry weights to TorchScript and/or ONNX and check
+output parity against the eager model.
+
+Artifacts are written next to the weights (`<weights>.ts`, `<weights>.onnx`)
+with a `.json` sidecar recording the parity result and the SHA-256 of the
+source weights. The API only switches to an artifact (MODEL_BACKEND=...)
+when its sidecar matches the current weights and the parity is within
+tolerance. The command exits non-zero if any export fails the check.
+
+Usage (from the backend root):
+    python scripts/export_models.py --model all --format all
+    python scripts/export_models.py --model fish --format onnx --images ./val_images
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.utils.runtimes import (
+    PARITY_ATOL, artifact_path, export_onnx, export_torchscript, file_sha256, open_runtime, write_sidecar,
+)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+FORMATS = {"torchscript": "torchscript", "onnx": "onnxruntime"}
+
+
+def _build_detector(model: str, weights: str):
+    if model == "fish":
+        from app.ai_model import DiseaseDetector
+        return DiseaseDetector(weights, device="cpu")
+    from app.poultry_model import PoultryDiseaseDetector
+    return PoultryDiseaseDetector(weights, device="cpu")
+
+
+def _parity_batches(detector, images: str, samples: int, batch_size: int):
+    """Seeded random inputs, plus real images when a folder is given."""
+    generator = torch.Generator().manual_seed(0)
+    size = detector.input_size
+    tensors = [torch.randn(3, size, size, generator=generator) for _ in range(samples)]
+
+    if images:
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(images)
+            for name in names
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+        )
+        tensors += [detector.preprocess(p) for p in paths]
+
+    return [torch.stack(tensors[i:i + batch_size]) for i in range(0, len(tensors), batch_size)]
+
+
+def _compare(detector, runtime, batches):
+    max_diff, agree, total = 0.0, 0, 0
+    eager_ms, runtime_ms = [], []
+    with torch.inference_mode():
+        for batch in batches:
+            start = time.perf_counter()
+            expected = torch.softmax(detector.model(batch), dim=1)
+            eager_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            actual = torch.softmax(runtime(batch), dim=1)
+            runtime_ms.append((time.perf_counter() - start) * 1000)
+
+            max_diff = max(max_diff, (expected - actual).abs().max().item())
+            agree += int((expected.argmax(1) == actual.argmax(1)).sum())
+            total += len(batch)
+    return max_diff, agree / total, statistics.mean(eager_ms), statistics.mean(runtime_ms)
+
+
+def export(model: str, weights: str, fmt: str, args) -> bool:
+    backend = FORMATS[fmt]
+    detector = _build_detector(model, weights)
+    artifact = artifact_path(weights, backend)
+
+    if backend == "torchscript":
+        export_torchscript(detector.model, detector.input_size, artifact)
+    else:
+        export_onnx(detector.model, detector.input_size, artifact)
+
+    runtime = open_runtime(backend, artifact, detector.device)
+    batches = _parity_batches(detector, args.images, args.samples, args.batch_size)
+    max_diff, agreement, eager_ms, runtime_ms = _compare(detector, runtime, batches)
+    passed = max_diff <= args.atol
+
+    write_sidecar(artifact, {
+        "backend": backend,
+        "source": os.path.basename(weights),
+        "source_sha256": file_sha256(weights),
+        "input_size": detector.input_size,
+        "max_prob_diff": max_diff,
+        "top1_agreement": agreement,
+        "atol": args.atol,
+        "torch": torch.__version__,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    print(f"\n{model} → {backend}: {artifact}")
+    print(f"  max |Δp|        {max_diff:.2e} (tolerance {args.atol:.0e}) {'OK' if passed else 'FAILED'}")
+    print(f"  top-1 agreement {agreement:.1%}")
+    print(f"  ms / batch      eager {eager_ms:.1f}   {backend} {runtime_ms:.1f}   ({eager_ms / runtime_ms:.2f}x)")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["fish", "poultry", "all"], default="all")
+    parser.add_argument("--format", choices=["torchscript", "onnx", "all"], default="all")
+    parser.add_argument("--fish-weights", default=os.getenv("MODEL_PATH", "./models/best_B4_wiener_False.pth"))
+    parser.add_argument("--poultry-weights", default=os.getenv("POULTRY_MODEL_PATH", "./models/best_model.pt"))
+    parser.add_argument("--images", help="folder of real images to include in the parity check")
+    parser.add_argument("--samples", type=int, default=8, help="random inputs in the parity check")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--atol", type=float, default=PARITY_ATOL, help="max probability difference")
+    args = parser.parse_args()
+
+    models = ["fish", "poultry"] if args.model == "all" else [args.model]
+    formats = list(FORMATS) if args.format == "all" else [args.format]
+    weights = {"fish": args.fish_weights, "poultry": args.poultry_weights}
+
+    ok = True
+    for model in models:
+        if not os.path.exists(weights[model]):
+            print(f" {model} weights not found at {weights[model]} — skipping")
+            continue
+        for fmt in formats:
+            ok &= export(model, weights[model], fmt, args)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Accuracy-vs-latency report for the CPU inference modes, and INT8 export.
+
+Builds a static INT8 model (FX post-training quantisation) calibrated on
+real images, then runs a validation folder through:
+
+  eager            the fp32 model as served today
+  channels_last    fp32, NHWC memory format   (MODEL_CHANNELS_LAST=True)
+  int8             the quantised graph        (MODEL_BACKEND=int8)
+
+and prints per-image latency, top-1 agreement with eager and the largest
+probability difference. The INT8 artifact is written next to the weights
+with a sidecar recording the agreement; the API refuses MODEL_BACKEND=int8
+when that agreement is below MODEL_MIN_AGREEMENT, and this command exits
+non-zero in the same case.
+
+Calibration images must not overlap the validation set. Without
+--calibration the first --calibration-count validation images are used
+for calibration and excluded from the comparison.
+
+Usage (from the backend root):
+    python scripts/quantization_report.py --model fish --images ./val_images
+    python scripts/quantization_report.py --model poultry --images ./val --calibration ./calib
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.utils.runtimes import (
+    MIN_AGREEMENT, Int8Runtime, artifact_path, export_int8, file_sha256, write_sidecar,
+)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def _build_detector(model: str, weights: str):
+    if model == "fish":
+        from app.ai_model import DiseaseDetector
+        return DiseaseDetector(weights, device="cpu")
+    from app.poultry_model import PoultryDiseaseDetector
+    return PoultryDiseaseDetector(weights, device="cpu")
+
+
+def _list_images(folder: str):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def _batches(detector, paths, batch_size):
+    tensors = [detector.preprocess(p) for p in paths]
+    return [torch.stack(tensors[i:i + batch_size]) for i in range(0, len(tensors), batch_size)]
+
+
+def _run(forward, batches, memory_format=torch.contiguous_format):
+    probs, elapsed = [], 0.0
+    with torch.inference_mode():
+        forward(batches[0].contiguous(memory_format=memory_format))  # warm-up
+        for batch in batches:
+            batch = batch.contiguous(memory_format=memory_format)
+            start = time.perf_counter()
+            logits = forward(batch)
+            elapsed += time.perf_counter() - start
+            probs.append(torch.softmax(logits, dim=1))
+    return torch.cat(probs), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["fish", "poultry"], required=True)
+    parser.add_argument("--weights", help="defaults to MODEL_PATH / POULTRY_MODEL_PATH")
+    parser.add_argument("--images", required=True, help="validation folder")
+    parser.add_argument("--calibration", help="separate calibration folder")
+    parser.add_argument("--calibration-count", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT)
+    args = parser.parse_args()
+
+    weights = args.weights or (
+        os.getenv("MODEL_PATH", "./models/best_B4_wiener_False.pth") if args.model == "fish"
+        else os.getenv("POULTRY_MODEL_PATH", "./models/best_model.pt")
+    )
+
+    validation = _list_images(args.images)
+    if args.calibration:
+        calibration = _list_images(args.calibration)
+    else:
+        calibration, validation = validation[:args.calibration_count], validation[args.calibration_count:]
+    if not calibration or not validation:
+        sys.exit("Need both calibration and validation images")
+
+    detector = _build_detector(args.model, weights)
+    artifact = artifact_path(weights, "int8")
+
+    print(f"Calibrating INT8 on {len(calibration)} images ...")
+    export_int8(detector.model, _batches(detector, calibration, args.batch_size), artifact)
+    int8 = Int8Runtime(artifact)
+
+    batches = _batches(detector, validation, args.batch_size)
+    reference, eager_s = _run(detector.model, batches)
+
+    nhwc_model = detector.model.to(memory_format=torch.channels_last)
+    nhwc, nhwc_s = _run(nhwc_model, batches, torch.channels_last)
+    detector.model.to(memory_format=torch.contiguous_format)
+
+    quantised, int8_s = _run(int8, batches)
+
+    n = len(validation)
+    top1 = reference.argmax(1)
+    rows = [
+        ("eager", reference, eager_s),
+        ("channels_last", nhwc, nhwc_s),
+        ("int8", quantised, int8_s),
+    ]
+
+    print(f"\n{args.model}: {n} validation images, batch {args.batch_size}, {torch.get_num_threads()} threads\n")
+    print(f"{'mode':16}{'ms/image':>10}{'speed-up':>10}{'top-1 agree':>13}{'max |Δp|':>11}")
+    results = {}
+    for name, probs, seconds in rows:
+        agreement = (probs.argmax(1) == top1).float().mean().item()
+        max_diff = (probs - reference).abs().max().item()
+        results[name] = (agreement, max_diff)
+        print(f"{name:16}{seconds / n * 1000:>10.2f}{eager_s / seconds:>9.2f}x{agreement:>12.1%}{max_diff:>11.4f}")
+
+    agreement, max_diff = results["int8"]
+    write_sidecar(artifact, {
+        "backend": "int8",
+        "source": os.path.basename(weights),
+        "source_sha256": file_sha256(weights),
+        "input_size": detector.input_size,
+        "calibration_images": len(calibration),
+        "validation_images": n,
+        "top1_agreement": agreement,
+        "max_prob_diff": max_diff,
+        "min_agreement": args.min_agreement,
+        "speedup": eager_s / int8_s,
+        "torch": torch.__version__,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    if agreement < args.min_agreement:
+        print(f"\nINT8 REFUSED: top-1 agreement {agreement:.1%} < {args.min_agreement:.1%}. "
+              f"MODEL_BACKEND=int8 will fall back to eager.")
+        sys.exit(1)
+    print(f"\nINT8 accepted → {artifact} (set MODEL_BACKEND=int8)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Train the fish cascade gate and pick its thresholds.
+
+Fine-tunes an ImageNet MobileNetV3-Large on the same class folders the B4
+model was trained on (ImageFolder layout, one folder per class, names as in
+app/ai_model.IDX_TO_CLASS), saves its state dict, then sweeps the gate
+acceptance threshold on a validation folder and prints, per threshold:
+
+  escalation rate        share of images that still need B4
+  cascade accuracy       top-1 accuracy of the cascade vs the folder labels
+  B4 agreement           top-1 agreement of the cascade with B4 alone
+  est. ms / image        gate cost + escalated share of B4 cost
+
+Set FISH_GATE_MODEL_PATH to the output and FISH_GATE_*_THRESHOLD to the
+threshold you choose.
+
+Usage (from the backend root):
+    python scripts/train_gate.py --train ./fish/train --val ./fish/val \\
+        --b4 ./models/best_B4_wiener_False.pth --out ./models/fish_gate.pt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader
+from torchvision import datasets, transforms
+from torchvision.models import MobileNet_V3_Large_Weights
+
+from app.ai_model import GATE_INPUT_SIZE, IDX_TO_CLASS, DiseaseDetector, build_gate_model
+
+NORMALIZE = transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+THRESHOLDS = [0.7, 0.8, 0.85, 0.9, 0.95, 0.98]
+
+
+def _check_classes(dataset):
+    expected = [IDX_TO_CLASS[i] for i in range(len(IDX_TO_CLASS))]
+    if dataset.classes != expected:
+        sys.exit(f"Class folders {dataset.classes} do not match {expected}")
+
+
+def train(args, device):
+    dataset = datasets.ImageFolder(args.train, transforms.Compose([
+        transforms.RandomResizedCrop(GATE_INPUT_SIZE, scale=(0.7, 1.0)),
+        transforms.RandomHorizontalFlip(),
+        transforms.ColorJitter(0.2, 0.2, 0.2),
+        transforms.ToTensor(),
+        NORMALIZE,
+    ]))
+    _check_classes(dataset)
+    loader = DataLoader(dataset, batch_size=args.batch_size, shuffle=True, num_workers=args.workers)
+
+    gate = build_gate_model(len(IDX_TO_CLASS))
+    pretrained = MobileNet_V3_Large_Weights.DEFAULT.get_state_dict(progress=True)
+    gate.load_state_dict({k: v for k, v in pretrained.items() if not k.startswith("classifier.3")}, strict=False)
+    gate.to(device)
+
+    optimizer = torch.optim.AdamW(gate.parameters(), lr=args.lr, weight_decay=1e-4)
+    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=args.epochs * len(loader))
+
+    for epoch in range(args.epochs):
+        gate.train()
+        total, correct, loss_sum = 0, 0, 0.0
+        for images, labels in loader:
+            images, labels = images.to(device), labels.to(device)
+            logits = gate(images)
+            loss = F.cross_entropy(logits, labels, label_smoothing=0.1)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            loss_sum += loss.item() * len(labels)
+            correct += int((logits.argmax(1) == labels).sum())
+            total += len(labels)
+        print(f"epoch {epoch + 1}/{args.epochs}  loss {loss_sum / total:.4f}  train acc {correct / total:.1%}")
+
+    torch.save(gate.state_dict(), args.out)
+    print(f"✓ gate saved to {args.out}")
+
+
+def evaluate(args, device):
+    detector = DiseaseDetector(args.b4, device=str(device), gate_path=args.out)
+    dataset = datasets.ImageFolder(args.val)
+    _check_classes(dataset)
+
+    gate_probs, full_probs, labels = [], [], []
+    gate_s = full_s = 0.0
+    with torch.inference_mode():
+        for start in range(0, len(dataset.samples), args.batch_size):
+            chunk = dataset.samples[start:start + args.batch_size]
+            batch = torch.stack([detector.preprocess(path) for path, _ in chunk]).to(device)
+            labels += [label for _, label in chunk]
+
+            t = time.perf_counter()
+            small = F.interpolate(batch, size=(GATE_INPUT_SIZE, GATE_INPUT_SIZE),
+                                  mode="bilinear", antialias=True, align_corners=False)
+            gate_probs.append(torch.softmax(detector.gate(small), 1).cpu())
+            gate_s += time.perf_counter() - t
+
+            t = time.perf_counter()
+            full_probs.append(torch.softmax(detector.model(batch), 1).cpu())
+            full_s += time.perf_counter() - t
+
+    gate_probs, full_probs, labels = torch.cat(gate_probs), torch.cat(full_probs), torch.tensor(labels)
+    n = len(labels)
+    gate_ms, full_ms = gate_s * 1000 / n, full_s * 1000 / n
+    b4_top1 = full_probs.argmax(1)
+    conf, gate_top1 = gate_probs.max(1)
+    gateable = torch.tensor([IDX_TO_CLASS[int(i)] in ("Not_fish", "Healthy Fish") for i in gate_top1])
+
+    print(f"\n{n} validation images — B4 alone: accuracy {(b4_top1 == labels).float().mean():.1%}, "
+          f"{full_ms:.1f} ms/image; gate {gate_ms:.1f} ms/image\n")
+    print(f"{'threshold':>10}{'escalation':>12}{'accuracy':>10}{'B4 agree':>10}{'ms/image':>10}")
+    for threshold in THRESHOLDS:
+        settled = gateable & (conf >= threshold)
+        cascade_top1 = torch.where(settled, gate_top1, b4_top1)
+        escalation = 1 - settled.float().mean().item()
+        print(f"{threshold:>10.2f}{escalation:>12.1%}"
+              f"{(cascade_top1 == labels).float().mean():>10.1%}"
+              f"{(cascade_top1 == b4_top1).float().mean():>10.1%}"
+              f"{gate_ms + escalation * full_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", help="training folder; omit to only evaluate an existing gate")
+    parser.add_argument("--val", required=True)
+    parser.add_argument("--b4", default=os.getenv("MODEL_PATH", "./models/best_B4_wiener_False.pth"))
+    parser.add_argument("--out", default="./models/fish_gate.pt")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    if args.train:
+        train(args, device)
+    evaluate(args, device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+MicroBatcher tests — a fake detector stands in for the CNN so these run
+without model weights.
+"""
+import asyncio
+import pytest
+
+from app.inference.batching import MicroBatcher
+
+
+class FakeDetector:
+    def __init__(self):
+        self.forward_sizes = []
+
+    def preprocess(self, src):
+        if src == "corrupt.jpg":
+            raise ValueError("cannot identify image file")
+        return src
+
+    def predict_tensors(self, tensors, top_k=3):
+        self.forward_sizes.append(len(tensors))
+        return [{"primary_prediction": {"disease_code": t}} for t in tensors]
+
+    def predict_many(self, sources, top_k=3):
+        decoded = []
+        for src in sources:
+            try:
+                decoded.append(self.preprocess(src))
+            except Exception as e:
+                decoded.append(e)
+        results = iter(self.predict_tensors([d for d in decoded if not isinstance(d, Exception)]))
+        return [d if isinstance(d, Exception) else next(results) for d in decoded]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    detector = FakeDetector()
+    batcher = MicroBatcher(detector, max_batch_size=8, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.predict(f"img{i}.jpg") for i in range(5)))
+    await batcher.stop()
+
+    assert [r["primary_prediction"]["disease_code"] for r in results] == [f"img{i}.jpg" for i in range(5)]
+    assert detector.forward_sizes == [5]
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_capped():
+    detector = FakeDetector()
+    batcher = MicroBatcher(detector, max_batch_size=2, max_wait_ms=50)
+
+    await asyncio.gather(*(batcher.predict(f"img{i}.jpg") for i in range(5)))
+    await batcher.stop()
+
+    assert detector.forward_sizes == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_bad_image_does_not_fail_neighbours():
+    detector = FakeDetector()
+    batcher = MicroBatcher(detector, max_batch_size=8, max_wait_ms=50)
+
+    results = await asyncio.gather(
+        batcher.predict("a.jpg"), batcher.predict("corrupt.jpg"), batcher.predict("b.jpg"),
+        return_exceptions=True,
+    )
+    await batcher.stop()
+
+    assert isinstance(results[1], ValueError)
+    assert results[0]["primary_prediction"]["disease_code"] == "a.jpg"
+    assert results[2]["primary_prediction"]["disease_code"] == "b.jpg"
+    assert detector.forward_sizes == [2]
+
+
+@pytest.mark.asyncio
+async def test_forward_pass_runs_off_the_event_loop():
+    import threading
+    from app.inference.executor import InferenceExecutor
+
+    class ThreadRecordingDetector(FakeDetector):
+        def predict_tensors(self, tensors, top_k=3):
+            self.thread = threading.current_thread().name
+            return super().predict_tensors(tensors, top_k)
+
+    detector = ThreadRecordingDetector()
+    executor = InferenceExecutor(max_workers=1)
+    batcher = MicroBatcher(detector, max_wait_ms=5, executor=executor)
+
+    await batcher.predict("img.jpg")
+    await batcher.stop()
+    executor.shutdown()
+
+    assert detector.thread.startswith("inference")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_503():
+    import threading
+    from app.inference.executor import InferenceExecutor, InferenceQueueFull
+
+    release = threading.Event()
+
+    class BlockingDetector(FakeDetector):
+        def predict_tensors(self, tensors, top_k=3):
+            release.wait(5)
+            return super().predict_tensors(tensors, top_k)
+
+    executor = InferenceExecutor(max_workers=1)
+    batcher = MicroBatcher(BlockingDetector(), max_batch_size=1, max_wait_ms=0, executor=executor, max_queue=1)
+
+    running = asyncio.create_task(batcher.predict("a.jpg"))   # occupies the worker
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(batcher.predict("b.jpg"))    # fills the queue
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceQueueFull) as exc:
+        await batcher.predict("c.jpg")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+    release.set()
+    await asyncio.gather(running, queued)
+    await batcher.stop()
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_swap_drains_old_model_and_routes_new_batches():
+    import threading
+    from app.inference.executor import InferenceExecutor
+
+    release = threading.Event()
+
+    class BlockingDetector(FakeDetector):
+        def predict_tensors(self, tensors, top_k=3):
+            release.wait(5)
+            return super().predict_tensors(tensors, top_k)
+
+    old, new = BlockingDetector(), FakeDetector()
+    executor = InferenceExecutor(max_workers=2)
+    batcher = MicroBatcher(old, max_batch_size=1, max_wait_ms=0, executor=executor, model_version="v1")
+
+    running = asyncio.create_task(batcher.predict("a.jpg"))
+    await asyncio.sleep(0.05)
+    draining = batcher.swap(new, "v2")
+    assert len(draining) == 1
+
+    await batcher.predict("b.jpg")
+    assert new.forward_sizes == [1] and old.forward_sizes == []
+
+    release.set()
+    await asyncio.gather(*draining)
+    assert (await running)["primary_prediction"]["disease_code"] == "a.jpg"
+    assert old.forward_sizes == [1]
+    assert batcher.model_version == "v2"
+
+    await batcher.stop()
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_batches_that_are_still_running():
+    import threading
+    from app.inference.executor import InferenceExecutor
+
+    release = threading.Event()
+
+    class BlockingDetector(FakeDetector):
+        def predict_tensors(self, tensors, top_k=3):
+            release.wait(5)
+            return super().predict_tensors(tensors, top_k)
+
+    executor = InferenceExecutor(max_workers=1)
+    batcher = MicroBatcher(BlockingDetector(), max_batch_size=2, max_wait_ms=0, executor=executor)
+
+    running = asyncio.create_task(batcher.predict("a.jpg"))
+    await asyncio.sleep(0.05)
+    await batcher.stop()
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        await asyncio.wait_for(running, 1)
+
+    release.set()
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_counts_images_and_failed_batches():
+    import threading
+    from app.inference.executor import InferenceExecutor, InferenceQueueFull
+
+    release = threading.Event()
+    executor = InferenceExecutor(max_workers=1, max_queue=5)
+
+    def block(n):
+        release.wait(5)
+        return n
+
+    running = asyncio.create_task(executor.submit(block, 3, images=3))
+    await asyncio.sleep(0.05)
+    assert executor.stats()["pending_images"] == 3
+    with pytest.raises(InferenceQueueFull):
+        await executor.submit(block, 3, images=3)    # 3 + 3 images > 5
+
+    def boom():
+        raise RuntimeError("pool broken")
+
+    failing = asyncio.create_task(executor.submit(boom))
+    cancelled = asyncio.create_task(executor.submit(block, 0))
+    await asyncio.sleep(0.05)
+    cancelled.cancel()
+    release.set()
+    assert await running == 3
+    with pytest.raises(RuntimeError):
+        await failing
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["cancelled"], stats["rejected"]) == (1, 1, 1, 1)
+    assert stats["pending"] == stats["pending_images"] == 0
+    executor.shutdown()
@@ -0,0 +1,98 @@
+"""
+Catalogue cache tests — read-through, invalidation racing a load, and
+ETag / 304 handling on GET /symptoms (service and DB faked).
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.core.database import get_db
+from app.models.disease import TargetSpecies
+from app.services.catalogue_cache import CatalogueCache, catalogue_cache, etag_matches
+from app.services.disease_service import SymptomService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once_then_hit():
+    cache = CatalogueCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return b'[{"symptom_name": "White spots"}]'
+
+    first, second = await asyncio.gather(cache.get("symptoms", load), cache.get("symptoms", load))
+    third = await cache.get("symptoms", load)
+
+    assert len(loads) == 1
+    assert first is second is third
+    assert first.etag.startswith('"') and not first.etag.startswith('W/')
+    assert cache.stats()["coalesced"] == 1 and cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_load_overtaken_by_invalidation_is_not_kept():
+    cache = CatalogueCache()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load():
+        started.set()
+        await release.wait()
+        return b"old"
+
+    pending = asyncio.create_task(cache.get("diseases", slow_load))
+    await started.wait()
+    await cache.invalidate()  # an admin edit commits while the old rows are being read
+    release.set()
+    assert (await pending).body == b"old"
+
+    async def fresh_load():
+        return b"new"
+
+    assert (await cache.get("diseases", fresh_load)).body == b"new"
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+@pytest.mark.asyncio
+async def test_symptoms_are_served_with_etag_and_304(monkeypatch):
+    from app.main import app
+
+    calls = []
+    symptom = SimpleNamespace(
+        symptom_id=uuid.uuid4(), symptom_name="White spots",
+        symptom_description=None, target_species=TargetSpecies.FISH,
+    )
+
+    async def get_all(db, skip=0, limit=100):
+        calls.append((skip, limit))
+        return [symptom]
+
+    monkeypatch.setattr(SymptomService, "get_all", get_all)
+    app.dependency_overrides[get_db] = lambda: None
+    await catalogue_cache.invalidate()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/api/v1/symptoms")
+            etag = first.headers["etag"]
+            revalidated = await client.get("/api/v1/symptoms", headers={"If-None-Match": etag})
+            changed = await client.get("/api/v1/symptoms", headers={"If-None-Match": '"stale"'})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert first.status_code == 200
+    assert first.json()[0]["symptom_name"] == "White spots"
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert changed.status_code == 200 and changed.headers["etag"] == etag
+    assert calls == [(0, 100)]
@@ -0,0 +1,87 @@
+"""
+Catalogue import parsing — CSV rows folded into the JSON structure and
+rejected before anything reaches the database.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.models.disease import SeverityLevel, TargetSpecies
+from app.models.treatment import ApplicationMethod
+from app.schemas.disease import CatalogueImport
+from app.services.disease_service import CatalogueService
+
+CSV = """\ufeffdisease_name,target_species,severity_level,contagious,symptom_name,symptom_description,treatment_name,application_method,is_primary_treatment
+White Spot,FISH,HIGH,yes,White spots,Small white cysts,Salt bath,WATER,true
+White Spot,,,,Flashing,,,,
+Fin Rot,FISH,,no,White spots,,Salt bath,,
+""".encode()  # with the BOM Excel writes
+
+
+def test_csv_rows_fold_into_diseases():
+    catalogue = CatalogueService.parse_csv(CSV)
+
+    white_spot, fin_rot = catalogue.diseases
+    assert white_spot.disease_name == "White Spot"
+    assert white_spot.severity_level == SeverityLevel.HIGH and white_spot.contagious is True
+    assert white_spot.symptoms == ["White spots", "Flashing"]
+    assert white_spot.treatments[0].is_primary_treatment is True
+    assert fin_rot.severity_level == SeverityLevel.MEDIUM and fin_rot.contagious is False
+    assert fin_rot.symptoms == ["White spots"]
+
+    # Symptoms are defined once, from their first row; a treatment row without
+    # application_method only links the treatment
+    assert [(s.symptom_name, s.symptom_description, s.target_species) for s in catalogue.symptoms] == [
+        ("White spots", "Small white cysts", TargetSpecies.FISH),
+        ("Flashing", None, TargetSpecies.FISH),
+    ]
+    assert [(t.treatment_name, t.application_method) for t in catalogue.treatments] == [
+        ("Salt bath", ApplicationMethod.WATER),
+    ]
+
+
+def test_csv_rejects_unknown_columns_and_bad_values():
+    with pytest.raises(HTTPException) as e:
+        CatalogueService.parse_csv(b"disease_name,colour\nWhite Spot,red\n")
+    assert e.value.status_code == 400 and e.value.detail["unknown"] == ["colour"]
+
+    with pytest.raises(HTTPException) as e:
+        CatalogueService.parse_csv(b"disease_name,target_species\nWhite Spot,REPTILE\n")
+    assert e.value.status_code == 422
+    assert e.value.detail[0]["loc"][:2] == ["diseases", 0]
+
+
+def test_json_import_is_validated():
+    catalogue = CatalogueService.parse_json(
+        b'{"diseases": [{"disease_name": "Coccidiosis", "target_species": "POULTRY", "symptoms": ["Lethargy"]}]}'
+    )
+    assert catalogue.diseases[0].symptoms == ["Lethargy"]
+
+    with pytest.raises(HTTPException) as e:
+        CatalogueService.parse_json(b'{"treatments": [{"treatment_name": "Salt bath"}]}')
+    assert e.value.status_code == 422
+
+
+def test_csv_symptoms_are_defined_per_species():
+    catalogue = CatalogueService.parse_csv(
+        b"disease_name,target_species,symptom_name,symptom_description\n"
+        b"Columnaris,FISH,Lethargy,Rests on the bottom\n"
+        b"Coccidiosis,POULTRY,Lethargy,Huddles with ruffled feathers\n"
+        b"Coccidiosis,,Bloody droppings,\n"
+    )
+    assert [(s.symptom_name, s.target_species, s.symptom_description) for s in catalogue.symptoms] == [
+        ("Lethargy", TargetSpecies.FISH, "Rests on the bottom"),
+        ("Lethargy", TargetSpecies.POULTRY, "Huddles with ruffled feathers"),
+        ("Bloody droppings", TargetSpecies.POULTRY, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_names_are_rejected_before_any_query():
+    catalogue = CatalogueImport(symptoms=[
+        {"symptom_name": "Lethargy", "target_species": "FISH"},
+        {"symptom_name": "Lethargy", "target_species": "POULTRY"},
+        {"symptom_name": "Lethargy", "target_species": "POULTRY"},
+    ])
+    with pytest.raises(HTTPException) as e:
+        await CatalogueService.import_catalogue(None, catalogue)
+    assert e.value.detail["duplicates"] == ["Lethargy (POULTRY)"]
@@ -0,0 +1,270 @@
+"""
+Detector tests against a randomly initialised MobileNetV3 — no trained
+weights needed, we only check the batch path agrees with predict().
+"""
+import pytest
+
+torch = pytest.importorskip("torch")
+from PIL import Image
+
+
+@pytest.fixture(scope="module")
+def poultry_weights(tmp_path_factory):
+    import torch.nn as nn
+    from torchvision.models import mobilenet_v3_large
+    from app.poultry_model import POULTRY_CLASS_NAMES
+
+    torch.manual_seed(0)
+    model = mobilenet_v3_large(weights=None)
+    model.classifier[3] = nn.Sequential(
+        nn.Dropout(p=0.4, inplace=True),
+        nn.Linear(model.classifier[3].in_features, len(POULTRY_CLASS_NAMES)),
+    )
+    path = tmp_path_factory.mktemp("models") / "poultry.pt"
+    torch.save(model.state_dict(), path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def poultry_detector(poultry_weights):
+    from app.poultry_model import PoultryDiseaseDetector
+    return PoultryDiseaseDetector(poultry_weights, device="cpu")
+
+
+@pytest.fixture(scope="module")
+def images(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("images")
+    paths = []
+    for i, colour in enumerate([(200, 30, 30), (30, 200, 30), (30, 30, 200)]):
+        path = folder / f"img{i}.jpg"
+        Image.new("RGB", (640, 480), colour).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_predict_matches_single_predict(poultry_detector, images):
+    batch = poultry_detector.batch_predict(images)
+
+    assert [r["status"] for r in batch] == ["success"] * len(images)
+    for path, result in zip(images, batch):
+        single = poultry_detector.predict(path)
+        assert result["primary_prediction"]["disease_code"] == single["primary_prediction"]["disease_code"]
+        assert result["primary_prediction"]["severity"] == single["primary_prediction"]["severity"]
+        assert result["primary_prediction"]["confidence"] == pytest.approx(
+            single["primary_prediction"]["confidence"], abs=1e-4
+        )
+
+
+def test_batch_predict_isolates_bad_images(poultry_detector, images, tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+
+    results = poultry_detector.batch_predict([images[0], str(broken), images[1]])
+
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[1]["image_path"] == str(broken)
+
+
+def test_draft_decode_shrinks_large_jpegs_but_not_below_input_size(tmp_path):
+    from app.utils.images import load_rgb
+
+    path = tmp_path / "phone.jpg"
+    Image.new("RGB", (4000, 3000), (120, 80, 40)).save(path)
+
+    full = load_rgb(str(path))
+    draft = load_rgb(path.read_bytes(), draft_size=380)
+
+    assert full.size == (4000, 3000)
+    assert draft.size == (1000, 750)   # 1/4 DCT scale; 1/8 would drop below 380
+
+
+def _export(detector, weights, backend, max_prob_diff=0.0, sha=None):
+    from app.utils import runtimes
+
+    artifact = runtimes.artifact_path(weights, backend)
+    if backend == "torchscript":
+        runtimes.export_torchscript(detector.model, detector.input_size, artifact)
+    else:
+        runtimes.export_onnx(detector.model, detector.input_size, artifact)
+    runtimes.write_sidecar(artifact, {
+        "source_sha256": sha or runtimes.file_sha256(weights),
+        "max_prob_diff": max_prob_diff,
+    })
+
+
+@pytest.mark.parametrize("backend", ["torchscript", "onnxruntime"])
+def test_exported_runtime_keeps_predict_contract(poultry_detector, poultry_weights, images, backend):
+    if backend == "onnxruntime":
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+    from app.poultry_model import PoultryDiseaseDetector
+
+    _export(poultry_detector, poultry_weights, backend)
+    exported = PoultryDiseaseDetector(poultry_weights, device="cpu", backend=backend)
+
+    assert exported.backend == backend
+    for path in images:
+        expected, actual = poultry_detector.predict(path), exported.predict(path)
+        assert actual.keys() == expected.keys()
+        assert actual["primary_prediction"]["disease_code"] == expected["primary_prediction"]["disease_code"]
+        assert actual["primary_prediction"]["confidence"] == pytest.approx(
+            expected["primary_prediction"]["confidence"], abs=1e-4
+        )
+
+
+def test_stale_or_failed_export_falls_back_to_eager(poultry_detector, poultry_weights):
+    from app.poultry_model import PoultryDiseaseDetector
+
+    _export(poultry_detector, poultry_weights, "torchscript", sha="0" * 64)
+    assert PoultryDiseaseDetector(poultry_weights, device="cpu", backend="torchscript").backend == "eager"
+
+    _export(poultry_detector, poultry_weights, "torchscript", max_prob_diff=0.05)
+    assert PoultryDiseaseDetector(poultry_weights, device="cpu", backend="torchscript").backend == "eager"
+
+
+def test_int8_is_refused_below_min_agreement(poultry_detector, poultry_weights, images):
+    from app.poultry_model import PoultryDiseaseDetector
+    from app.utils import runtimes
+
+    calibration = [torch.stack([poultry_detector.preprocess(p) for p in images])]
+    artifact = runtimes.artifact_path(poultry_weights, "int8")
+    runtimes.export_int8(poultry_detector.model, calibration, artifact)
+    sha = runtimes.file_sha256(poultry_weights)
+
+    runtimes.write_sidecar(artifact, {"source_sha256": sha, "validation_images": 100, "top1_agreement": 0.99})
+    accepted = PoultryDiseaseDetector(poultry_weights, device="cpu", backend="int8", min_agreement=0.98)
+    assert accepted.backend == "int8"
+    assert accepted.predict(images[0]).keys() == poultry_detector.predict(images[0]).keys()
+
+    runtimes.write_sidecar(artifact, {"source_sha256": sha, "validation_images": 100, "top1_agreement": 0.90})
+    assert PoultryDiseaseDetector(poultry_weights, device="cpu", backend="int8").backend == "eager"
+
+
+def test_channels_last_matches_default_layout(poultry_detector, poultry_weights, images):
+    from app.poultry_model import PoultryDiseaseDetector
+
+    nhwc = PoultryDiseaseDetector(poultry_weights, device="cpu", channels_last=True)
+    for path in images:
+        assert nhwc.predict(path)["primary_prediction"]["confidence"] == pytest.approx(
+            poultry_detector.predict(path)["primary_prediction"]["confidence"], abs=1e-4
+        )
+
+
+@pytest.fixture(scope="module")
+def fish_weights(tmp_path_factory):
+    import torch.nn as nn
+    from torchvision.models import efficientnet_b4
+    from app.ai_model import IDX_TO_CLASS
+
+    torch.manual_seed(0)
+    model = efficientnet_b4(weights=None)
+    model.classifier[1] = nn.Linear(model.classifier[1].in_features, len(IDX_TO_CLASS))
+    path = tmp_path_factory.mktemp("models") / "fish.pth"
+    torch.save(model.state_dict(), path)
+    return str(path)
+
+
+def _biased_gate(path, class_name):
+    """A gate that always answers `class_name` with ~100% confidence."""
+    from app.ai_model import IDX_TO_CLASS, build_gate_model
+
+    gate = build_gate_model()
+    head = gate.classifier[3][1]
+    torch.nn.init.zeros_(head.weight)
+    torch.nn.init.zeros_(head.bias)
+    with torch.no_grad():
+        head.bias[list(IDX_TO_CLASS.values()).index(class_name)] = 20.0
+    torch.save(gate.state_dict(), path)
+    return str(path)
+
+
+def test_cascade_settles_confident_not_fish_on_the_gate(fish_weights, images, tmp_path):
+    from app.ai_model import DiseaseDetector
+
+    gate = _biased_gate(tmp_path / "gate.pt", "Not_fish")
+    detector = DiseaseDetector(fish_weights, device="cpu", gate_path=gate)
+    results = detector.predict_many(images)
+
+    assert [r["primary_prediction"]["disease_code"] for r in results] == ["not_fish"] * len(images)
+    assert detector.counters["escalated"] == 0
+    stats = detector.cascade_stats()
+    assert stats["images"] == len(images) and stats["escalation_rate"] == 0.0
+
+
+def test_cascade_escalates_diseases_to_b4(fish_weights, images, tmp_path):
+    from app.ai_model import DiseaseDetector
+
+    gate = _biased_gate(tmp_path / "gate.pt", "Bacterial gill disease")
+    cascade = DiseaseDetector(fish_weights, device="cpu", gate_path=gate)
+    plain = DiseaseDetector(fish_weights, device="cpu")
+
+    for got, expected in zip(cascade.predict_many(images), plain.predict_many(images)):
+        assert got["primary_prediction"]["disease_code"] == expected["primary_prediction"]["disease_code"]
+        assert got["primary_prediction"]["confidence"] == pytest.approx(
+            expected["primary_prediction"]["confidence"], abs=1e-4
+        )
+    assert cascade.cascade_stats()["escalation_rate"] == 1.0
+    assert plain.cascade_stats() is None
+
+
+def test_warm_up_runs_each_batch_size_without_touching_cascade_stats(fish_weights, tmp_path):
+    from app.ai_model import DiseaseDetector
+    from app.inference.executor import warm_up
+
+    gate = _biased_gate(tmp_path / "gate.pt", "Not_fish")
+    detector = DiseaseDetector(fish_weights, device="cpu", gate_path=gate)
+    timings = warm_up(detector, [1, 2], passes=2)
+
+    assert sorted(timings) == [1, 2]
+    assert all(t["first_ms"] > 0 and t["last_ms"] > 0 for t in timings.values())
+    assert detector.cascade_stats()["images"] == 0
+
+
+def test_mmap_and_safetensors_weights_match_a_plain_load(poultry_weights, poultry_detector, images, tmp_path):
+    safetensors_torch = pytest.importorskip("safetensors.torch")
+    from app.poultry_model import PoultryDiseaseDetector
+
+    converted = tmp_path / "poultry.safetensors"
+    state_dict = torch.load(poultry_weights, map_location="cpu", weights_only=False)
+    safetensors_torch.save_file({k: v.contiguous() for k, v in state_dict.items()}, str(converted))
+
+    plain = PoultryDiseaseDetector(poultry_weights, device="cpu", mmap_weights=False)
+    assert poultry_detector.weights_mapped and not plain.weights_mapped
+    for detector in (poultry_detector, PoultryDiseaseDetector(str(converted), device="cpu")):
+        for path in images:
+            assert detector.predict(path)["primary_prediction"]["confidence"] == pytest.approx(
+                plain.predict(path)["primary_prediction"]["confidence"], abs=1e-6
+            )
+
+
+def test_postprocessor_grades_severity_by_confidence_and_class():
+    from app.utils.predictions import Postprocessor
+
+    post = Postprocessor(
+        ["healthy", "ncd", "cocci"], {"healthy"}, {"ncd": "CRITICAL"},
+        label=lambda c: (c, c.title()),
+    )
+    probs = torch.tensor([
+        [0.90, 0.05, 0.05],   # healthy, however confident
+        [0.05, 0.90, 0.05],   # confident ncd → its mapped level
+        [0.05, 0.05, 0.90],   # confident, unmapped → HIGH
+        [0.30, 0.15, 0.55],   # unsure → LOW, still needs treatment
+    ])
+    results = post(probs, top_k=2)
+
+    assert [r["primary_prediction"]["severity"] for r in results] == ["NONE", "CRITICAL", "HIGH", "LOW"]
+    assert [r["needs_treatment"] for r in results] == [False, True, True, True]
+    assert results[1]["primary_prediction"]["disease_name"] == "Ncd"
+    assert len(results[0]["all_predictions"]) == 2
+
+
+def test_cascade_counters_survive_concurrent_batches(fish_weights, images, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.ai_model import DiseaseDetector
+
+    gate = _biased_gate(tmp_path / "gate.pt", "Bacterial gill disease")
+    detector = DiseaseDetector(fish_weights, device="cpu", gate_path=gate)
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: detector.predict_many(images), range(8)))
+
+    assert detector.counters["images"] == detector.counters["escalated"] == 8 * len(images)
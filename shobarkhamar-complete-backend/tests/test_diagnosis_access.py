@@ -0,0 +1,84 @@
+"""
+Diagnosis status routes only answer the diagnosis' owner (service and DB
+faked; the owner filter itself is in DiagnosisService.get_status's query).
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, status
+from httpx import AsyncClient, ASGITransport
+
+from app.core.database import get_db
+from app.core.security import create_access_token, get_current_user, get_stream_user
+from app.services.diagnosis_service import DiagnosisService
+from app.services.events import event_hub
+
+OWNER, OTHER, DIAGNOSIS = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+@pytest.fixture
+async def client_as(monkeypatch):
+    from app.main import app
+
+    async def get_status(db, diagnosis_id, user_id=None):
+        if diagnosis_id != DIAGNOSIS or (user_id is not None and user_id != OWNER):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Diagnosis not found")
+        return {"diagnosis_id": str(diagnosis_id), "user_id": OWNER, "status": "COMPLETED",
+                "ai_result": None, "updated_at": datetime(2024, 5, 1)}
+
+    monkeypatch.setattr(DiagnosisService, "get_status", get_status)
+    app.dependency_overrides[get_db] = lambda: None
+    clients = []
+
+    async def make(user_id):
+        app.dependency_overrides[get_current_user] = lambda: {"sub": str(user_id)}
+        app.dependency_overrides[get_stream_user] = lambda: {"sub": str(user_id)}
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.aclose()
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_stream_user, None)
+
+
+@pytest.mark.asyncio
+async def test_owner_can_poll_status(client_as):
+    client = await client_as(OWNER)
+
+    response = await client.get(f"/api/v1/detection/{DIAGNOSIS}/status")
+
+    assert response.status_code == 200 and response.json()["status"] == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_other_users_are_refused_before_subscribing(client_as):
+    client = await client_as(OTHER)
+
+    polled = await client.get(f"/api/v1/detection/{DIAGNOSIS}/status")
+    streamed = await client.get(f"/api/v1/detection/{DIAGNOSIS}/events")
+
+    assert polled.status_code == 404
+    assert streamed.status_code == 404
+    assert event_hub.stats()["streams"] == 0
+
+
+@pytest.mark.asyncio
+async def test_event_stream_accepts_a_query_token(client_as):
+    from app.main import app
+
+    # EventSource cannot send an Authorization header; authenticate with ?token= only
+    app.dependency_overrides.pop(get_stream_user, None)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        anonymous = await client.get(f"/api/v1/detection/{DIAGNOSIS}/events")
+        token = create_access_token({"sub": str(OWNER)})
+        streamed = await client.get(f"/api/v1/detection/{DIAGNOSIS}/events", params={"token": token})
+
+    assert anonymous.status_code == 401
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("text/event-stream")
+    assert "event: status" in streamed.text and '"COMPLETED"' in streamed.text
@@ -0,0 +1,163 @@
+"""
+DiagnosisJobRunner tests — DiagnosisService's database calls are replaced
+so these run without PostgreSQL or model weights.
+"""
+import asyncio
+import time
+import types
+import uuid
+import pytest
+
+from app.inference.executor import InferenceQueueFull
+from app.inference.loading import LOADING, READY
+from app.models.diagnosis import DiagnosisStatus
+from app.services import diagnosis_jobs
+from app.services.diagnosis_jobs import DiagnosisJobRunner, MemoryJobQueue, RedisJobQueue
+
+
+@pytest.fixture
+def service(monkeypatch):
+    calls = {"run": [], "status": []}
+    outcomes = []
+
+    async def run_job(job, batcher, writer=None):
+        calls["run"].append((job["attempts"], batcher))
+        outcome = outcomes.pop(0) if outcomes else DiagnosisStatus.COMPLETED
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def set_status(diagnosis_id, status_value):
+        calls["status"].append(status_value)
+
+    monkeypatch.setattr(diagnosis_jobs.DiagnosisService, "run_job", staticmethod(run_job))
+    monkeypatch.setattr(diagnosis_jobs.DiagnosisService, "set_status", staticmethod(set_status))
+    return calls, outcomes
+
+
+def _state(status=READY):
+    return types.SimpleNamespace(model_status={"fish": status}, fish_batcher=object() if status == READY else None)
+
+
+async def _run(runner, diagnosis_id, until):
+    await runner.start()
+    await runner.submit(diagnosis_id, uuid.uuid4(), "/uploads/x.jpg", "fish")
+    for _ in range(200):
+        if until():
+            break
+        await asyncio.sleep(0.01)
+    await runner.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_completes(service):
+    calls, _ = service
+    runner = DiagnosisJobRunner(MemoryJobQueue(), _state(), concurrency=2)
+    diagnosis_id = uuid.uuid4()
+
+    await _run(runner, diagnosis_id, lambda: runner.completed)
+
+    assert runner.completed == 1
+    assert len(calls["run"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_full_inference_queue_is_retried_then_fails(service):
+    calls, outcomes = service
+    outcomes.extend([InferenceQueueFull()] * 3)
+    runner = DiagnosisJobRunner(MemoryJobQueue(), _state(), max_attempts=3, retry_delay=0)
+
+    await _run(runner, uuid.uuid4(), lambda: runner.failed)
+
+    assert [attempts for attempts, _ in calls["run"]] == [0, 1, 2]
+    assert runner.retried == 2
+    assert calls["status"] == [DiagnosisStatus.FAILED]
+
+
+@pytest.mark.asyncio
+async def test_jobs_wait_for_a_loading_model(service):
+    calls, _ = service
+    state = _state(LOADING)
+    runner = DiagnosisJobRunner(MemoryJobQueue(), state, max_attempts=1, retry_delay=0.02)
+
+    async def publish():
+        await asyncio.sleep(0.1)
+        state.fish_batcher = object()
+        state.model_status["fish"] = READY
+
+    asyncio.create_task(publish())
+    await _run(runner, uuid.uuid4(), lambda: runner.completed)
+
+    # Waiting for the model does not use up the single attempt
+    assert runner.completed == 1
+    assert runner.failed == 0
+    assert calls["run"][0][1] is state.fish_batcher
+
+
+class ListRedis:
+    """The list and key commands RedisJobQueue uses, in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self.expires = {}
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def blmove(self, src, dst, timeout, where_from, where_to):
+        deadline = time.monotonic() + timeout
+        while True:
+            moved = await self.lmove(src, dst, where_from, where_to)
+            if moved is not None or time.monotonic() >= deadline:
+                return moved
+            await asyncio.sleep(0.01)
+
+    async def lmove(self, src, dst, where_from, where_to):
+        items = self.lists.get(src)
+        if not items:
+            return None
+        value = items.pop(-1 if where_from == "RIGHT" else 0)
+        target = self.lists.setdefault(dst, [])
+        target.insert(len(target) if where_to == "RIGHT" else 0, value)
+        return value
+
+    async def lrem(self, key, count, value):
+        self.lists.get(key, []).remove(value)
+
+    async def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    async def set(self, key, value, px):
+        self.expires[key] = time.monotonic() + px / 1000
+
+    async def exists(self, key):
+        return self.expires.get(key, 0) > time.monotonic()
+
+    async def scan_iter(self, match):
+        for key in list(self.lists):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_a_worker_that_died_after_start_up_are_requeued(service):
+    redis = ListRedis()
+    dead = RedisJobQueue(redis, "jobs", heartbeat_ttl=0.3)
+    await dead.heartbeat()
+    await dead.put({"job_id": "j1", "diagnosis_id": str(uuid.uuid4()), "model": "fish", "attempts": 0})
+    assert await dead.get(0) is not None  # on the dead worker's processing list
+
+    # Started while the dead worker's heartbeat is still live, so nothing is reclaimed yet
+    runner = DiagnosisJobRunner(RedisJobQueue(redis, "jobs", heartbeat_ttl=0.3), _state())
+    await runner.start()
+    assert runner.recovered == 0
+
+    for _ in range(200):
+        if runner.completed:
+            break
+        await asyncio.sleep(0.01)
+    await runner.stop()
+
+    assert runner.recovered == 1
+    assert runner.completed == 1
+    assert await redis.llen(dead.processing) == 0
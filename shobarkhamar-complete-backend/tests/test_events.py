@@ -0,0 +1,56 @@
+"""
+EventHub tests — in-process fan-out (no Redis), replay after
+Last-Event-ID and closing a stream that falls behind.
+"""
+import uuid
+import pytest
+
+from app.services import events
+from app.services.events import EventHub, event_id_key
+
+
+@pytest.mark.asyncio
+async def test_events_reach_every_stream_of_that_user_only():
+    hub = EventHub()
+    await hub.start()
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+
+    async with hub.subscribe(alice) as first, hub.subscribe(alice) as second, hub.subscribe(bob) as other:
+        event_id = await hub.publish(alice, "diagnosis", {"status": "completed"})
+
+        for subscription in (first, second):
+            received_id, name, data = await subscription.get(1)
+            assert (received_id, name) == (event_id, "diagnosis")
+            assert '"completed"' in data
+        assert other.queue.empty()
+
+    await hub.stop()
+    assert hub.stats()["streams"] == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_only_events_after_last_event_id():
+    hub = EventHub(replay=3)
+    user = uuid.uuid4()
+    ids = [await hub.publish(user, "notification", {"n": i}) for i in range(5)]
+
+    assert [event_id_key(a) < event_id_key(b) for a, b in zip(ids, ids[1:])] == [True] * 4
+    # Only the last 3 are retained
+    assert [e[0] for e in await hub.replay(user, ids[0])] == ids[2:]
+    assert [e[0] for e in await hub.replay(user, ids[3])] == ids[4:]
+    assert await hub.replay(user, "not-an-id") == []
+
+
+@pytest.mark.asyncio
+async def test_stream_that_falls_behind_is_closed(monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_BUFFER", 2)
+    hub = EventHub()
+    user = uuid.uuid4()
+
+    async with hub.subscribe(user) as subscription:
+        for i in range(3):
+            await hub.publish(user, "diagnosis", {"n": i})
+        assert [(await subscription.get(1))[2] for _ in range(2)] == ['{"n": 0}', '{"n": 1}']
+        assert await subscription.get(1) is None
+
+    assert hub.stats()["overflows"] == 1
@@ -0,0 +1,76 @@
+"""
+/detection/history rows — slim by default, nested data only with ?expand=
+(service and DB faked).
+"""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.schemas.diagnosis import DiagnosisExpand
+from app.services.diagnosis_service import DiagnosisService
+
+
+def _row(**extra):
+    now = datetime(2024, 5, 1, 12, 0)
+    return {
+        "diagnosis_id": uuid.uuid4(), "farm_id": uuid.uuid4(), "unit_id": None,
+        "target_species": "FISH", "status": "COMPLETED", "symptoms_text": "White spots on fins",
+        "final_disease_id": None,
+        "final_disease_name": None, "ai_confidence": 0.93, "ai_disease_code": "white_spot",
+        "created_at": now, "updated_at": now, "image_count": 2, "first_image_url": "/uploads/a.jpg",
+        **extra,
+    }
+
+
+@pytest.fixture
+async def history(monkeypatch):
+    from app.main import app
+
+    calls = []
+
+    async def get_by_user(db, user_id, limit, cursor, farm_id, status_value, species, skip, expand=()):
+        calls.append(set(expand))
+        if DiagnosisExpand.IMAGES in expand:
+            image = SimpleNamespace(diagnosis_image_id=uuid.uuid4(), image_url="/uploads/a.jpg",
+                                    captured_at=datetime(2024, 5, 1))
+            return [_row(images=[image])], None
+        return [_row()], None
+
+    monkeypatch.setattr(DiagnosisService, "get_by_user", get_by_user)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: {"sub": str(uuid.uuid4())}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client, calls
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_rows_are_slim_unless_expanded(history):
+    client, calls = history
+
+    slim = (await client.get("/api/v1/detection/history")).json()["diagnoses"][0]
+    expanded = (await client.get("/api/v1/detection/history?expand=images, final_disease")).json()["diagnoses"][0]
+
+    assert slim["image_count"] == 2 and slim["first_image_url"] == "/uploads/a.jpg"
+    assert slim["symptoms_text"] == "White spots on fins"
+    assert "images" not in slim and "final_disease" not in slim
+    assert expanded["images"][0]["image_url"] == "/uploads/a.jpg"
+    assert calls == [set(), {DiagnosisExpand.IMAGES, DiagnosisExpand.FINAL_DISEASE}]
+
+
+@pytest.mark.asyncio
+async def test_unknown_expand_is_rejected(history):
+    client, calls = history
+
+    response = await client.get("/api/v1/detection/history?expand=images&expand=symptoms")
+
+    assert response.status_code == 422
+    assert calls == []
@@ -0,0 +1,30 @@
+"""
+Model-loading state tests — routes get 503 + Retry-After only while a
+model is still loading.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.inference.loading import LOADING, READY, UNAVAILABLE, ModelNotReady, require_batcher
+
+
+def test_loading_model_is_retryable_503():
+    state = SimpleNamespace(model_status={"fish": LOADING}, fish_batcher=None)
+
+    with pytest.raises(ModelNotReady) as exc:
+        require_batcher(state, "fish")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "5"
+
+
+def test_ready_and_unavailable_models_pass_through():
+    batcher = object()
+    state = SimpleNamespace(
+        model_status={"fish": READY, "poultry": UNAVAILABLE},
+        fish_batcher=batcher,
+        poultry_batcher=None,
+    )
+
+    assert require_batcher(state, "fish") is batcher
+    assert require_batcher(state, "poultry") is None
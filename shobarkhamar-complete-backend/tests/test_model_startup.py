@@ -0,0 +1,47 @@
+"""
+Model loading in the lifespan with the process backend — shutting down
+mid-startup does not leak the worker pool (loader and pool faked).
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import main
+
+built = []
+
+
+class FakePool:
+    def __init__(self, detectors):
+        time.sleep(0.2)  # forking and pinging the workers
+        self.is_shut_down = False
+        built.append(self)
+
+    def shutdown(self):
+        self.is_shut_down = True
+
+
+@pytest.mark.asyncio
+async def test_cancelled_startup_shuts_down_the_pool_being_built(monkeypatch):
+    async def active_version(registry, name):
+        return f"/models/{name}.pt"
+
+    monkeypatch.setattr(main, "_active_version", active_version)
+    monkeypatch.setattr(main, "_load_named", lambda name, path, timings: SimpleNamespace(path=path))
+    monkeypatch.setattr(main, "_make_pool", FakePool)
+    built.clear()
+
+    app = SimpleNamespace(state=SimpleNamespace(
+        startup={"models": {}}, model_registry=None, inference_executor=None,
+        model_status={name: main.LOADING for name in main.MODELS},
+    ))
+    task = asyncio.create_task(main._start_models(app, pool=True))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(built) == 1 and built[0].is_shut_down
+    assert app.state.inference_executor is None
@@ -0,0 +1,48 @@
+"""
+Hot swap through ModelRegistry with the process backend — the new worker
+pool is built off the event loop (pool, detector and batchers faked).
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.inference.registry import ModelRegistry
+
+
+class FakePool:
+    def __init__(self, detectors):
+        self.detectors = detectors
+        self.built_on = threading.get_ident()
+        self.is_shut_down = False
+
+    def shutdown(self):
+        self.is_shut_down = True
+
+
+@pytest.mark.asyncio
+async def test_swap_builds_the_new_pool_off_the_event_loop():
+    old_pool = FakePool({})
+    state = SimpleNamespace(inference_executor=old_pool, fish_detector=None, fish_batcher=None)
+    published = []
+
+    async def warm_up(executor, detectors):
+        pass
+
+    registry = ModelRegistry(
+        state,
+        load=lambda name, path: SimpleNamespace(path=path),
+        warm_up=warm_up,
+        publish=lambda name, detector, version: published.append((name, detector.path, version)),
+        make_pool=FakePool,
+        detector_attrs={"fish": "fish_detector"},
+        version_prefix="1.0.0",
+    )
+    await registry.swap("fish", "v2", "s3://models/fish-v2.pt", "/models/fish-v2.pt")
+
+    new_pool = state.inference_executor
+    assert new_pool is not old_pool and old_pool.is_shut_down
+    assert new_pool.built_on != threading.get_ident()
+    assert published == [("fish", "/models/fish-v2.pt", "1.0.0/v2@eager")]
+    assert registry.stats()["swaps"]["fish"]["state"] == "active"
@@ -0,0 +1,103 @@
+"""
+PredictionCache tests — in-process LRU only, no Redis needed.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.inference.batching import MicroBatcher
+from app.inference.cache import PredictionCache, config_fingerprint
+from app.inference.registry import ModelRegistry
+from tests.test_batching import FakeDetector
+
+
+def _result(code):
+    return {"primary_prediction": {"disease_code": code}}
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    await cache.set("fish", "1", "a", _result("a"))
+    await cache.set("fish", "1", "b", _result("b"))
+    await cache.get("fish", "1", "a")          # "a" is now most recent
+    await cache.set("fish", "1", "c", _result("c"))
+
+    assert await cache.get("fish", "1", "b") is None
+    assert await cache.get("fish", "1", "a") == _result("a")
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_model_version_change_invalidates_entries():
+    cache = PredictionCache()
+    await cache.set("fish", "1.0.0", "a", _result("a"))
+    await cache.set("poultry", "1.0.0", "a", _result("p"))
+
+    assert await cache.get("fish", "1.1.0", "a") is None
+    assert cache.stats()["entries"] == 1           # only the poultry entry survives
+    assert cache.stats()["invalidations"] == 1
+    assert await cache.get("poultry", "1.0.0", "a") == _result("p")
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_skips_forward_pass():
+    detector = FakeDetector()
+    cache = PredictionCache()
+    batcher = MicroBatcher(detector, max_wait_ms=0, name="fish", cache=cache, model_version="1.0.0")
+
+    first = await batcher.predict(b"same-photo")
+    first["mutated"] = True                      # callers get their own copy
+    second = await batcher.predict(b"same-photo")
+    await batcher.stop()
+
+    assert detector.forward_sizes == [1]
+    assert "mutated" not in second
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_prediction():
+    detector = FakeDetector()
+    batcher = MicroBatcher(detector, max_wait_ms=20, cache=PredictionCache(), model_version="1.0.0")
+
+    results = await asyncio.gather(*(batcher.predict(b"retry") for _ in range(3)), batcher.predict(b"other"))
+    await batcher.stop()
+
+    assert detector.forward_sizes == [2]
+    assert results[0] == results[1] == results[2]
+
+
+def test_detector_config_is_part_of_the_version():
+    registry = ModelRegistry(None, None, None, None, version_prefix="1.0.0")
+    eager = SimpleNamespace(backend="eager", memory_format="torch.contiguous_format", draft_decode=True, gate=None)
+    int8 = SimpleNamespace(**{**vars(eager), "backend": "int8"})
+    nhwc = SimpleNamespace(**{**vars(eager), "memory_format": "torch.channels_last"})
+    cascade = SimpleNamespace(**{**vars(eager), "gate": object(),
+                                 "gate_thresholds": {"Not_fish": 0.9, "Healthy Fish": 0.85}})
+    stricter = SimpleNamespace(**{**vars(cascade), "gate_thresholds": {"Not_fish": 0.95, "Healthy Fish": 0.85}})
+
+    keys = {registry.version_key("v1", d) for d in (eager, int8, nhwc, cascade, stricter)}
+    assert len(keys) == 5
+    assert registry.version_key("v1", cascade) == "1.0.0/v1@eager+gate=0.85,0.9"
+    assert config_fingerprint(eager) == "eager"
+
+
+@pytest.mark.asyncio
+async def test_result_of_a_swapped_out_model_is_not_cached():
+    cache = PredictionCache()
+    batcher = MicroBatcher(FakeDetector(), max_wait_ms=50, name="fish", cache=cache, model_version="1.0.0")
+
+    old = asyncio.create_task(batcher.predict(b"queued-before-swap"))
+    await asyncio.sleep(0.01)
+    batcher.swap(FakeDetector(), "2.0.0")
+    await cache.set("fish", "2.0.0", "new", _result("new"))
+    await old
+    await batcher.stop()
+
+    # The late 1.0.0 result neither lands in the cache nor purges 2.0.0's entries
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["versions"] == {"fish": "2.0.0"}
+    assert await cache.get("fish", "2.0.0", "new") == _result("new")
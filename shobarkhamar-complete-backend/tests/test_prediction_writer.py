@@ -0,0 +1,102 @@
+"""
+PredictionWriter tests — a fake session records the INSERTs so these run
+without a database.
+"""
+import asyncio
+import uuid
+import pytest
+
+from app.models.disease import TargetSpecies
+from app.services.prediction_writer import PredictionWriter
+
+COCCI_ID = uuid.uuid4()
+VERSION_ID = str(uuid.uuid4())
+
+
+class FakeResult:
+    def all(self):
+        return [(COCCI_ID, "Coccidiosis", TargetSpecies.POULTRY)]
+
+
+class FakeSession:
+    inserts = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows=None):
+        if rows is None:
+            return FakeResult()
+        FakeSession.inserts.append(rows)
+
+    async def commit(self):
+        pass
+
+
+def _prediction(*codes):
+    entries = [{"disease_code": c, "disease_name": c.title(), "confidence": 0.5} for c in codes]
+    return {"primary_prediction": entries[0], "all_predictions": entries}
+
+
+def _writer(**kwargs):
+    FakeSession.inserts = []
+    return PredictionWriter(lambda name: VERSION_ID, session_factory=FakeSession, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_bulk_when_the_batch_fills():
+    writer = _writer(batch_size=4, flush_ms=60000)
+    await writer.start()
+
+    for _ in range(4):
+        writer.record("poultry", uuid.uuid4(), uuid.uuid4(), _prediction("cocci"))
+    await asyncio.sleep(0.05)
+    await writer.stop()
+
+    assert [len(rows) for rows in FakeSession.inserts] == [4]
+    assert FakeSession.inserts[0][0]["predicted_disease_id"] == COCCI_ID
+    assert FakeSession.inserts[0][0]["model_version_id"] == VERSION_ID
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_after_the_interval():
+    writer = _writer(batch_size=100, flush_ms=20)
+    await writer.start()
+
+    writer.record("poultry", uuid.uuid4(), uuid.uuid4(), _prediction("cocci", "ncd", "healthy"))
+    await asyncio.sleep(0.1)
+    stats = writer.stats()
+    await writer.stop()
+
+    # Only cocci is in the catalogue
+    assert stats["written"] == 1
+    assert stats["unmatched"] == 2
+    assert stats["buffered"] == 0
+
+
+@pytest.mark.asyncio
+async def test_record_does_not_touch_the_database():
+    writer = _writer(batch_size=100, flush_ms=60000)
+
+    writer.record("poultry", uuid.uuid4(), uuid.uuid4(), _prediction("cocci"))
+    assert FakeSession.inserts == []
+    assert writer.stats()["buffered"] == 1
+
+    await writer.stop()
+    assert [len(rows) for rows in FakeSession.inserts] == [1]
+
+
+@pytest.mark.asyncio
+async def test_first_flush_loads_the_catalogue_soon_after_boot(monkeypatch):
+    # monotonic() counts from an arbitrary point, often boot; a young host is below the TTL
+    monkeypatch.setattr("app.services.prediction_writer.time.monotonic", lambda: 5.0)
+    writer = _writer(batch_size=100, flush_ms=60000)
+
+    writer.record("poultry", uuid.uuid4(), uuid.uuid4(), _prediction("cocci"))
+    await writer.stop()
+
+    assert writer.stats()["unmatched"] == 0
+    assert FakeSession.inserts[0][0]["predicted_disease_id"] == COCCI_ID
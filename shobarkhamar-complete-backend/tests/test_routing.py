@@ -0,0 +1,70 @@
+"""
+SpeciesRouter tests — fake batchers answer with a fixed class per image so
+these run without model weights.
+"""
+import asyncio
+import pytest
+
+from app.inference.batching import MicroBatcher
+from app.inference.routing import SpeciesRouter
+
+
+class LabelDetector:
+    """Predicts `labels[src]` with confidence `confidences.get(src, 0.99)`."""
+
+    def __init__(self, labels, confidences=None):
+        self.labels = labels
+        self.confidences = confidences or {}
+        self.forward_sizes = []
+
+    def predict_many(self, sources, top_k=3):
+        self.forward_sizes.append(len(sources))
+        return [
+            {"primary_prediction": {"disease_code": self.labels[s], "confidence": self.confidences.get(s, 0.99)}}
+            for s in sources
+        ]
+
+
+def _router(poultry_labels, fish_labels, poultry_conf=None):
+    poultry = LabelDetector(poultry_labels, poultry_conf)
+    fish = LabelDetector(fish_labels)
+    router = SpeciesRouter(
+        poultry_batcher=MicroBatcher(poultry, max_wait_ms=50, name="poultry"),
+        fish_batcher=MicroBatcher(fish, max_wait_ms=50, name="fish"),
+    )
+    return router, poultry, fish
+
+
+async def _stop(router):
+    await router.poultry.stop()
+    await router.fish.stop()
+
+
+@pytest.mark.asyncio
+async def test_poultry_images_never_reach_the_fish_model():
+    router, poultry, fish = _router({"hen.jpg": "cocci"}, {})
+
+    result = await router.predict("hen.jpg")
+    await _stop(router)
+
+    assert result["species"] == "POULTRY"
+    assert result["primary_prediction"]["disease_code"] == "cocci"
+    assert fish.forward_sizes == []
+
+
+@pytest.mark.asyncio
+async def test_non_poultry_and_unsure_images_escalate_to_fish_in_one_batch():
+    router, poultry, fish = _router(
+        {"a.jpg": "non_poultry", "b.jpg": "healthy", "c.jpg": "non_poultry"},
+        {"a.jpg": "bacterial_gill_disease", "b.jpg": "healthy_fish", "c.jpg": "not_fish"},
+        poultry_conf={"b.jpg": 0.3},
+    )
+
+    results = await asyncio.gather(*(router.predict(s) for s in ("a.jpg", "b.jpg", "c.jpg")))
+    await _stop(router)
+
+    # b.jpg: fish recognises it, so the unsure poultry guess is dropped
+    assert [r["species"] for r in results] == ["FISH", "FISH", None]
+    assert results[2]["routing"]["fish"]["disease_code"] == "not_fish"
+    assert poultry.forward_sizes == [3] and fish.forward_sizes == [3]
+    assert router.stats()["escalated_to_fish"] == 3
@@ -0,0 +1,132 @@
+"""
+ShadowEvaluator tests — fake detectors answer with a fixed class per image
+so these run without model weights.
+"""
+import asyncio
+import threading
+import pytest
+
+from app.inference.batching import MicroBatcher
+from app.inference.shadow import CandidateProcess, ShadowEvaluator
+
+
+class LabelDetector:
+    """Predicts `labels[src]`; blocks until `release` is set, if given."""
+
+    def __init__(self, labels, release=None):
+        self.labels = labels
+        self.release = release
+        self.seen = []
+
+    def predict_many(self, sources, top_k=3):
+        if self.release is not None:
+            self.release.wait(5)
+        self.seen.extend(sources)
+        return [{"primary_prediction": {"disease_code": self.labels[s], "confidence": 0.9}} for s in sources]
+
+
+async def _drain(shadow):
+    await asyncio.gather(*shadow._tasks)
+
+
+@pytest.mark.asyncio
+async def test_candidate_predictions_are_compared_with_the_active_model():
+    labels = {"a.jpg": "cocci", "b.jpg": "healthy"}
+    shadow = ShadowEvaluator("poultry", LabelDetector({**labels, "b.jpg": "ncd"}), "v2", sample_rate=1.0, rng=lambda: 0.0)
+    batcher = MicroBatcher(LabelDetector(labels), max_wait_ms=50, name="poultry")
+    batcher.shadow = shadow
+
+    await asyncio.gather(batcher.predict("a.jpg"), batcher.predict("b.jpg"))
+    await _drain(shadow)
+    stats = shadow.stats()
+    await batcher.stop()
+    await shadow.stop()
+
+    assert stats["compared"] == 2
+    assert stats["agreement"] == 0.5
+    assert stats["recent_disagreements"][0]["candidate"]["disease_code"] == "ncd"
+    assert stats["latency_ms"]["candidate_p50"] is not None
+
+
+@pytest.mark.asyncio
+async def test_clients_do_not_wait_for_the_candidate():
+    release = threading.Event()
+    candidate = LabelDetector({"a.jpg": "cocci"}, release=release)
+    shadow = ShadowEvaluator("poultry", candidate, "v2", sample_rate=1.0, rng=lambda: 0.0)
+    batcher = MicroBatcher(LabelDetector({"a.jpg": "cocci"}), max_wait_ms=0, name="poultry")
+    batcher.shadow = shadow
+
+    result = await asyncio.wait_for(batcher.predict("a.jpg"), 1)
+    assert result["primary_prediction"]["disease_code"] == "cocci"
+    assert shadow.stats()["pending"] == 1
+
+    release.set()
+    await _drain(shadow)
+    await batcher.stop()
+    await shadow.stop()
+    assert candidate.seen == ["a.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_samples_beyond_max_pending_are_dropped():
+    release = threading.Event()
+    labels = {f"{i}.jpg": "cocci" for i in range(4)}
+    shadow = ShadowEvaluator(
+        "poultry", LabelDetector(labels, release=release), "v2", sample_rate=1.0, max_pending=1, rng=lambda: 0.0,
+    )
+    outcomes = [{"primary_prediction": {"disease_code": "cocci", "confidence": 0.9}}]
+
+    for i in range(4):
+        shadow.offer([f"{i}.jpg"], outcomes, 0.01)
+    release.set()
+    await _drain(shadow)
+    stats = shadow.stats()
+    await shadow.stop()
+
+    assert stats["sampled"] == 1
+    assert stats["dropped"] == 3
+    assert stats["compared"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_limits_what_reaches_the_candidate():
+    draws = iter([0.01, 0.5, 0.01, 0.5])
+    candidate = LabelDetector({f"{i}.jpg": "cocci" for i in range(4)})
+    shadow = ShadowEvaluator("poultry", candidate, "v2", sample_rate=0.1, rng=lambda: next(draws))
+    outcomes = [{"primary_prediction": {"disease_code": "cocci", "confidence": 0.9}}] * 4
+
+    shadow.offer([f"{i}.jpg" for i in range(4)], outcomes, 0.04)
+    await _drain(shadow)
+    await shadow.stop()
+
+    assert shadow.offered == 4
+    assert candidate.seen == ["0.jpg", "2.jpg"]
+
+
+def load_label_detector(name, path):
+    """Loader for CandidateProcess; runs in the spawned candidate process."""
+    if path == "missing.pt":
+        return None
+    return LabelDetector({"a.jpg": "cocci", "b.jpg": "ncd"})
+
+
+@pytest.mark.asyncio
+async def test_candidate_runs_in_its_own_process():
+    candidate = CandidateProcess(load_label_detector, "poultry", "candidate.pt")
+    await candidate.start()
+    shadow = ShadowEvaluator("poultry", None, "v2", sample_rate=1.0, rng=lambda: 0.0, executor=candidate)
+    outcomes = [{"primary_prediction": {"disease_code": "cocci", "confidence": 0.9}}] * 2
+
+    shadow.offer(["a.jpg", "b.jpg"], outcomes, 0.02)
+    await _drain(shadow)
+    stats = shadow.stats()
+    await shadow.stop()
+
+    assert stats["compared"] == 2 and stats["agreement"] == 0.5
+    assert stats["cpu_used"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_candidate_that_does_not_load_is_refused():
+    with pytest.raises(RuntimeError):
+        await CandidateProcess(load_label_detector, "poultry", "missing.pt").start()
@@ -73,3 +73,11 @@ async def test_about_endpoint(client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert "project" in data
+
+
+@pytest.mark.asyncio
+async def test_ready_is_distinct_from_health(client: AsyncClient):
+    """/ready is 503 until the lifespan has loaded and warmed the models."""
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
@@ -0,0 +1,79 @@
+"""
+Uploads that never get a committed row are removed from UPLOAD_DIR
+(session faked; files go to a temporary directory).
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.inference.executor import InferenceQueueFull
+from app.services.diagnosis_service import DiagnosisService
+
+
+class FakeSession:
+    def __init__(self, fail_commit=False):
+        self.fail_commit = fail_commit
+        self.committed = False
+
+    def add(self, obj):
+        pass
+
+    async def execute(self, query):
+        return SimpleNamespace(scalar_one=lambda: SimpleNamespace(status=None, user_id=uuid.uuid4()))
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("connection lost")
+        self.committed = True
+
+    async def refresh(self, obj):
+        pass
+
+
+class FullBatcher:
+    name = "fish"
+
+    async def predict(self, data):
+        raise InferenceQueueFull()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+    async def fetch_full(db, diagnosis_id):
+        return SimpleNamespace(status=None, user_id=uuid.uuid4())
+
+    monkeypatch.setattr(DiagnosisService, "_fetch_full", fetch_full)
+    return tmp_path
+
+
+def _file(name="leaf.jpg"):
+    async def read():
+        return b"jpeg-bytes"
+    return SimpleNamespace(filename=name, read=read)
+
+
+async def test_queue_full_upload_leaves_no_file(upload_dir):
+    db = FakeSession()
+    with pytest.raises(InferenceQueueFull):
+        await DiagnosisService.upload_image(db, uuid.uuid4(), _file(), batcher=FullBatcher())
+
+    await asyncio.sleep(0.1)  # a write that was left running would have landed by now
+    assert not db.committed
+    assert list(upload_dir.iterdir()) == []
+
+
+async def test_failed_enqueue_commit_leaves_no_file(upload_dir):
+    with pytest.raises(RuntimeError):
+        await DiagnosisService.enqueue_image(FakeSession(fail_commit=True), uuid.uuid4(), _file())
+    assert list(upload_dir.iterdir()) == []
+
+    diagnosis_image, _ = await DiagnosisService.enqueue_image(FakeSession(), uuid.uuid4(), _file())
+    assert [f"/uploads/{f.name}" for f in upload_dir.iterdir()] == [diagnosis_image.image_url]
@@ -1,12 +1,12 @@
 import { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router';
 import { ArrowLeft, LogOut, Clock, Fish, Bird, AlertCircle, FileText, Filter, Loader2 } from 'lucide-react';
-import { getHistory, DiagnosisResponse } from '../services/api';
+import { getHistory, DiagnosisSummary } from '../services/api';
 
 export function History() {
   const navigate = useNavigate();
   const [filter, setFilter] = useState<'all' | 'fish' | 'poultry'>('all');
-  const [diagnoses, setDiagnoses] = useState<DiagnosisResponse[]>([]);
+  const [diagnoses, setDiagnoses] = useState<DiagnosisSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -6,7 +6,7 @@ import {
   Clock, Microscope, Activity, X, Trash2,
 } from 'lucide-react';
 import { getHistory, getToken } from '../services/api';
-import type { DiagnosisResponse } from '../services/api';
+import type { DiagnosisSummary } from '../services/api';
 import { notificationService } from '../services/notifications';
 import {
   DISMISSED_STORAGE_KEY, getStoredIds,
@@ -56,7 +56,7 @@ function appNotificationToNotification(n: {
 
 const HEALTHY_CODES = new Set(['', 'healthy', 'healthy_fish', 'non_poultry', 'not_fish']);
 
-function diagnosisToNotification(d: DiagnosisResponse): Notification {
+function diagnosisToNotification(d: DiagnosisSummary): Notification {
   const species = d.target_species?.toLowerCase().includes('poultry') ? 'poultry' : 'fish';
   const date = new Date(d.created_at);
   const code = (d.ai_result?.disease_code ?? d.ai_disease_code ?? '').toLowerCase().replace(/[\s-]+/g, '_');
@@ -281,9 +281,32 @@ export async function quickAnalyzeImage(
 // HISTORY
 // ─────────────────────────────────────────────────────────────
 
+// A /detection/history row: images are counted, not nested, unless ?expand=images
+export interface DiagnosisSummary {
+  diagnosis_id: string;
+  farm_id: string;
+  unit_id?: string;
+  target_species: TargetSpecies;
+  status: string;
+  symptoms_text?: string;
+  final_disease_id?: string;
+  final_disease_name?: string;
+  ai_confidence?: number;
+  ai_disease_code?: string;
+  ai_result?: AIResult;
+  created_at: string;
+  updated_at: string;
+  image_count: number;
+  first_image_url?: string;
+  images?: { diagnosis_image_id: string; image_url: string; captured_at: string }[];
+  final_disease?: DiseaseResult;
+}
+
 export interface DiagnosisListResponse {
-  diagnoses: DiagnosisResponse[];
-  total: number;
+  diagnoses: DiagnosisSummary[];
+  next_cursor?: string;
+  total?: number;
+  total_estimated?: boolean;
 }
 
 export async function getHistory(skip = 0, limit = 100): Promise<DiagnosisListResponse> {